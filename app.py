@@ -1,32 +1,29 @@
 # app.py — 시험 시감 자동 편성 v5.0
-import streamlit as st, pandas as pd, re, json
+import streamlit as st, pandas as pd, re, json, io
 from collections import defaultdict
-from io import BytesIO
-import gspread 
-from google.oauth2.service_account import Credentials 
-from scheduler import (
-    build_teachers, run_assignment, compute_teacher_stats, 
-    compute_parent_stats, assignments_to_df, df_to_assignments
-)
+from scheduler import run_assignment, repair_assignment
+from stats import StatsAggregator
+from eligibility import EligibilityIndex
+from feasibility import analyze
+from search import search_assignment
+from export import get_workbook, write_timetable_zip
+from store import AssignmentStore, UNASSIGNED
+from history import EditHistory
+from validate import validate, KINDS as VIOLATION_KINDS
+# 구글 시트 클라이언트·시트 핸들은 프로세스 단위 캐시 (세션 간 공유, 만료·인증 오류 시 재발급)
+from clients import get_gspread_client, sheet_call, POOL as CLIENT_POOL
+from persist import SheetTracker, VersionConflict
+from changes import diff_cells, changed_names, by_slot, by_teacher, notices, slot_rooms
+from ingest import RosterIngest
+import profiling
+from ledger import Ledger, rollup
+from db import get_client, list_sessions, create_session, save_ledger, load_ledger_rows
+from jobs import get_service
 
 st.set_page_config(page_title="시험 시감 자동 편성 v5.0", layout="wide")
 st.title("🧮 시험 시감 자동 편성 v5.0")
 st.caption("백지연쌤 화이팅! 💪 | 공유 메모장 | 실시간 위반 검증 | 클라우드 저장")
 
-# ══════════════════════════════════════════════════════════════
-# 구글 시트 API 클라이언트
-# ══════════════════════════════════════════════════════════════
-def get_gspread_client():
-    try:
-        if "gcp_service_account" in st.secrets:
-            info = json.loads(st.secrets["gcp_service_account"])
-        else:
-            with open("service_account.json") as f: info = json.load(f)
-        scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_info(info, scopes=scope)
-        return gspread.authorize(creds)
-    except: return None
-
 # ══════════════════════════════════════════════════════════════
 # 사이드바 설정
 # ══════════════════════════════════════════════════════════════
@@ -40,6 +37,8 @@ with st.sidebar:
         with st.expander(f"{d}일차", expanded=(d==1)):
             p_grade = [int(st.number_input(f"{g}학년 교시", 0, 10, 2, key=f"p_{d}_{g}")) for g in range(1, num_grades + 1)]
             periods_by_day_grade.append(p_grade)
+    engine = st.selectbox("배정 엔진", ["sort", "heap", "flow"], help="heap: 증분 갱신 엔진 (sort와 동일 결과, 대규모 학교에서 빠름)\nflow: 교시별 최적 매칭 — 빈 칸이 가장 적지만 느림")
+    search_s = int(st.number_input("다중 시드 탐색 시간(초)", 0, 300, 0, help="0이면 기본 배정 1회, 그 외에는 여러 변형 중 공정성이 가장 좋은 배정 선택"))
     st.markdown("---")
     st.header("🔗 시트 서버 설정")
     raw_sheet_url = st.text_input("구글 시트 URL", placeholder="https://docs.google.com/spreadsheets/d/...")
@@ -47,6 +46,21 @@ with st.sidebar:
     parent_gid = st.text_input("학부모 명단 GID", "")
     save_tab_name = st.text_input("저장용 탭 이름", "저장데이터")
     memo_tab_name = st.text_input("메모장 탭 이름", "메모장")
+    with st.expander("📡 연결 상태"):
+        st.json(CLIENT_POOL.metrics())
+    with st.expander("📚 학기 누적 공정성"):
+        use_history = st.checkbox("이전 학기 누적 반영", help="Supabase에 기록된 이전 학기의 정/부/복도감독 횟수에서 카운터를 시작합니다")
+        history_months = int(st.number_input("반영 기간(개월)", 1, 60, 12))
+        history_gap = int(st.number_input("최대 격차(0=제한 없음)", 0, 200, 0, help="신규 교사에게 배정이 몰리지 않도록 명단 최소값 + 격차에서 자릅니다"))
+        term_name = st.text_input("이번 학기 이름", "", placeholder="예: 2026-2학기 중간고사")
+    debug = st.checkbox("🔬 성능 계측", help="단계별 시간·교시별 후보 통계를 기록하고 화면 맨 아래에 표시 (끄면 기록하지 않음)")
+    if "profile_rec" not in st.session_state: st.session_state["profile_rec"] = profiling.Recorder()
+    profiling.enable(debug, st.session_state["profile_rec"])  # 세션별 기록기 — 다른 사용자의 계측과 섞이지 않음
+
+# st.fragment(1.37+) / experimental_fragment(1.33+): 그 부분만 다시 실행 — 없으면 일반 함수로
+_FRAGMENT = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+_fragment = _FRAGMENT or (lambda fn: fn)
+def _polling(fn, every: float = 2.0): return _FRAGMENT(run_every=every)(fn) if _FRAGMENT else fn
 
 # ══════════════════════════════════════════════════════════════
 # 메모장 저장/로드 로직
@@ -55,10 +69,7 @@ def save_memo(url, tab_name, text):
     client = get_gspread_client()
     if not client: return
     try:
-        sh = client.open_by_url(url)
-        try: ws = sh.worksheet(tab_name)
-        except: ws = sh.add_worksheet(title=tab_name, rows="10", cols="2")
-        ws.update('A1', [[text]])
+        sheet_call("memo_save", url, tab_name, lambda ws: ws.update('A1', [[text]]), create=("10", "2"))
         st.success("메모가 클라우드에 저장되었습니다!")
     except Exception as e: st.error(f"메모 저장 실패: {e}")
 
@@ -66,8 +77,7 @@ def load_memo(url, tab_name):
     client = get_gspread_client()
     if not client: return ""
     try:
-        sh = client.open_by_url(url); ws = sh.worksheet(tab_name)
-        return ws.acell('A1').value
+        return sheet_call("memo_load", url, tab_name, lambda ws: ws.acell('A1').value)
     except: return ""
 
 # ══════════════════════════════════════════════════════════════
@@ -97,26 +107,53 @@ def get_csv_url(url, gid):
     m = re.search(r"/spreadsheets/d/([a-zA-Z0-9_-]+)", url)
     return f"https://docs.google.com/spreadsheets/d/{m.group(1)}/export?format=csv&gid={gid}" if m else None
 
-@st.cache_data(ttl=60)
-def load_all_data(url, t_gid, p_gid):
-    t_url, p_url = get_csv_url(url, t_gid), get_csv_url(url, p_gid) if p_gid.strip() else None
-    try: t_df = pd.read_csv(t_url) if t_url else pd.DataFrame()
-    except: t_df = pd.DataFrame()
-    try: p_df = pd.read_csv(p_url) if p_url else pd.DataFrame()
-    except: p_df = pd.DataFrame()
-    if not t_df.empty: t_df.columns = [c.strip().lower() for c in t_df.columns]
-    if not p_df.empty: p_df.columns = [c.strip().lower() for c in p_df.columns]
-    return t_df, p_df
+def get_ingest() -> RosterIngest:
+    # 세션마다 행 지문별 Teacher 캐시를 유지 — 새로고침 때 바뀐 행만 다시 만든다
+    if "roster_ingest" not in st.session_state: st.session_state["roster_ingest"] = RosterIngest()
+    return st.session_state["roster_ingest"]
+
+def current_teachers():
+    return get_ingest().teachers(num_days)
+
+def current_history(teachers):
+    """이전 학기 누적 → run_assignment(history=...). 장부는 기간별로 세션에 캐시."""
+    if not use_history: return None
+    since = (pd.Timestamp.now(tz="UTC") - pd.DateOffset(months=history_months)).normalize()
+    cached = st.session_state.get("ledger")
+    if cached is None or cached[0] != since:
+        client = get_client()
+        if client is None: st.warning("저장소(Supabase/SQLite) 설정이 없어 누적 반영 없이 배정합니다."); return None
+        cached = st.session_state["ledger"] = (since, Ledger.from_records(load_ledger_rows(client, since.isoformat())))
+    return cached[1].seed(teachers, max_gap=history_gap or None)
 
 if "assignments" not in st.session_state: st.session_state["assignments"] = {}
+if "asgn_gen" not in st.session_state: st.session_state["asgn_gen"], st.session_state["asgn_rev"], st.session_state["ed_epoch"] = 0, 0, 0
+
+def set_assignments(store):
+    """배정 전체 교체 (자동 배정·재배정·불러오기) — 세대 번호가 바뀌어 편집기 상태·검증 캐시가 새로 시작"""
+    prev = st.session_state.get("assignments")
+    st.session_state["assignments"] = AssignmentStore.from_dict(store)
+    st.session_state["last_changes"] = diff_cells(prev, st.session_state["assignments"]) if prev else None  # 재배정·불러오기로 바뀐 칸
+    st.session_state["asgn_gen"] += 1
+    st.session_state["history"] = EditHistory(st.session_state["assignments"])  # 새 배정이 "기준"
+    st.session_state["pinned"] = set()  # 재배정이 지우지 않을 수동 수정 자리 (변경분 재배정이 이어 받음)
 if "all_teachers" not in st.session_state: st.session_state["all_teachers"] = []
 
 st.markdown("---")
 if st.button("🔄 시트에서 명단 새로고침", use_container_width=True):
-    t_df_new, p_df_new = load_all_data(raw_sheet_url, teacher_gid, parent_gid)
-    st.session_state["t_df"], st.session_state["p_df"] = t_df_new, p_df_new
-    st.session_state["all_teachers"] = build_teachers(t_df_new, p_df_new, num_days=num_days)
-    st.success("명단을 불러왔습니다!")
+    ingest = get_ingest()
+    try:
+        changed = ingest.refresh(get_csv_url(raw_sheet_url, teacher_gid), get_csv_url(raw_sheet_url, parent_gid) if parent_gid.strip() else None)
+        st.session_state["t_df"], st.session_state["p_df"] = ingest.frames()
+        st.session_state["all_teachers"] = current_teachers()
+        if any(changed.values()): st.success(f"명단을 불러왔습니다! (변경 {len(ingest.changed)}명, 새로 만든 항목 {ingest.rebuilt}개)")
+        else: st.info("명단이 바뀌지 않았습니다.")
+    except Exception as e: st.error(f"명단을 불러오지 못했습니다: {e}")
+
+issues = get_ingest().issues()
+if not issues.empty:
+    with st.expander(f"⚠️ 명단 검사 {len(issues)}건 (형식 오류 {int((issues['수준'] == 'error').sum())}건)"):
+        st.dataframe(issues, use_container_width=True, hide_index=True)
 
 t_df = st.session_state.get("t_df", pd.DataFrame())
 p_df = st.session_state.get("p_df", pd.DataFrame())
@@ -133,22 +170,47 @@ col_run, col_save, col_load = st.columns([2, 1, 1])
 with col_run:
     if st.button("🚀 자동 배정 시작", type="primary", use_container_width=True):
         if not t_df.empty:
-            teachers = build_teachers(t_df, p_df, num_days=num_days)
-            st.session_state["assignments"] = run_assignment(teachers, num_days, num_grades, classes_per_grade, periods_by_day_grade)
+            teachers = current_teachers(); history = current_history(teachers)
+            if search_s > 0:
+                asgn_new, score, seed = search_assignment(teachers, num_days, num_grades, classes_per_grade, periods_by_day_grade, budget_s=search_s, engine=engine, history=history)
+                set_assignments(asgn_new)
+                st.info(f"탐색 결과 — 미배정 {score[0]}칸, 합계 편차 {score[1]}, 연속 교시 {score[2]}회 (시드 {seed})")
+            else:
+                set_assignments(run_assignment(teachers, num_days, num_grades, classes_per_grade, periods_by_day_grade, engine=engine, history=history))
             st.session_state["all_teachers"] = teachers
+            get_ingest().reset_changes(); st.session_state["roster_baseline"] = num_days
             st.success("배정 완료!")
+    if st.button("🩹 변경분만 재배정", use_container_width=True, help="현재 배정(수동 수정 포함)을 유지하고 명단 변경으로 문제가 생긴 교시만 다시 채웁니다"):
+        if not t_df.empty and st.session_state["assignments"]:
+            teachers = current_teachers()
+            # 이 배정을 만든 뒤의 명단 변경 이름을 알면 그 이름이 든 칸만 검사 (불러온 배정이거나 일수가 바뀌었으면 전체 검사)
+            changed = get_ingest().changed if st.session_state.get("roster_baseline") == num_days else None
+            # 수동 수정분(기준 배정 대비 바뀐 자리 + 이전 재배정 때 이미 고정한 자리)은 명단에 없는 이름이어도 그대로 둠
+            hist = st.session_state.get("history")
+            pinned = st.session_state.get("pinned", set()) | (hist.manual_cells(st.session_state["assignments"]) if hist else set())
+            repaired, dirty = repair_assignment(teachers, st.session_state["assignments"], num_days, num_grades, classes_per_grade, periods_by_day_grade, changed=changed, pinned=pinned, engine=engine, history=current_history(teachers))
+            set_assignments(repaired); st.session_state["pinned"] = pinned
+            st.session_state["all_teachers"] = teachers
+            get_ingest().reset_changes(); st.session_state["roster_baseline"] = num_days
+            st.success(f"재배정 완료! ({len(dirty)}개 교시)")
+
+    if st.button("🔍 사전 점검", use_container_width=True, help="배정 전에 교시별 인원·채울 수 있는 칸의 상한·병목 규칙을 확인합니다"):
+        if not t_df.empty: st.session_state["capacity"] = analyze(current_teachers(), num_days, num_grades, classes_per_grade, periods_by_day_grade)
 
 with col_save:
     if st.button("☁️ 배정결과 시트저장", use_container_width=True):
         client = get_gspread_client()
         if client and st.session_state["assignments"]:
             try:
-                sh = client.open_by_url(raw_sheet_url)
-                try: ws = sh.worksheet(save_tab_name)
-                except: ws = sh.add_worksheet(title=save_tab_name, rows="1000", cols="10")
-                df_save = assignments_to_df(st.session_state["assignments"])
-                ws.clear(); ws.update([df_save.columns.values.tolist()] + df_save.values.tolist())
-                st.success("배정 결과가 저장되었습니다!")
+                # 마지막으로 불러오거나 저장한 시트 내용과 비교해 바뀐 칸만 갱신 (처음이면 전체 쓰기)
+                tracker = st.session_state.get("sheet_tracker")
+                if tracker is None or st.session_state.get("sheet_tracker_key") != (raw_sheet_url, save_tab_name):
+                    tracker, n = sheet_call("assignments_save", raw_sheet_url, save_tab_name, lambda ws: SheetTracker.first_save(ws, st.session_state["assignments"]), create=("1000", "10"))
+                else:
+                    n = sheet_call("assignments_save", raw_sheet_url, save_tab_name, lambda ws: tracker.save(ws, st.session_state["assignments"]), create=("1000", "10"))
+                st.session_state["sheet_tracker"], st.session_state["sheet_tracker_key"] = tracker, (raw_sheet_url, save_tab_name)
+                st.success(f"배정 결과가 저장되었습니다! ({n}칸)" if n else "변경된 내용이 없습니다.")
+            except VersionConflict as e: st.error(f"⚠️ {e} — 먼저 📂 불러오기 후 다시 저장하세요.")
             except Exception as e: st.error(f"저장 실패: {e}")
 
 with col_load:
@@ -156,113 +218,220 @@ with col_load:
         client = get_gspread_client()
         if client:
             try:
-                sh = client.open_by_url(raw_sheet_url); ws = sh.worksheet(save_tab_name)
-                df_load = pd.DataFrame(ws.get_all_records())
-                st.session_state["assignments"] = df_to_assignments(df_load)
-                st.session_state["all_teachers"] = build_teachers(t_df, p_df, num_days=num_days)
+                tracker, loaded = sheet_call("assignments_load", raw_sheet_url, save_tab_name, SheetTracker.load)
+                set_assignments(loaded)
+                st.session_state["sheet_tracker"], st.session_state["sheet_tracker_key"] = tracker, (raw_sheet_url, save_tab_name)
+                st.session_state["all_teachers"] = current_teachers()
+                st.session_state["roster_baseline"] = None
                 st.success("배정 결과를 복원했습니다!")
             except: st.error("저장된 데이터를 찾을 수 없습니다.")
 
+cap = st.session_state.get("capacity")
+if cap is not None:
+    with st.expander(f"🔍 사전 점검 — {'✅ 모든 칸을 채울 수 있습니다' if cap.ok else f'⚠️ 최소 {cap.min_unassigned}칸은 (미배정)으로 남습니다'}", expanded=not cap.ok):
+        st.dataframe(cap.slots.rename(columns={"day": "일차", "period": "교시", "rooms": "교실", "demand": "필요 인원", "teachers": "가능 교사", "parents": "가능 학부모",
+                                               "chief_bound": "정감독 상한", "cell_bound": "채울 수 있는 칸", "shortfall": "부족"}), use_container_width=True, hide_index=True)
+        if not cap.bottlenecks.empty:
+            st.write("병목 규칙 (교시 0 = 하루 전체)")
+            st.dataframe(cap.bottlenecks.rename(columns={"day": "일차", "period": "교시", "rule": "원인", "count": "인원", "names": "이름"}), use_container_width=True, hide_index=True)
+
+changes = st.session_state.get("last_changes")
+if changes is not None:
+    with st.expander(f"🔀 이전 배정 대비 변경 — {len(changes)}칸, {len(changed_names(changes))}명" if len(changes) else "🔀 이전 배정 대비 변경 없음", expanded=False):
+        if len(changes):
+            t_slot, t_name, t_notice = st.tabs(["교시별", "사람별", "알림 문구"])
+            t_slot.dataframe(by_slot(changes).rename(columns={"day": "일차", "period": "교시", "cells": "바뀐 칸", "rooms": "교실", "names": "관련 인원"}), use_container_width=True, hide_index=True)
+            t_name.dataframe(by_teacher(changes).rename(columns={"name": "이름", "day": "일차", "period": "교시", "grade": "학년", "class": "반", "role": "역할", "action": "변경"}), use_container_width=True, hide_index=True)
+            msgs = notices(changes)
+            t_notice.dataframe(msgs.rename(columns={"name": "이름", "added": "추가", "removed": "해제", "message": "알림"}), use_container_width=True, hide_index=True)
+            t_notice.download_button("📥 알림 문구 CSV", msgs.to_csv(index=False).encode("utf-8-sig"), "changes.csv", "text/csv")
+
+# ══════════════════════════════════════════════════════════════
+# 작업 큐: 여러 학교·시험을 백그라운드 워커에서 배정 (jobs.py, 결과는 저장소에 세션으로 저장)
+# ══════════════════════════════════════════════════════════════
+with st.expander("🏫 작업 큐 (여러 학교·시험 동시 배정)"):
+    j_col1, j_col2 = st.columns([3, 1])
+    job_name = j_col1.text_input("작업 이름", term_name.strip() or "schedule", key="job_name")
+    if j_col2.button("📤 현재 명단·설정으로 제출", use_container_width=True):
+        if t_df.empty: st.error("교사 명단을 먼저 불러오세요.")
+        else:
+            t_frame, p_frame = get_ingest().frames()
+            spec = {"name": job_name, "teachers_csv": t_frame.to_csv(index=False), "parents_csv": p_frame.to_csv(index=False) if not p_frame.empty else "",
+                    "days": num_days, "grades": num_grades, "classes": classes_per_grade, "periods": periods_by_day_grade, "engine": engine,
+                    "history": current_history(current_teachers())}
+            st.session_state.setdefault("my_jobs", []).append(get_service().submit(spec))
+
+    @_polling
+    def job_table():
+        svc = get_service()
+        mine = set(st.session_state.get("my_jobs", []))
+        rows = [j for j in svc.list() if j["id"] in mine]
+        st.caption(" · ".join(f"{k} {v}" for k, v in svc.counts().items() if v) or "작업 없음")
+        if not rows: return
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        done = [j for j in rows if j["state"] == "done"]
+        if done:
+            pick = st.selectbox("결과", [j["id"] for j in done], format_func=lambda i: next(f"{j['name']} ({i})" for j in done if j["id"] == i))
+            if st.button("📥 이 결과를 화면으로 불러오기"):
+                set_assignments(svc.result(pick))
+                st.session_state["all_teachers"] = current_teachers(); st.session_state["roster_baseline"] = None
+                st.rerun()
+    job_table()
+
 # ══════════════════════════════════════════════════════════════
 # 결과 확인 및 실시간 검증
+# 선택한 일차·교시만 그리고(편집기는 학년 수만큼), 편집은 변경분(edited_rows)만 반영.
+# 편집·교시 이동은 fragment 안에서만 다시 실행되고, 검증·통계는 수정 번호(asgn_rev)별로 캐시.
 # ══════════════════════════════════════════════════════════════
+def _cached(name, key, build):
+    """session_state에 key가 같을 때까지 보관"""
+    hit = st.session_state.get(name)
+    if hit is None or hit[0] != key: hit = st.session_state[name] = (key, build())
+    return hit[1]
+
+def _settings():
+    return (num_days, num_grades, classes_per_grade, json.dumps(periods_by_day_grade), id(st.session_state["all_teachers"]))
+
+def current_elig():
+    return _cached("view_elig", _settings(), lambda: EligibilityIndex(st.session_state["all_teachers"], num_days, num_grades, classes_per_grade))
+
+def current_report():
+    key = (st.session_state["asgn_gen"], st.session_state["asgn_rev"], _settings())
+    return _cached("view_report", key, lambda: validate(st.session_state["assignments"], st.session_state["all_teachers"], num_days, num_grades, classes_per_grade, periods_by_day_grade, elig=current_elig()))
+
+def current_agg():
+    """통계 집계기: 배정을 통째로 바꿀 때(세대)·설정이 바뀔 때만 새로 만들고, 편집은 apply_edits에서 칸 단위로 갱신"""
+    key = (st.session_state["asgn_gen"], _settings())
+    return _cached("view_agg", key, lambda: StatsAggregator(st.session_state["assignments"], st.session_state["all_teachers"], num_days, elig=current_elig()))
+
+def current_stats():
+    agg = current_agg()
+    return agg.teacher_frame(), agg.parent_frame()
+
+def apply_edits(key, d, p, g):
+    """편집기 변경분 {행 번호: {열 이름: 값}}만 배정에 반영 (누적된 변경분을 다시 적용해도 결과는 같음)"""
+    asgn, agg = st.session_state["assignments"], current_agg()
+    cells = {}
+    for row, cols in st.session_state[key]["edited_rows"].items():
+        for col, val in cols.items():
+            c = int(col.split("-")[1].replace("반", ""))
+            pair = cells.get(c) or list(asgn.get((d, p), {}).get((g, c), (UNASSIGNED, UNASSIGNED)))
+            pair[int(row)] = str(val).strip() if val and str(val).strip() else UNASSIGNED  # 0행 정감독, 1행 부감독
+            cells[c] = pair
+    for (d_, p_, g_, c), _, new in edit_history().edit(asgn, [(d, p, g, c, *pair) for c, pair in cells.items()]): agg.set_cell(d_, p_, g_, c, *new)
+    st.session_state["asgn_rev"] += 1
+
+def edit_history() -> EditHistory:
+    if "history" not in st.session_state: st.session_state["history"] = EditHistory(st.session_state["assignments"])
+    return st.session_state["history"]
+
+def step_history(redo: bool):
+    """실행 취소/다시 실행 — 편집기는 배정을 다시 읽도록 새 키(ed_epoch)로 시작"""
+    hist, asgn, agg = edit_history(), st.session_state["assignments"], current_agg()
+    for key, pair in (hist.redo(asgn) if redo else hist.undo(asgn)):
+        if pair is None: agg.remove_cell(*key)
+        else: agg.set_cell(*key, *pair)
+    st.session_state["asgn_rev"] += 1; st.session_state["ed_epoch"] += 1
+
+@_fragment
+def slot_view():
+    asgn = st.session_state["assignments"]
+    if st.session_state.get("view_day", 1) > num_days: st.session_state["view_day"] = 1
+    c_day, c_period = st.columns([3, 2])
+    with c_day: d = st.radio("일차", list(range(1, num_days + 1)), format_func=lambda x: f"{x}일차", horizontal=True, key="view_day")
+    d_max_p = max(int(periods_by_day_grade[d-1][g-1]) for g in range(1, num_grades+1))
+    if d_max_p == 0: st.caption("이 날은 시험이 없습니다."); return
+    if st.session_state.get("view_period", 1) > d_max_p: st.session_state["view_period"] = 1
+    with c_period: p = st.radio("교시", list(range(1, d_max_p + 1)), format_func=lambda x: f"{x}교시", horizontal=True, key="view_period")
+    hist = edit_history()
+    c_undo, c_redo, c_base = st.columns([1, 1, 3])
+    c_undo.button(f"↶ 실행 취소 ({hist.can_undo})", disabled=not hist.can_undo, on_click=step_history, args=(False,), use_container_width=True)
+    c_redo.button(f"↷ 다시 실행 ({hist.can_redo})", disabled=not hist.can_redo, on_click=step_history, args=(True,), use_container_width=True)
+    with c_base.expander("🔍 자동 배정과 비교"):
+        base_diff = hist.diff_baseline(asgn)
+        st.caption(f"자동 배정(또는 불러온 배정) 이후 바뀐 칸 {len(base_diff)}개")
+        if not base_diff.empty: st.dataframe(base_diff.drop(columns="change"), use_container_width=True, hide_index=True)
+    col_tbl, col_corridor = st.columns([4, 1])
+    with col_corridor:
+        st.markdown(f"**🚶 복도감독 ({p}교시)**")
+        corridor_list = current_elig().corridor_names(d, p)
+        if corridor_list:
+            for c_name in corridor_list: st.write(f"- {c_name}")
+        else: st.caption("없음")
+    with col_tbl:
+        st.markdown(f"#### 📌 {d}일차 {p}교시")
+        for kind, labels in current_report().slot(d, p).items():
+            st.error(f"⚠️ {VIOLATION_KINDS[kind]}: {', '.join(labels)}")
+        changes = st.session_state.get("last_changes")
+        moved = slot_rooms(changes, d, p) if changes is not None else set()
+        if moved: st.info(f"🔀 이전 배정 대비 바뀐 교실: {', '.join(f'{g}-{c}반' for g, c in sorted(moved))}")
+        slot = asgn.get((d, p), {})
+        for g in range(1, num_grades + 1):
+            if int(periods_by_day_grade[d-1][g-1]) < p: continue
+            pairs = [slot.get((g, c), (UNASSIGNED, UNASSIGNED)) for c in range(1, classes_per_grade + 1)]
+            df_v = pd.DataFrame([[x if x != UNASSIGNED else "" for x in col] for col in zip(*pairs)], index=["정감독", "부감독"], columns=[f"{g}-{c}반" for c in range(1, classes_per_grade + 1)])
+            st.write(f"**{g}학년**")
+            key = f"ed_{st.session_state['asgn_gen']}_{st.session_state['ed_epoch']}_{d}_{p}_{g}"  # 배정 교체·실행 취소 때 편집 상태도 새로 시작
+            st.data_editor(df_v, key=key, use_container_width=True, on_change=apply_edits, args=(key, d, p, g))
+    if st.session_state["asgn_rev"] != st.session_state.get("rev_rendered"):
+        c1, c2 = st.columns([4, 1])
+        c1.caption("수정 내용은 아래 통계·Excel에 아직 반영되지 않았습니다.")
+        if c2.button("📊 통계·Excel 갱신", use_container_width=True): st.rerun()
+
 asgn = st.session_state.get("assignments", {})
 if asgn:
     st.markdown("---")
-    day_tabs = st.tabs([f"{d}일차" for d in range(1, num_days + 1)] + ["📊 통계"])
-    teacher_info_map = {t.name: t for t in st.session_state["all_teachers"]}
-
-    for d in range(1, num_days + 1):
-        with day_tabs[d-1]:
-            d_max_p = max(int(periods_by_day_grade[d-1][g-1]) for g in range(1, num_grades+1))
-            for p in range(1, d_max_p + 1):
-                col_tbl, col_corridor = st.columns([4, 1])
-                corridor_list = [t.name for t in st.session_state["all_teachers"] if hasattr(t, 'specific_excludes') and (d, p) in t.specific_excludes]
-                with col_corridor:
-                    st.markdown(f"**🚶 복도감독 ({p}교시)**")
-                    if corridor_list:
-                        for c_name in corridor_list: st.write(f"- {c_name}")
-                    else: st.caption("없음")
-                with col_tbl:
-                    st.markdown(f"#### 📌 {p}교시")
-                    curr_names = []
-                    class_conflicts = []
-                    for g in range(1, num_grades + 1):
-                        if int(periods_by_day_grade[d-1][g-1]) < p: continue
-                        for c in range(1, classes_per_grade + 1):
-                            pair = asgn.get((d, p), {}).get((g, c), ("(미배정)", "(미배정)"))
-                            for i, name in enumerate(pair):
-                                if name != "(미배정)":
-                                    curr_names.append(name)
-                                    if name in teacher_info_map:
-                                        t_obj = teacher_info_map[name]
-                                        if (g, c) in t_obj.exclude_classes or (g, c) in t_obj.extra_classes:
-                                            class_conflicts.append(f"{name}({g}-{c} 기피)")
-                    dupes = set([n for n in curr_names if curr_names.count(n) > 1])
-                    confs = set([n for n in curr_names if n in corridor_list])
-                    if dupes: st.error(f"⚠️ 중복 배정: {', '.join(dupes)}")
-                    if confs: st.error(f"⚠️ 복도감독 충돌: {', '.join(confs)}")
-                    if class_conflicts: st.error(f"⚠️ 기피학급 위반: {', '.join(set(class_conflicts))}")
-                    for g in range(1, num_grades + 1):
-                        if int(periods_by_day_grade[d-1][g-1]) < p: continue
-                        cols = [f"{g}-{c}반" for c in range(1, classes_per_grade + 1)]
-                        df_v = pd.DataFrame("", index=["정감독", "부감독"], columns=cols)
-                        slot = asgn.get((d, p), {})
-                        for c in range(1, classes_per_grade + 1):
-                            pair = slot.get((g, c), ("(미배정)", "(미배정)"))
-                            df_v.loc["정감독", f"{g}-{c}반"] = pair[0] if pair[0] != "(미배정)" else ""
-                            df_v.loc["부감독", f"{g}-{c}반"] = pair[1] if pair[1] != "(미배정)" else ""
-                        st.write(f"**{g}학년**")
-                        edited = st.data_editor(df_v, key=f"ed_{d}_{p}_{g}", use_container_width=True)
-                        for row_l, row_v in edited.iterrows():
-                            is_ch = "정" in row_l
-                            for col_l, val in row_v.items():
-                                try:
-                                    c_n = int(col_l.split("-")[1].replace("반",""))
-                                    if (d, p) not in asgn: asgn[(d, p)] = {}
-                                    pair = list(asgn[(d, p)].get((g, c_n), ("(미배정)", "(미배정)")))
-                                    val_s = str(val).strip() if val else "(미배정)"
-                                    if is_ch: pair[0] = val_s
-                                    else: pair[1] = val_s
-                                    asgn[(d, p)][(g, c_n)] = tuple(pair)
-                                except: continue
-                st.markdown("---")
-    
-    with day_tabs[-1]:
-        all_t = st.session_state.get("all_teachers", [])
+    st.session_state["rev_rendered"] = st.session_state["asgn_rev"]  # 이번 전체 실행의 통계·Excel이 반영하는 수정 번호
+    slot_view()
+    all_t = st.session_state.get("all_teachers", [])
+    df_t_stats, df_p_stats = current_stats()
+    with st.expander("📊 통계", expanded=False):
         st.write("### 교사 통계 (수동 입력 & 복도감독 포함)")
-        df_t_stats = pd.DataFrame(compute_teacher_stats(asgn, all_t))
         st.dataframe(df_t_stats, use_container_width=True)
         st.write("### 학부모 현황")
-        df_p_stats = pd.DataFrame(compute_parent_stats(asgn, all_t, num_days))
         st.dataframe(df_p_stats, use_container_width=True)
+        st.write("### 일차별 배정 (정+부)")
+        st.dataframe(current_agg().daily_frame(), use_container_width=True)
+        if st.button("📚 이번 학기 누적 기록", help="교사별 정/부/복도감독 횟수를 학기 누적 장부(저장소)에 저장 — 같은 학기 이름이면 덮어씀"):
+            client = get_client()
+            if client is None or not term_name.strip(): st.error("저장소(Supabase/SQLite) 설정과 사이드바의 '이번 학기 이름'이 필요합니다.")
+            else:
+                sid = next((s["id"] for s in list_sessions(client) if s["name"] == term_name.strip()), None) or create_session(client, term_name.strip(), {"days": num_days, "grades": num_grades, "classes": classes_per_grade})
+                if sid:
+                    save_ledger(client, sid, rollup(asgn, all_t).to_dict("records"))
+                    st.session_state.pop("ledger", None)
+                    st.success(f"'{term_name.strip()}' 누적 기록 완료")
 
-    buf = BytesIO()
-    with pd.ExcelWriter(buf, engine='xlsxwriter') as writer:
-        wb = writer.book; f_h = wb.add_format({"bold":True,"bg_color":"#4472C4","font_color":"white","border":1,"align":"center"})
-        f_c = wb.add_format({"bg_color":"#DDEEFF","border":1,"align":"center"}); f_a = wb.add_format({"bg_color":"#EEFFDD","border":1,"align":"center"})
-        f_m = wb.add_format({"bg_color":"#FFDDDD","font_color":"#999999","border":1,"align":"center"}); f_p = wb.add_format({"bold":True,"bg_color":"#F2F2F2","border":1})
-        for d in range(1, num_days + 1):
-            ws = wb.add_worksheet(f"{d}일차"); ws.set_column(0, 0, 15); row_i = 0
-            d_max_p = max(int(periods_by_day_grade[d-1][g-1]) for g in range(1, num_grades+1))
-            for p in range(1, d_max_p + 1):
-                ws.merge_range(row_i, 0, row_i, classes_per_grade, f"[{p}교시]", f_p); row_i += 1
-                for g in range(1, num_grades + 1):
-                    if int(periods_by_day_grade[d-1][g-1]) < p: continue
-                    ws.write(row_i, 0, f"{g}학년", f_h)
-                    for c in range(1, classes_per_grade + 1):
-                        ws.write(row_i, c, f"{g}-{c}반", f_h)
-                        ws.set_column(c, c, 10)
-                    row_i += 1; ws.write(row_i, 0, "정감독", f_h); slot_p = asgn.get((d, p), {})
-                    for c in range(1, classes_per_grade + 1):
-                        name_ch = slot_p.get((g, c), ("(미배정)", ""))[0]
-                        ws.write(row_i, c, name_ch, f_m if name_ch == "(미배정)" else f_c)
-                    row_i += 1; ws.write(row_i, 0, "부감독", f_h)
-                    for c in range(1, classes_per_grade + 1):
-                        name_as = slot_p.get((g, c), ("", "(미배정)"))[1]
-                        ws.write(row_i, c, name_as, f_m if name_as == "(미배정)" else f_a)
-                    row_i += 2
-                row_i += 1
-        if not df_t_stats.empty: df_t_stats.to_excel(writer, sheet_name="교사통계", index=False)
-        if not df_p_stats.empty: df_p_stats.to_excel(writer, sheet_name="학부모현황", index=False)
-    st.download_button("📥 Excel 다운로드", buf.getvalue(), f"schedule_final.xlsx", use_container_width=True)
+    xlsx = get_workbook(asgn, num_days, num_grades, classes_per_grade, periods_by_day_grade, df_t_stats, df_p_stats, wait=False)
+    if xlsx is not None: st.download_button("📥 Excel 다운로드", xlsx, f"schedule_final.xlsx", use_container_width=True)
+    else:
+        st.info("⏳ Excel 파일 생성 중... 잠시 후 새로고침하세요.")
+        if st.button("🔄 새로고침", use_container_width=True): st.rerun()
+    if st.button("📦 개인 시간표 zip 만들기", use_container_width=True, help="교사·학부모마다 xlsx 한 파일 (정·부·복도감독) — 300명 기준 수 초"):
+        buf = io.BytesIO()  # 세션당 최신 zip 하나만 메모리에 (임시 파일을 남기지 않음)
+        with st.spinner("개인 시간표 생성 중..."): n = write_timetable_zip(buf, asgn, all_t, num_days, periods_by_day_grade)
+        st.session_state["timetable_zip"] = (buf.getvalue(), n, st.session_state["asgn_gen"], st.session_state["asgn_rev"])
+    data, n, gen, rev = st.session_state.get("timetable_zip", (b"", 0, None, None))
+    if data and (gen, rev) == (st.session_state["asgn_gen"], st.session_state["asgn_rev"]):  # 수정 후에는 다시 만들어야 함
+        st.download_button(f"📥 개인 시간표 zip ({n}명)", data, "timetables.zip", "application/zip", use_container_width=True)
+
+# ══════════════════════════════════════════════════════════════
+# 디버그: 성능 계측
+# ══════════════════════════════════════════════════════════════
+if debug:
+    st.markdown("---")
+    st.subheader("🔬 성능 계측")
+    rep = profiling.report(st.session_state["profile_rec"])
+    c1, c2 = st.columns([2, 1])
+    with c1: st.write("단계별 시간"); st.dataframe(pd.DataFrame.from_dict(rep["stages"], orient="index"), use_container_width=True)
+    with c2: st.write("카운터"); st.json(rep["counters"])
+    if rep["slots"]:
+        st.write("교시별 통계 (최근)"); st.dataframe(pd.DataFrame(rep["slots"]).tail(500), use_container_width=True, hide_index=True)
+    b1, b2 = st.columns(2)
+    with b1:
+        if st.button("⏱️ cProfile로 배정 1회 실행", use_container_width=True) and not t_df.empty:
+            _, text = profiling.profile_call(run_assignment, current_teachers(), num_days, num_grades, classes_per_grade, periods_by_day_grade, engine=engine)
+            st.code(text)
+    with b2:
+        if st.button("🧹 계측 초기화", use_container_width=True): st.session_state["profile_rec"].reset(); st.rerun()
+    st.download_button("📄 보고서 JSON", json.dumps(rep, ensure_ascii=False, indent=1, default=str), "profile.json", use_container_width=True)
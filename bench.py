@@ -0,0 +1,110 @@
+# bench.py — 합성 학교 데이터로 단계별 성능 측정 + 결과 동일성 검증
+#   python -m bench                         # 기본 크기 그리드, JSON 결과를 stdout으로
+#   python -m bench --sizes small,xl -o new.json
+#   python -m bench --compare old.json new.json   # 버전 간 시간 비교 + 출력 다이제스트 비교
+from __future__ import annotations
+import argparse, hashlib, json, random, sys, time, tracemalloc
+import pandas as pd
+from scheduler import build_teachers, run_assignment, compute_teacher_stats, compute_parent_stats, ENGINES, SOLVERS
+from store import AssignmentStore
+
+# 이름: (일수, 학년 수, 학급 수, 교사 수, 학부모 수, 일차별 교시)
+SIZES = {
+    "small":  (4, 3, 8, 40, 10, 2),
+    "medium": (5, 3, 12, 80, 20, 3),
+    "large":  (10, 6, 20, 180, 40, 3),
+    "xl":     (10, 6, 30, 240, 60, 3),
+}
+
+def make_school(num_days: int, num_grades: int, classes: int, n_teachers: int, n_parents: int, periods: int, seed: int = 0):
+    """실제 명단과 비슷한 규칙 문자열을 가진 (t_df, p_df, periods_by_day_grade) 생성. 같은 seed면 항상 같은 결과."""
+    r = random.Random(seed)
+    def rule():
+        k = r.random()
+        if k < .35: return f"D{r.randint(1, num_days)}P{r.randint(1, periods)}"
+        if k < .55: return f"{r.randint(1, num_grades)}-{r.randint(1, classes)}"
+        if k < .65: return f"D{r.randint(1, num_days)}"
+        return f"D{r.randint(1, num_days)}P{r.randint(1, periods)}@{r.randint(1, num_grades)}-{r.randint(1, classes)}"
+    def extra():
+        if r.random() > .15: return ""
+        g, c = r.randint(1, num_grades), r.randint(1, classes)
+        return f"{g}-{c}~{min(classes, c + r.randint(0, 2))}" if r.random() < .5 else f"{g}-{c}"
+    t_rows = [{"name": f"교사{i:03d}", "exclude": "; ".join(rule() for _ in range(r.choice((0, 0, 1, 1, 2, 3)))),
+               "extra_classes": extra(), "priority": r.choice((None, None, None, 1, 2, 3))} for i in range(n_teachers)]
+    p_rows = [{"name": f"학부모{i:03d}", "available": ";".join(sorted({f"D{r.randint(1, num_days)}" for _ in range(r.randint(1, 3))})),
+               "extra_classes": "", "priority": None} for i in range(n_parents)]
+    pbd = [[max(1, periods - (r.random() < .2)) for _ in range(num_grades)] for _ in range(num_days)]
+    return pd.DataFrame(t_rows), pd.DataFrame(p_rows), pbd
+
+def digest(assignments: dict) -> str:
+    """배정 결과의 정규화 해시 — 성능 변경 전후 출력 동일성 확인용"""
+    h = hashlib.sha256()
+    for (d, p) in sorted(assignments):
+        for (g, c), (ch, ass) in sorted(assignments[(d, p)].items()):
+            h.update(f"{d},{p},{g},{c},{ch},{ass}\n".encode())
+    return h.hexdigest()[:16]
+
+def _measure(fn, *args, repeat: int = 1, **kw):
+    """(결과, 최소 소요 초, 최대 메모리 KiB)"""
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = fn(*args, **kw); best = min(best, time.perf_counter() - t0)
+    tracemalloc.start(); fn(*args, **kw); peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return out, best, peak // 1024
+
+def bench_size(name: str, repeat: int = 3, seed: int = 0, export: bool = True) -> dict:
+    num_days, num_grades, classes, n_t, n_p, periods = SIZES[name]
+    t_df, p_df, pbd = make_school(num_days, num_grades, classes, n_t, n_p, periods, seed)
+    layout = (num_days, num_grades, classes, pbd)
+    res = {"size": name, "days": num_days, "grades": num_grades, "classes": classes, "teachers": n_t, "parents": n_p, "seed": seed, "stages": {}, "digest": {}}
+    teachers, sec, kib = _measure(build_teachers, t_df, p_df, num_days, repeat=repeat)
+    res["stages"]["build_teachers"] = {"s": sec, "peak_kib": kib}
+    for engine in SOLVERS:
+        out, sec, kib = _measure(run_assignment, teachers, *layout, engine=engine, repeat=repeat)
+        res["stages"][f"run_assignment[{engine}]"] = {"s": sec, "peak_kib": kib}
+        res["digest"][engine] = digest(out)
+        res.setdefault("unassigned", {})[engine] = AssignmentStore.from_dict(out).unassigned_count()
+        if engine in ENGINES: asgn = out
+    t_stats, sec, kib = _measure(compute_teacher_stats, asgn, teachers, repeat=repeat)
+    res["stages"]["compute_teacher_stats"] = {"s": sec, "peak_kib": kib}
+    p_stats, sec, kib = _measure(compute_parent_stats, asgn, teachers, num_days, repeat=repeat)
+    res["stages"]["compute_parent_stats"] = {"s": sec, "peak_kib": kib}
+    if export:
+        from export import build_workbook
+        _, sec, kib = _measure(build_workbook, asgn, *layout, pd.DataFrame(t_stats), pd.DataFrame(p_stats), repeat=1)
+        res["stages"]["build_workbook"] = {"s": sec, "peak_kib": kib}
+    res["oracle_ok"] = len({res["digest"][e] for e in ENGINES}) == 1  # 탐욕 엔진은 모두 기존(sort) 결과와 동일해야 함 (flow는 빈 칸 수만 기록)
+    return res
+
+def compare(old: list[dict], new: list[dict]) -> list[str]:
+    """두 결과 파일 비교: 단계별 시간 비율, 다이제스트 변경 여부"""
+    lines, old_map = [], {(r["size"], r["seed"]): r for r in old}
+    for r in new:
+        o = old_map.get((r["size"], r["seed"]))
+        if o is None: continue
+        for stage, v in r["stages"].items():
+            if stage in o["stages"]:
+                lines.append(f"{r['size']:>7} {stage:<28} {o['stages'][stage]['s']:.4f}s → {v['s']:.4f}s (x{o['stages'][stage]['s'] / max(v['s'], 1e-9):.2f})")
+        if o["digest"].get("sort") != r["digest"].get("sort"): lines.append(f"{r['size']:>7} ⚠️ 배정 결과가 달라졌습니다 ({o['digest'].get('sort')} → {r['digest'].get('sort')})")
+    return lines
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench", description="시감 배정 벤치마크")
+    ap.add_argument("--sizes", default="small,medium,large", help=f"쉼표 구분: {', '.join(SIZES)}")
+    ap.add_argument("--repeat", type=int, default=3); ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-export", action="store_true"); ap.add_argument("-o", "--output")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = ap.parse_args(argv)
+    if args.compare:
+        old, new = (json.load(open(p, encoding="utf-8")) for p in args.compare)
+        lines = compare(old, new); print("\n".join(lines))
+        return 1 if any("⚠️" in l for l in lines) else 0
+    results = [bench_size(s.strip(), args.repeat, args.seed, not args.no_export) for s in args.sizes.split(",")]
+    text = json.dumps(results, ensure_ascii=False, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text)
+    else: print(text)
+    return 0 if all(r["oracle_ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
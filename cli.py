@@ -0,0 +1,123 @@
+# cli.py — Streamlit 없이 배정 실행 (단건/배치)
+#   python -m cli run --teachers t.csv --parents p.csv --days 4 --grades 3 --classes 8 --periods 2 --out out/
+#   python -m cli batch configs.json
+# streamlit·gspread·google-auth는 import하지 않는다.
+from __future__ import annotations
+import argparse, json, os, sys, time
+import pandas as pd
+import profiling
+from ingest import RosterIngest, ROLES
+from scheduler import run_assignment, assignments_to_df, SOLVERS
+
+PATH_KEYS = ("teachers", "parents", "out", "history")  # batch 설정 파일에서 파일 기준 상대 경로로 푸는 키
+FORMATS = ("xlsx", "json", "csv")  # 기본 출력 — "zip"(개인 시간표)은 지정할 때만
+
+def read_roster_csv(path: str | None) -> pd.DataFrame:
+    """열 이름 소문자·공백 제거 (ingest.SheetFeed와 같은 정규화), 없으면 빈 DataFrame"""
+    if not path: return pd.DataFrame()
+    df = pd.read_csv(path)
+    if not df.empty: df.columns = [c.strip().lower() for c in df.columns]
+    return df
+
+def parse_periods(raw, num_days: int, num_grades: int) -> list[list[int]]:
+    """정수(모든 일차·학년 동일) | "2,2,2;1,1,1"(일차별 ;, 학년별 ,) | [[...], ...] → periods_by_day_grade"""
+    if isinstance(raw, list): rows = [[int(x) for x in r] for r in raw]
+    elif isinstance(raw, int) or str(raw).strip().isdigit(): rows = [[int(raw)] * num_grades for _ in range(num_days)]
+    else: rows = [[int(x) for x in day.split(",")] for day in str(raw).split(";")]
+    if len(rows) != num_days or any(len(r) != num_grades for r in rows):
+        raise ValueError(f"periods 형식 오류: {num_days}일 × {num_grades}학년이어야 합니다 ({raw})")
+    return rows
+
+def run_config(cfg: dict) -> dict:
+    """설정 1건 실행 → 출력 파일 기록, 요약 dict 반환"""
+    t0 = time.perf_counter()
+    num_days, num_grades, classes = int(cfg["days"]), int(cfg["grades"]), int(cfg["classes"])
+    periods = parse_periods(cfg.get("periods", 2), num_days, num_grades)
+    ingest = RosterIngest()
+    for role, key in zip(ROLES, ("teachers", "parents")):
+        if not cfg.get(key): continue
+        with open(cfg[key], encoding="utf-8-sig", newline="") as f: ingest.read(role, f)
+    teachers = ingest.teachers(num_days)
+    from feasibility import analyze
+    capacity = analyze(teachers, num_days, num_grades, classes, periods)
+    history = None
+    if cfg.get("history"):  # 학기 누적 장부 CSV (ledger.COLS) → 카운터 초기값
+        from ledger import Ledger
+        history = Ledger(pd.read_csv(cfg["history"])).seed(teachers, since=cfg.get("history_since"), max_gap=cfg.get("history_gap"))
+    if cfg.get("search_s"):
+        from search import search_assignment
+        asgn, _, _ = search_assignment(teachers, num_days, num_grades, classes, periods, budget_s=float(cfg["search_s"]), engine=cfg.get("engine", "heap"), history=history)
+    else:
+        asgn = run_assignment(teachers, num_days, num_grades, classes, periods, engine=cfg.get("engine", "heap"), history=history)
+    out = cfg.get("out", "."); os.makedirs(out, exist_ok=True)
+    stem = os.path.join(out, cfg.get("name", "schedule"))
+    formats = cfg.get("formats", FORMATS)
+    if isinstance(formats, str): formats = formats.split(",")
+    if "csv" in formats: assignments_to_df(asgn).to_csv(f"{stem}.csv", index=False, encoding="utf-8-sig")
+    if "json" in formats:
+        from db import assignments_to_json
+        with open(f"{stem}.json", "w", encoding="utf-8") as f: f.write(assignments_to_json(asgn))
+    if "xlsx" in formats:
+        from export import build_workbook
+        from stats import StatsAggregator
+        agg = StatsAggregator(asgn, teachers, num_days)
+        df_t, df_p = agg.teacher_frame(), agg.parent_frame()
+        with open(f"{stem}.xlsx", "wb") as f: f.write(build_workbook(asgn, num_days, num_grades, classes, periods, df_t, df_p))
+    if "zip" in formats:
+        from export import write_timetable_zip
+        write_timetable_zip(f"{stem}_timetables.zip", asgn, teachers, num_days, periods)
+    unassigned = sum(v == "(미배정)" for ps in asgn.values() for pair in ps.values() for v in pair)
+    return {"name": cfg.get("name", "schedule"), "teachers": len(teachers), "unassigned": unassigned, "min_unassigned": capacity.min_unassigned, "roster_issues": len(ingest.issues()), "seconds": round(time.perf_counter() - t0, 4)}
+
+def run_batch(configs: list[dict], defaults: dict | None = None) -> list[dict]:
+    """여러 설정(학교·학기)을 한 프로세스에서 순서대로 실행. 실패한 설정은 error로 기록하고 계속 진행."""
+    results = []
+    for i, cfg in enumerate(configs):
+        cfg = {**(defaults or {}), "name": f"config{i + 1}", **cfg}
+        try: results.append(run_config(cfg))
+        except Exception as e: results.append({"name": cfg["name"], "error": str(e)})
+    return results
+
+def load_batch(path: str) -> tuple[list[dict], dict]:
+    """batch 설정 파일 → (configs, defaults). 상대 경로(PATH_KEYS)는 configs·defaults 모두 설정 파일 기준으로 풀어 둔다."""
+    with open(path, encoding="utf-8") as f: spec = json.load(f)
+    if isinstance(spec, list): spec = {"configs": spec}
+    configs, defaults = spec["configs"], spec.get("defaults") or {}
+    base = os.path.dirname(os.path.abspath(path))
+    for cfg in [*configs, defaults]:
+        for k in PATH_KEYS:
+            if cfg.get(k) and not os.path.isabs(cfg[k]): cfg[k] = os.path.join(base, cfg[k])
+    return configs, defaults
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m cli", description="시험 시감 자동 배정 (헤드리스)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="설정 1건 실행")
+    r.add_argument("--teachers", required=True); r.add_argument("--parents")
+    r.add_argument("--days", type=int, required=True); r.add_argument("--grades", type=int, required=True); r.add_argument("--classes", type=int, required=True)
+    r.add_argument("--periods", default="2", help='정수 또는 "2,2,2;1,1,1" (일차별 ;, 학년별 ,)')
+    r.add_argument("--engine", default="heap", choices=SOLVERS); r.add_argument("--search-s", type=float, default=0)
+    r.add_argument("--history", help="학기 누적 장부 CSV (session_id,term_at,name,role,chief,assistant,corridor)"); r.add_argument("--history-since")
+    r.add_argument("--out", default="."); r.add_argument("--name", default="schedule"); r.add_argument("--formats", default=",".join(FORMATS))
+    ap.add_argument("--profile", action="store_true", help="단계별 시간·교시 통계를 결과 JSON에 포함")
+    b = sub.add_parser("batch", help="JSON 설정 목록 실행 ([{...}, ...] 또는 {\"defaults\": {...}, \"configs\": [...]})")
+    b.add_argument("config")
+    m = sub.add_parser("migrate", help="저장소의 이전 형식 배정(JSON 통째 저장)을 칸 단위 행으로 변환")
+    m.add_argument("--session", help="세션 id (없으면 남은 세션 전부)")
+    args = ap.parse_args(argv)
+    profiling.enable(args.profile)
+    if args.cmd == "migrate":
+        from db import get_client, migrate_assignments
+        client = get_client()
+        results = [{"error": "저장소 설정 없음 (SUPABASE_URL/SUPABASE_KEY 또는 STORAGE_BACKEND)"}] if client is None else [{"migrated": migrate_assignments(client, args.session)}]
+    elif args.cmd == "run":
+        results = [run_config({k: v for k, v in vars(args).items() if k not in ("cmd", "profile")})]
+    else:
+        configs, defaults = load_batch(args.config)
+        results = run_batch(configs, defaults)
+    if args.profile: results.append({"profile": {k: v for k, v in profiling.report().items() if k != "slots"}})
+    json.dump(results, sys.stdout, ensure_ascii=False, indent=1); print()
+    return 1 if any("error" in r for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# clients.py — Google Sheets / Supabase 클라이언트·시트 핸들 프로세스 단위 캐시 (Streamlit 세션 간 공유)
+# gspread·google-auth·supabase는 처음 쓸 때만 import
+from __future__ import annotations
+import json, sys, threading, time
+from dataclasses import dataclass, field
+
+CLIENT_TTL = 45 * 60   # 인증 클라이언트: 토큰 만료(1시간) 전에 새로 발급
+HANDLE_TTL = 10 * 60   # 스프레드시트/워크시트 핸들
+
+@dataclass
+class _Stat:
+    calls: int = 0
+    errors: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+@dataclass
+class ClientPool:
+    """key → (값, 만료 시각). get()은 만료됐거나 없으면 factory()로 새로 만든다. 모든 메서드는 스레드 안전."""
+    hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    _items: dict = field(default_factory=dict)
+    _stats: dict = field(default_factory=dict)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def get(self, key, factory, ttl: float):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[1] > time.monotonic(): self.hits += 1; return item[0]
+            self.misses += 1
+        value = self.timed(f"create:{key[0]}", factory)  # 네트워크 호출 동안 다른 키 조회를 막지 않도록 잠금 밖에서 생성
+        with self._lock: self._items[key] = (value, time.monotonic() + ttl)
+        return value
+
+    def invalidate(self, prefix=None):
+        """prefix(키 첫 요소)가 같은 항목 제거, None이면 전체"""
+        with self._lock:
+            for k in [k for k in self._items if prefix is None or k[0] == prefix]: del self._items[k]
+
+    def discard(self, key):
+        with self._lock: self._items.pop(key, None)
+
+    def timed(self, op: str, fn, *args, **kw):
+        t0 = time.perf_counter(); err = False
+        try: return fn(*args, **kw)
+        except Exception: err = True; raise
+        finally:
+            dt = time.perf_counter() - t0
+            with self._lock:
+                s = self._stats.setdefault(op, _Stat()); s.calls += 1; s.errors += err; s.total_s += dt; s.max_s = max(s.max_s, dt)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "refreshes": self.refreshes, "hit_rate": round(self.hits / total, 3) if total else None,
+                    "cached": len(self._items),
+                    "ops": {op: {"calls": s.calls, "errors": s.errors, "avg_ms": round(1000 * s.total_s / s.calls, 1), "max_ms": round(1000 * s.max_s, 1)} for op, s in sorted(self._stats.items())}}
+
+POOL = ClientPool()
+
+def is_auth_error(e: Exception) -> bool:
+    """토큰 만료·인증 실패 — 캐시를 비우고 한 번 재시도할 대상"""
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    return status in (401, 403) or type(e).__name__ in ("RefreshError", "InvalidGrant", "AuthApiError")
+
+def with_refresh(op: str, fn, prefix: str = "gspread"):
+    """fn() 실행, 인증 오류면 prefix 캐시를 비우고 한 번 더"""
+    try: return POOL.timed(op, fn)
+    except Exception as e:
+        if not is_auth_error(e): raise
+        POOL.invalidate(prefix)
+        with POOL._lock: POOL.refreshes += 1
+        return POOL.timed(op, fn)
+
+# ── Google Sheets ─────────────────────────────────
+def _service_account_info() -> dict:
+    st = sys.modules.get("streamlit")
+    if st is not None and "gcp_service_account" in st.secrets: return json.loads(st.secrets["gcp_service_account"])
+    with open("service_account.json") as f: return json.load(f)
+
+def _authorize():
+    import gspread
+    from google.oauth2.service_account import Credentials
+    scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+    return gspread.authorize(Credentials.from_service_account_info(_service_account_info(), scopes=scope))
+
+def get_gspread_client():
+    """캐시된 gspread 클라이언트, 자격 증명이 없으면 None"""
+    try: return POOL.get(("gspread", "client"), _authorize, CLIENT_TTL)
+    except Exception: return None
+
+def open_spreadsheet(url: str):
+    client = get_gspread_client()
+    if client is None: return None
+    return POOL.get(("gspread", "sheet", url), lambda: with_refresh("open_by_url", lambda: get_gspread_client().open_by_url(url)), HANDLE_TTL)
+
+def get_worksheet(url: str, tab: str, create: tuple[str, str] | None = None):
+    """캐시된 워크시트 핸들. 없으면 create=(rows, cols)로 만들고, create가 None이면 예외."""
+    def factory():
+        sh = open_spreadsheet(url)
+        if sh is None: raise RuntimeError("구글 시트 인증 정보가 없습니다")
+        try: return with_refresh("worksheet", lambda: sh.worksheet(tab))
+        except Exception:
+            if create is None: raise
+            return with_refresh("add_worksheet", lambda: sh.add_worksheet(title=tab, rows=create[0], cols=create[1]))
+    return POOL.get(("gspread", "ws", url, tab), factory, HANDLE_TTL)
+
+def sheet_call(op: str, url: str, tab: str, fn, create: tuple[str, str] | None = None):
+    """fn(ws) 실행 — 인증 오류면 핸들을 새로 받아 한 번 재시도, 그 밖의 오류면 핸들을 버리고 예외 전달 (탭 삭제 등)"""
+    try: return with_refresh(op, lambda: fn(get_worksheet(url, tab, create)))
+    except Exception:
+        POOL.discard(("gspread", "ws", url, tab)); raise
@@ -4,49 +4,136 @@ Supabase 연동 모듈
 - 시험 세션(exam session) 단위로 데이터 저장/불러오기
 - 배정 결과, 이전 누적 통계 저장
 - Streamlit secrets 기반 설정
+- client 자리에 storage.py의 저장소(SQLite, 읽기 캐시)가 오면 같은 이름의 메서드로 위임
 
 필요한 Supabase 테이블 DDL (README.md 참조):
-  exam_sessions, day_teachers, assignments, cumulative_stats
+  exam_sessions, day_teachers, assignments, assignment_cells, cumulative_stats, fairness_ledger
 """
 
 from __future__ import annotations
+import importlib.util
 import json
+import logging
 import os
-import streamlit as st
+import sys
+from functools import wraps
+import pandas as pd
+from persist import CELL_COLS, KEY, SaveFailed, as_store, cell_changes
+from profiling import stage, timed
+from storage import CachedBackend, SQLiteBackend, StorageBackend
+from store import AssignmentStore
 
-try:
-    from supabase import create_client, Client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
+# streamlit·supabase는 실제로 쓸 때만 import → CLI/배치에서 가볍게 로드
+SUPABASE_AVAILABLE = importlib.util.find_spec("supabase") is not None
+log = logging.getLogger(__name__)
 
 
-def get_client() -> "Client | None":
-    """Supabase 클라이언트 반환. 설정 없으면 None."""
-    if not SUPABASE_AVAILABLE:
-        return None
+def _script_context() -> bool:
+    """Streamlit 스크립트 스레드 안인지 (작업 큐 워커 등 다른 스레드에서는 화면에 쓸 수 없음)"""
+    try: from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError: return False
+    try: return get_script_run_ctx(suppress_warning=True) is not None
+    except TypeError: return get_script_run_ctx() is not None  # 오래된 streamlit
+
+
+def _notify(level: str, msg: str):
+    """Streamlit 스크립트 실행 중에는 화면에(st.error/st.warning), 그 외(CLI, 백그라운드 스레드)에는 logging으로"""
+    st = sys.modules.get("streamlit")
+    if st is not None and _script_context(): getattr(st, level)(msg)
+    else: getattr(log, level)(msg)
+
+
+def _secrets() -> tuple[str | None, str | None]:
+    """Supabase url/key: 앱 실행 중이면 st.secrets, 아니면(또는 없으면) 환경변수 SUPABASE_URL/SUPABASE_KEY"""
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try: return st.secrets["supabase"]["url"], st.secrets["supabase"]["key"]
+        except Exception: pass
+    return os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+
+
+def _create_client(url: str | None, key: str | None) -> "Client | None":
+    if not url or not key: return None
     try:
-        url = st.secrets["supabase"]["url"]
-        key = st.secrets["supabase"]["key"]
+        from supabase import create_client
         return create_client(url, key)
     except Exception:
         return None
 
 
+def _storage_settings() -> dict:
+    """저장소 종류: st.secrets["storage"] (backend, path, ttl) 또는 환경변수 STORAGE_BACKEND / SQLITE_PATH / STORAGE_TTL"""
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try: return dict(st.secrets["storage"])
+        except Exception: pass
+    return {"backend": os.environ.get("STORAGE_BACKEND", "supabase"), "path": os.environ.get("SQLITE_PATH", "daedong.db"), "ttl": os.environ.get("STORAGE_TTL", 30)}
+
+
+def _supabase_client() -> "Client | None":
+    if not SUPABASE_AVAILABLE:
+        return None
+    from clients import POOL, CLIENT_TTL
+    client = POOL.get(("supabase", "client"), lambda: _create_client(*_secrets()), CLIENT_TTL)
+    if client is None: POOL.invalidate("supabase")  # 설정이 생기면 다음 호출에서 다시 시도
+    return client
+
+
+def get_client(url: str | None = None, key: str | None = None) -> "Client | StorageBackend | None":
+    """저장소 반환. 설정 없으면 None.
+    - backend="supabase"(기본): Supabase 클라이언트 — url/key를 주지 않으면 설정값으로 만든 클라이언트를 프로세스 단위로 캐시 (clients.POOL)
+    - backend="sqlite": 로컬 SQLite 파일 (Supabase 없이 앱·CLI 실행)
+    - backend="cached": Supabase + 로컬 SQLite 읽기 캐시 (Supabase에 닿지 않으면 로컬 사본으로 동작)"""
+    if url and key:
+        return _create_client(url, key) if SUPABASE_AVAILABLE else None
+    cfg = _storage_settings()
+    kind = str(cfg.get("backend") or "supabase").lower()
+    if kind == "supabase":
+        return _supabase_client()
+    from clients import POOL
+    path, ttl = str(cfg.get("path") or "daedong.db"), float(cfg.get("ttl") or 30)
+    if kind == "sqlite":
+        return POOL.get(("storage", "sqlite", path), lambda: SQLiteBackend(path), float("inf"))
+    if kind == "cached":
+        return POOL.get(("storage", "cached", path), lambda: CachedBackend(_supabase_client, SQLiteBackend(path), ttl), float("inf"))
+    _notify("error", f"알 수 없는 저장소 종류: {kind} (supabase / sqlite / cached)")
+    return None
+
+
+def _dispatch(name: str, default=None):
+    """Supabase 함수 데코레이터: client가 StorageBackend면 같은 이름의 메서드로 위임 (실패 시 default, SaveFailed는 그대로 전달), 아니면 원래 함수.
+    계측 이름은 supabase.<함수> / sqlite.<함수> / cached.<함수>"""
+    def deco(fn):
+        remote = timed(f"supabase.{name}")(fn)
+        @wraps(fn)
+        def wrapper(client, *args, **kw):
+            if not isinstance(client, StorageBackend): return remote(client, *args, **kw)
+            with stage(f"{client.kind}.{name}"):
+                try: return getattr(client, name)(*args, **kw)
+                except SaveFailed: raise
+                except Exception as e:
+                    _notify("warning", f"로컬 저장소 {name} 실패: {e}")
+                    return default() if callable(default) else default
+        return wrapper
+    return deco
+
+
 # ──────────────────────────────────────────
 # 시험 세션 관리
 # ──────────────────────────────────────────
 
+@_dispatch("list_sessions", list)
 def list_sessions(client) -> list[dict]:
     """저장된 시험 세션 목록 반환"""
     try:
         res = client.table("exam_sessions").select("*").order("created_at", desc=True).execute()
         return res.data or []
     except Exception as e:
-        st.warning(f"세션 목록 조회 실패: {e}")
+        _notify("warning", f"세션 목록 조회 실패: {e}")
         return []
 
 
+@_dispatch("create_session")
 def create_session(client, name: str, meta: dict) -> str | None:
     """새 시험 세션 생성 → session_id 반환"""
     try:
@@ -56,10 +143,11 @@ def create_session(client, name: str, meta: dict) -> str | None:
         }).execute()
         return res.data[0]["id"] if res.data else None
     except Exception as e:
-        st.error(f"세션 생성 실패: {e}")
+        _notify("error", f"세션 생성 실패: {e}")
         return None
 
 
+@_dispatch("load_session_meta", dict)
 def load_session_meta(client, session_id: str) -> dict:
     """세션 메타(기본 설정) 불러오기"""
     try:
@@ -69,29 +157,36 @@ def load_session_meta(client, session_id: str) -> dict:
         return {}
 
 
-def delete_session(client, session_id: str):
+@_dispatch("delete_session", False)
+def delete_session(client, session_id: str) -> bool:
     try:
         client.table("exam_sessions").delete().eq("id", session_id).execute()
+        return True
     except Exception as e:
-        st.error(f"세션 삭제 실패: {e}")
+        _notify("error", f"세션 삭제 실패: {e}")
+        return False
 
 
 # ──────────────────────────────────────────
 # 교사 명단 (일차별)
 # ──────────────────────────────────────────
 
-def save_day_teachers(client, session_id: str, day: int, teachers_json: str):
-    """일차별 교사 명단 저장 (upsert)"""
+@_dispatch("save_day_teachers", False)
+def save_day_teachers(client, session_id: str, day: int, teachers_json: str) -> bool:
+    """일차별 교사 명단 저장 (upsert) → 성공 여부"""
     try:
         client.table("day_teachers").upsert({
             "session_id": session_id,
             "day": day,
             "teachers_json": teachers_json,
         }, on_conflict="session_id,day").execute()
+        return True
     except Exception as e:
-        st.error(f"교사 명단 저장 실패 (D{day}): {e}")
+        _notify("error", f"교사 명단 저장 실패 (D{day}): {e}")
+        return False
 
 
+@_dispatch("load_day_teachers")
 def load_day_teachers(client, session_id: str, day: int) -> str | None:
     """일차별 교사 명단 불러오기 → JSON 문자열"""
     try:
@@ -107,63 +202,210 @@ def load_day_teachers(client, session_id: str, day: int) -> str | None:
 
 
 # ──────────────────────────────────────────
-# 배정 결과
+# 배정 결과 — 칸 단위 행(assignment_cells), assignments 행은 버전(낙관적 잠금)만 보관
+# (data 열의 JSON 통째 저장은 이전 형식: 불러올 때는 그대로 읽고, migrate_assignments로 칸 행으로 옮김)
 # ──────────────────────────────────────────
 
-def save_assignments(client, session_id: str, assignments_json: str):
-    """배정 결과 저장 (세션 단위 전체 upsert)"""
+_CELL_KEY = "session_id,day,period,grade,class"
+TIMETABLE_COLS = ["day", "period", "grade", "class", "role"]
+_PAGE = 1000  # PostgREST 기본 최대 행 수
+
+
+def _cell_rows(session_id: str, df: pd.DataFrame) -> list[dict]:
+    return [{"session_id": session_id, "day": int(d), "period": int(p), "grade": int(g), "class": int(c), "chief": ch, "assistant": ass}
+            for d, p, g, c, ch, ass in df[CELL_COLS].itertuples(index=False)]
+
+
+def _paged(build) -> list[dict]:
+    """build()가 만든 쿼리를 _PAGE 단위 range로 이어 받아 전체 행"""
+    out, start = [], 0
+    while True:
+        res = build().range(start, start + _PAGE - 1).execute()
+        out += res.data or []
+        if len(res.data or []) < _PAGE: return out
+        start += _PAGE
+
+
+def _has_cells(client, session_id: str) -> bool:
+    res = client.table("assignment_cells").select("day").eq("session_id", session_id).limit(1).execute()
+    return bool(res.data)
+
+
+def _write_cells(client, session_id: str, store: AssignmentStore, previous=None):
+    """previous(마지막으로 저장·불러온 배정)를 주면 바뀐 칸만 upsert·없어진 칸만 삭제, 없으면 세션 전체 교체.
+    칸 행이 아직 없는 세션(이전 형식 data JSON)은 previous를 무시하고 전체 기록 — 바뀐 칸만 쓰고 data를 비우면 나머지 칸이 사라짐.
+    전체 교체도 새 칸을 먼저 upsert한 뒤 남은(지금 배정에 없는) 칸만 지움 — 중간에 실패해도 세션이 비지 않음"""
+    if previous is not None and not _has_cells(client, session_id): previous = None
+    if previous is None:
+        put = store.to_df()
+        old = pd.DataFrame(_paged(lambda: client.table("assignment_cells").select("day, period, grade, class").eq("session_id", session_id).order("day").order("period").order("grade").order("class")), columns=KEY)
+        gone = old.merge(put[KEY], on=KEY, how="left", indicator=True)
+        gone = gone.loc[gone["_merge"] == "left_only", KEY]
+    else:
+        put, gone = cell_changes(store, previous)
+    rows = _cell_rows(session_id, put)
+    for i in range(0, len(rows), _PAGE):
+        client.table("assignment_cells").upsert(rows[i:i + _PAGE], on_conflict=_CELL_KEY).execute()
+    for (d, p, g), grp in gone.groupby(["day", "period", "grade"]):  # 학년 단위로 묶어 한 번에 삭제
+        (client.table("assignment_cells").delete().eq("session_id", session_id).eq("day", int(d)).eq("period", int(p)).eq("grade", int(g))
+         .in_("class", [int(c) for c in grp["class"]]).execute())
+
+
+@_dispatch("save_assignments", False)
+def save_assignments(client, session_id: str, assignments, previous=None) -> bool:
+    """배정 결과 저장 (칸 단위, previous를 주면 변경분만) → 성공 여부. assignments는 AssignmentStore/dict/이전 형식 JSON 모두 가능"""
     try:
-        client.table("assignments").upsert({
-            "session_id": session_id,
-            "data": assignments_json,
-        }, on_conflict="session_id").execute()
+        _write_cells(client, session_id, as_store(assignments), previous)
+        client.table("assignments").upsert({"session_id": session_id, "data": ""}, on_conflict="session_id").execute()
+        return True
     except Exception as e:
-        st.error(f"배정 결과 저장 실패: {e}")
+        _notify("error", f"배정 결과 저장 실패: {e}")
+        return False
+
+
+def _load_cells(client, session_id: str) -> AssignmentStore | None:
+    """칸 행만 읽은 배정 (칸 행이 없으면 None)"""
+    rows = _paged(lambda: client.table("assignment_cells").select(", ".join(CELL_COLS)).eq("session_id", session_id).order("day").order("period").order("grade").order("class"))
+    return AssignmentStore.from_df(pd.DataFrame(rows, columns=CELL_COLS)) if rows else None
 
 
-def load_assignments(client, session_id: str) -> dict | None:
-    """배정 결과 불러오기"""
+def _restore_cells(client, session_id: str, before: AssignmentStore | None):
+    """저장 실패 뒤 칸 행을 저장 전 상태로 (before=None: 칸 행이 없던 세션 → 모두 삭제, 이전 형식 data는 그대로 남아 있음)"""
+    if before is None: client.table("assignment_cells").delete().eq("session_id", session_id).execute()
+    else: _write_cells(client, session_id, before)
+
+
+@_dispatch("save_assignments_versioned")
+def save_assignments_versioned(client, session_id: str, assignments, expected_version: int | None, previous=None) -> int | None:
+    """불러올 때의 버전(expected_version, 새 세션이면 None)과 같을 때만 저장 → 새 버전, 충돌이면 None, 기록 실패면 SaveFailed.
+    PostgREST 요청 하나로는 버전과 칸을 함께 묶을 수 없으므로: 버전을 먼저 올려(조건부 update) 자리를 잡고 칸을 기록,
+    칸 기록이 실패하면 보상 — 칸을 저장 전 상태로 되쓰고 버전을 되돌림(여전히 우리가 올린 버전일 때만) → 같은 버전으로 다시 저장 가능.
+    이전 형식 data는 칸 기록이 끝난 뒤에 비움. (assignments.version 열 필요 — README DDL 참조)"""
+    store = as_store(assignments)
     try:
-        res = (client.table("assignments")
-               .select("data")
-               .eq("session_id", session_id)
-               .single()
-               .execute())
-        if res.data:
-            raw = json.loads(res.data["data"])
-            # key 복원: JSON은 str key만 지원 → tuple 복원
-            restored = {}
-            for k, v in raw.items():
-                d, p = map(int, k.split(","))
-                inner = {}
-                for k2, v2 in v.items():
-                    g, c = map(int, k2.split(","))
-                    inner[(g, c)] = tuple(v2)
-                restored[(d, p)] = inner
-            return restored
+        if expected_version is None:
+            try: claimed = bool(client.table("assignments").insert({"session_id": session_id, "data": "", "version": 1}).execute().data)
+            except Exception:
+                if load_assignments_version(client, session_id) is not None: return None  # 그 사이 다른 곳에서 처음 저장 (중복 키)
+                raise
+            if not claimed: return None
+            before = None
+        else:
+            res = (client.table("assignments")
+                   .update({"version": expected_version + 1})
+                   .eq("session_id", session_id)
+                   .eq("version", expected_version)
+                   .execute())
+            if not res.data: return None
+            # previous는 expected_version 시점의 내용 — 칸 행이 있으면 그대로 되돌릴 상태, 없으면(이전 형식·previous 없음) 직접 읽음
+            before = as_store(previous) if previous is not None and _has_cells(client, session_id) else _load_cells(client, session_id)
+    except Exception as e:
+        _notify("error", f"배정 결과 저장 실패: {e}")
+        raise SaveFailed(f"배정 결과 저장 실패: {e}") from e
+    new_version = 1 if expected_version is None else expected_version + 1
+    try:
+        _write_cells(client, session_id, store, previous if expected_version is not None else None)
+        if expected_version is not None: client.table("assignments").update({"data": ""}).eq("session_id", session_id).eq("version", new_version).execute()
+        return new_version
+    except Exception as e:
+        try:
+            _restore_cells(client, session_id, before)
+            q = client.table("assignments")
+            if expected_version is None: q.delete().eq("session_id", session_id).eq("version", 1).execute()
+            else: q.update({"version": expected_version}).eq("session_id", session_id).eq("version", new_version).execute()
+            rolled_back = True
+        except Exception as e2:
+            log.error("배정 저장 되돌리기 실패 (%s): %s", session_id, e2); rolled_back = False
+        msg = f"배정 결과 저장 실패: {e}" + ("" if rolled_back else f" — 되돌리기도 실패, 버전 {new_version}에 일부 칸만 기록됨 (다시 불러온 뒤 저장하세요)")
+        _notify("error", msg)
+        raise SaveFailed(msg, rolled_back) from e
+
+
+@_dispatch("load_assignments_version")
+def load_assignments_version(client, session_id: str) -> int | None:
+    """저장된 배정의 현재 버전 (없으면 None)"""
+    try:
+        res = client.table("assignments").select("version").eq("session_id", session_id).execute()
+        return res.data[0]["version"] if res.data else None
+    except Exception:
         return None
+
+
+def _load_blob(client, session_id: str) -> AssignmentStore | None:
+    """이전 형식(assignments.data JSON) — 칸 행으로 옮기기 전 세션"""
+    res = client.table("assignments").select("data").eq("session_id", session_id).execute()
+    text = res.data[0]["data"] if res.data else ""
+    # key 복원: JSON은 str key만 지원 → tuple 복원 (AssignmentStore로 일괄 적재)
+    return AssignmentStore.from_json(text) if text else None
+
+
+@_dispatch("load_assignments")
+def load_assignments(client, session_id: str, day: int | None = None) -> AssignmentStore | None:
+    """배정 결과 불러오기 — day를 주면 그 날의 칸만 받음 (기본키 앞부분 범위 조회)"""
+    try:
+        def build():
+            q = client.table("assignment_cells").select(", ".join(CELL_COLS)).eq("session_id", session_id)
+            if day is not None: q = q.eq("day", day)
+            return q.order("day").order("period").order("grade").order("class")
+        rows = _paged(build)
+        if rows: return AssignmentStore.from_df(pd.DataFrame(rows, columns=CELL_COLS))
+        store = _load_blob(client, session_id)
+        if store is None or day is None: return store
+        df = store.to_df()
+        return AssignmentStore.from_df(df[df["day"] == day])
     except Exception:
         return None
 
 
+@_dispatch("load_teacher_cells", lambda: pd.DataFrame(columns=TIMETABLE_COLS))
+def load_teacher_cells(client, session_id: str, name: str) -> pd.DataFrame:
+    """한 사람의 시간표 (day, period, grade, class, role) — 정/부감독 열 인덱스로 해당 행만 조회.
+    AssignmentStore.cells_for(name)와 같은 모양 (이전 형식 세션은 migrate_assignments 후 조회 가능)"""
+    try:
+        parts = []
+        for col, role in (("chief", "정감독"), ("assistant", "부감독")):
+            rows = _paged(lambda: client.table("assignment_cells").select("day, period, grade, class").eq("session_id", session_id).eq(col, name).order("day").order("period"))
+            parts.append(pd.DataFrame(rows, columns=TIMETABLE_COLS[:4]).assign(role=role))
+        return pd.concat(parts, ignore_index=True).sort_values(TIMETABLE_COLS[:4], ignore_index=True)
+    except Exception as e:
+        _notify("warning", f"개인 시간표 조회 실패: {e}")
+        return pd.DataFrame(columns=TIMETABLE_COLS)
+
+
+@_dispatch("migrate_assignments", dict)
+def migrate_assignments(client, session_id: str | None = None) -> dict:
+    """이전 형식(assignments.data JSON) → 칸 행. session_id가 없으면 남은 세션 전부 → {session_id: 칸 수}
+    칸을 모두 기록한 뒤에 data를 비우므로 중간에 실패해도 다시 실행하면 이어서 옮김"""
+    try:
+        q = client.table("assignments").select("session_id").neq("data", "")
+        if session_id: q = q.eq("session_id", session_id)
+        done = {}
+        for sid in [r["session_id"] for r in (q.execute().data or [])]:
+            store = _load_blob(client, sid)
+            if store is None: continue
+            _write_cells(client, sid, store)
+            client.table("assignments").update({"data": ""}).eq("session_id", sid).execute()
+            done[sid] = len(store.to_df())
+        return done
+    except Exception as e:
+        _notify("error", f"배정 형식 변환 실패: {e}")
+        return {}
+
+
 def assignments_to_json(assignments: dict) -> str:
     """tuple key → str key 변환 후 직렬화"""
-    serializable = {}
-    for (d, p), per_slot in assignments.items():
-        outer_key = f"{d},{p}"
-        inner = {}
-        for (g, c), (chief, asst) in per_slot.items():
-            inner[f"{g},{c}"] = [chief, asst]
-        serializable[outer_key] = inner
-    return json.dumps(serializable, ensure_ascii=False)
+    store = assignments if isinstance(assignments, AssignmentStore) else AssignmentStore.from_dict(assignments)
+    return store.to_json()
 
 
 # ──────────────────────────────────────────
 # 누적 통계
 # ──────────────────────────────────────────
 
-def save_cumulative_stats(client, session_id: str, stats: list[dict]):
-    """교사별 누적 정/부 횟수 저장"""
+@_dispatch("save_cumulative_stats", False)
+def save_cumulative_stats(client, session_id: str, stats: list[dict], previous: dict | None = None) -> bool:
+    """교사별 누적 정/부 횟수 저장 → 성공 여부
+    previous(load_cumulative_stats 결과)를 주면 바뀐 교사만 upsert, 빠진 교사만 삭제"""
     try:
         rows = [
             {
@@ -174,14 +416,25 @@ def save_cumulative_stats(client, session_id: str, stats: list[dict]):
             }
             for r in stats
         ]
+        if previous is not None:
+            changed = [r for r in rows if previous.get(r["name"]) != {"chief": r["chief_total"], "assistant": r["assistant_total"]}]
+            removed = sorted(set(previous) - {r["name"] for r in rows})
+            if changed:
+                client.table("cumulative_stats").upsert(changed, on_conflict="session_id,name").execute()
+            if removed:
+                client.table("cumulative_stats").delete().eq("session_id", session_id).in_("name", removed).execute()
+            return True
         # 기존 삭제 후 재삽입
         client.table("cumulative_stats").delete().eq("session_id", session_id).execute()
         if rows:
             client.table("cumulative_stats").insert(rows).execute()
+        return True
     except Exception as e:
-        st.error(f"누적 통계 저장 실패: {e}")
+        _notify("error", f"누적 통계 저장 실패: {e}")
+        return False
 
 
+@_dispatch("load_cumulative_stats", dict)
 def load_cumulative_stats(client, session_id: str) -> dict:
     """
     {name: {"chief": n, "assistant": m}} 형태로 반환
@@ -201,3 +454,38 @@ def load_cumulative_stats(client, session_id: str) -> dict:
         return result
     except Exception:
         return {}
+
+
+# ──────────────────────────────────────────
+# 학기 누적 장부 (ledger.py)
+# ──────────────────────────────────────────
+
+@_dispatch("save_ledger", False)
+def save_ledger(client, session_id: str, rows: list[dict], term_at: str | None = None) -> bool:
+    """세션 1건의 교사별 집계(ledger.rollup().to_dict("records")) 저장 — 같은 세션의 이전 행은 교체 → 성공 여부"""
+    try:
+        payload = [{"session_id": session_id, "name": r["name"], "role": r["role"], "chief": int(r["chief"]),
+                    "assistant": int(r["assistant"]), "corridor": int(r["corridor"]), **({"term_at": term_at} if term_at else {})} for r in rows]
+        if payload:
+            client.table("fairness_ledger").upsert(payload, on_conflict="session_id,name").execute()
+        names = [r["name"] for r in payload]
+        q = client.table("fairness_ledger").delete().eq("session_id", session_id)
+        (q.not_.in_("name", names) if names else q).execute()
+        return True
+    except Exception as e:
+        _notify("error", f"누적 장부 저장 실패: {e}")
+        return False
+
+
+@_dispatch("load_ledger_rows", list)
+def load_ledger_rows(client, since: str | None = None) -> list[dict]:
+    """since(ISO 시각) 이후 학기의 장부 행 전체 — term_at 인덱스 범위 조회, 페이지 단위로 이어 받음"""
+    try:
+        def build():
+            q = client.table("fairness_ledger").select("session_id, term_at, name, role, chief, assistant, corridor")
+            if since: q = q.gte("term_at", since)
+            return q.order("term_at").order("session_id").order("name")
+        return _paged(build)
+    except Exception as e:
+        _notify("warning", f"누적 장부 조회 실패: {e}")
+        return []
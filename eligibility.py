@@ -0,0 +1,80 @@
+# eligibility.py — 교사 제약조건 사전 컴파일 인덱스 (배정·검증·통계 공용)
+from __future__ import annotations
+import numpy as np
+from collections import defaultdict
+
+class EligibilityIndex:
+    """Teacher 목록의 제외 규칙을 교사 인덱스 축의 불리언 행렬로 한 번만 컴파일.
+    time_ok[d, p]  : (d, p)에 시간 제외가 없는 교사
+    room_ok[g, c]  : (g, c)가 기피/추가감독 반이 아닌 교사
+    tc_block       : (d, p, g, c) → 해당 칸만 제외된 교사 인덱스 (희소)
+    corridor[d, p] : 복도감독(specific_excludes) 교사
+    is_teacher     : 정감독을 맡을 수 있는 (role=교사) 인덱스"""
+    def __init__(self, teachers, num_days: int, num_grades: int, classes_per_grade: int, max_p: int = 10):
+        self.teachers, self.n = list(teachers), len(teachers)
+        self.dims = (num_days, max_p, num_grades, classes_per_grade)
+        self.pos = {id(t): i for i, t in enumerate(self.teachers)}
+        by_name = defaultdict(list)
+        for i, t in enumerate(self.teachers): by_name[t.name].append(i)
+        self.by_name = {k: np.array(v) for k, v in by_name.items()}
+        self.time_ok = np.ones((num_days + 1, max_p + 1, self.n), dtype=bool)
+        self.room_ok = np.ones((num_grades + 1, classes_per_grade + 1, self.n), dtype=bool)
+        self.corridor = np.zeros((num_days + 1, max_p + 1, self.n), dtype=bool)
+        self.tc_block = defaultdict(list)
+        self.corridor_count = np.array([len(getattr(t, "specific_excludes", ())) for t in self.teachers], dtype=int)
+        self.is_teacher = np.array([t.role == "교사" for t in self.teachers], dtype=bool)  # 정감독 가능 (학부모는 부감독만)
+        for i, t in enumerate(self.teachers):
+            for (d, p) in t.exclude_times:
+                if self._in_time(d, p): self.time_ok[d, p, i] = False
+            for (d, p) in t.specific_excludes:
+                if self._in_time(d, p): self.corridor[d, p, i] = True
+            for (g, c) in t.exclude_classes | t.extra_classes:
+                if self._in_room(g, c): self.room_ok[g, c, i] = False
+            for key in t.exclude_time_class: self.tc_block[key].append(i)
+
+    def _in_time(self, d, p): return 1 <= d <= self.dims[0] and 1 <= p <= self.dims[1]
+    def _in_room(self, g, c): return 1 <= g <= self.dims[2] and 1 <= c <= self.dims[3]
+
+    def time_mask(self, d: int, p: int) -> np.ndarray | None:
+        """(d, p)에 시간 제외가 없는 사람 마스크 (time_ok[d, p]), 색인 범위 밖 교시면 None — 호출 측은 칸별 mask로만 판단"""
+        return self.time_ok[d, p] if self._in_time(d, p) else None
+
+    def mask(self, d: int, p: int, g: int, c: int) -> np.ndarray:
+        """(d, p, g, c)에 배정 가능한 교사 마스크 — can_assign의 벡터화 버전"""
+        if not (self._in_time(d, p) and self._in_room(g, c)):
+            from scheduler import can_assign
+            return np.array([can_assign(t, d, p, g, c) for t in self.teachers], dtype=bool)
+        m = self.time_ok[d, p] & self.room_ok[g, c]
+        blocked = self.tc_block.get((d, p, g, c))
+        if blocked: m[blocked] = False
+        return m
+
+    def ok(self, i: int, d: int, p: int, g: int, c: int) -> bool:
+        if not (self._in_time(d, p) and self._in_room(g, c)):
+            from scheduler import can_assign
+            return can_assign(self.teachers[i], d, p, g, c)
+        return bool(self.time_ok[d, p, i] and self.room_ok[g, c, i]) and i not in self.tc_block.get((d, p, g, c), ())
+
+    def reject_counts(self, d: int, p: int, g: int, c: int) -> dict[str, int]:
+        """(d, p, g, c)에서 규칙별로 배정 불가인 교사 수 (can_assign의 조건 순서대로, 한 교사가 여러 규칙에 걸리면 모두 셈) — 계측용"""
+        if not (self._in_time(d, p) and self._in_room(g, c)):
+            return {"time": sum((d, p) in t.exclude_times for t in self.teachers),
+                    "room": sum((g, c) in t.exclude_classes or (g, c) in t.extra_classes for t in self.teachers),
+                    "time_class": sum((d, p, g, c) in t.exclude_time_class for t in self.teachers)}
+        return {"time": int((~self.time_ok[d, p]).sum()), "room": int((~self.room_ok[g, c]).sum()), "time_class": len(set(self.tc_block.get((d, p, g, c), ())))}
+
+    def indices(self, name: str) -> np.ndarray:
+        """같은 이름의 교사 인덱스 (period_assigned가 이름 단위이므로 함께 처리)"""
+        return self.by_name.get(name, np.empty(0, dtype=int))
+
+    def room_conflict(self, name: str, g: int, c: int) -> bool:
+        """기피학급/추가감독 반 위반 여부 (명단에 없는 이름은 위반 아님)"""
+        idx = self.indices(name)
+        if not len(idx): return False
+        if not self._in_room(g, c):
+            return any((g, c) in self.teachers[i].exclude_classes or (g, c) in self.teachers[i].extra_classes for i in idx)
+        return bool((~self.room_ok[g, c, idx]).any())
+
+    def corridor_names(self, d: int, p: int) -> list[str]:
+        if not self._in_time(d, p): return [t.name for t in self.teachers if (d, p) in t.specific_excludes]
+        return [self.teachers[i].name for i in np.flatnonzero(self.corridor[d, p])]
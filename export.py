@@ -0,0 +1,168 @@
+# export.py — 배정 결과 Excel 내보내기 (app.py·CLI 공용), 개인 시간표 zip
+# 같은 내용이면 다시 만들지 않도록 내용 해시로 캐시, 앱에서는 백그라운드 스레드에서 생성
+from __future__ import annotations
+import hashlib, json, os, re, threading, zipfile
+import pandas as pd
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from profiling import count, timed
+from store import AssignmentStore, UNASSIGNED
+
+_CACHE_SIZE = 8
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_pending: dict[str, Future] = {}
+_lock = threading.RLock()  # 이미 끝난 Future의 콜백은 submit한 스레드에서 바로 실행됨
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xlsx")
+
+@timed("export_xlsx")
+def build_workbook(asgn: dict, num_days, num_grades, classes_per_grade, periods_by_day_grade, df_t_stats: pd.DataFrame | None = None, df_p_stats: pd.DataFrame | None = None) -> bytes:
+    """일차별 시트(교시·학년별 정/부감독 표) + 교사통계/학부모현황 시트 → xlsx 바이트.
+    행 단위로 write_row하고, (미배정) 칸 색은 시트 전체에 조건부 서식 하나로 지정한다."""
+    df_t_stats = df_t_stats if df_t_stats is not None else pd.DataFrame()
+    df_p_stats = df_p_stats if df_p_stats is not None else pd.DataFrame()
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine='xlsxwriter') as writer:
+        wb = writer.book; f_h = wb.add_format({"bold":True,"bg_color":"#4472C4","font_color":"white","border":1,"align":"center"})
+        f_c = wb.add_format({"bg_color":"#DDEEFF","border":1,"align":"center"}); f_a = wb.add_format({"bg_color":"#EEFFDD","border":1,"align":"center"})
+        f_m = wb.add_format({"bg_color":"#FFDDDD","font_color":"#999999","border":1}); f_p = wb.add_format({"bold":True,"bg_color":"#F2F2F2","border":1})
+        for d in range(1, num_days + 1):
+            ws = wb.add_worksheet(f"{d}일차"); ws.set_column(0, 0, 15); ws.set_column(1, max(classes_per_grade, 1), 10); row_i = 0
+            d_max_p = max(int(periods_by_day_grade[d-1][g-1]) for g in range(1, num_grades+1))
+            for p in range(1, d_max_p + 1):
+                ws.merge_range(row_i, 0, row_i, classes_per_grade, f"[{p}교시]", f_p); row_i += 1
+                slot_p = asgn.get((d, p), {})
+                for g in range(1, num_grades + 1):
+                    if int(periods_by_day_grade[d-1][g-1]) < p: continue
+                    pairs = [slot_p.get((g, c), ("(미배정)", "(미배정)")) for c in range(1, classes_per_grade + 1)]
+                    ws.write_row(row_i, 0, [f"{g}학년"] + [f"{g}-{c}반" for c in range(1, classes_per_grade + 1)], f_h); row_i += 1
+                    ws.write(row_i, 0, "정감독", f_h); ws.write_row(row_i, 1, [ch for ch, _ in pairs], f_c); row_i += 1
+                    ws.write(row_i, 0, "부감독", f_h); ws.write_row(row_i, 1, [ass for _, ass in pairs], f_a)
+                    row_i += 2
+                row_i += 1
+            if row_i: ws.conditional_format(0, 1, row_i, classes_per_grade, {"type": "cell", "criteria": "==", "value": '"(미배정)"', "format": f_m})
+        if not df_t_stats.empty: df_t_stats.to_excel(writer, sheet_name="교사통계", index=False)
+        if not df_p_stats.empty: df_p_stats.to_excel(writer, sheet_name="학부모현황", index=False)
+    return buf.getvalue()
+
+def workbook_key(asgn, num_days, num_grades, classes_per_grade, periods_by_day_grade, df_t_stats=None, df_p_stats=None) -> str:
+    """배정 내용 + 레이아웃 + 통계 표의 해시"""
+    store = asgn if isinstance(asgn, AssignmentStore) else AssignmentStore.from_dict(asgn)
+    h = hashlib.sha1(store.digest().encode())
+    h.update(json.dumps([num_days, num_grades, classes_per_grade, [list(map(int, r)) for r in periods_by_day_grade]]).encode())
+    for df in (df_t_stats, df_p_stats):
+        h.update(b"|" if df is None or df.empty else df.to_csv(index=False).encode())
+    return h.hexdigest()
+
+def _remember(key: str, fut: Future):
+    with _lock:
+        _pending.pop(key, None)
+        if fut.exception() is not None: return
+        _cache[key] = fut.result(); _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE: _cache.popitem(last=False)
+
+def get_workbook(asgn, num_days, num_grades, classes_per_grade, periods_by_day_grade, df_t_stats=None, df_p_stats=None, wait: bool = True) -> bytes | None:
+    """캐시된 xlsx 바이트. 없으면 생성 — wait=False면 백그라운드로 맡기고 None (다음 호출에서 완성본 반환)"""
+    key = workbook_key(asgn, num_days, num_grades, classes_per_grade, periods_by_day_grade, df_t_stats, df_p_stats)
+    with _lock:
+        if key in _cache: _cache.move_to_end(key); count("export_xlsx.cache_hit"); return _cache[key]
+        fut = _pending.get(key)
+        if fut is None:
+            # 편집기가 원본을 바꿔도 영향 없도록 복사본으로 생성
+            snap = AssignmentStore.from_dict(asgn)
+            args = (snap, num_days, num_grades, classes_per_grade, [list(r) for r in periods_by_day_grade],
+                    None if df_t_stats is None else df_t_stats.copy(), None if df_p_stats is None else df_p_stats.copy())
+            fut = _pending[key] = _executor.submit(build_workbook, *args)
+            fut.add_done_callback(lambda f, k=key: _remember(k, f))
+    if not wait and not fut.done(): return None
+    return fut.result()
+
+# ──────────────────────────────────────────
+# 개인 시간표: 배정을 이름별로 뒤집어 사람마다 xlsx 한 파일 → zip 하나로 스트리밍
+# xlsxwriter는 순수 파이썬이라 프로세스 풀에서 묶음 단위로 만들고, 끝난 묶음부터 zip에 바로 쓴다.
+# ──────────────────────────────────────────
+TIMETABLE_CHUNK = 24  # 워커 한 번에 맡기는 사람 수
+
+def timetable_index(asgn, teachers=(), periods_by_day_grade=None) -> dict[str, list[tuple]]:
+    """이름 → [(일차, 교시, 역할, 반)] (정감독/부감독/복도감독, 일차·교시 순), 이름순.
+    명단의 모든 사람(배정 0회 포함) + 명단에 없지만 배정표에 있는 이름. 복도감독은 specific_excludes에서."""
+    store = asgn if isinstance(asgn, AssignmentStore) else AssignmentStore.from_dict(asgn)
+    df = store.to_df()
+    duties = pd.concat([df.assign(name=df[col], role=role) for col, role in (("chief", "정감독"), ("assistant", "부감독"))], ignore_index=True)
+    duties = duties[duties["name"] != UNASSIGNED]
+    index: dict[str, list[tuple]] = {t.name: [] for t in teachers}
+    for name, d, p, role, g, c in duties[["name", "day", "period", "role", "grade", "class"]].itertuples(index=False):
+        index.setdefault(name, []).append((int(d), int(p), role, f"{g}-{c}"))
+    max_p = {d: max(map(int, row), default=0) for d, row in enumerate(periods_by_day_grade or [], 1)}
+    for t in teachers:
+        index[t.name] += [(d, p, "복도감독", "") for d, p in t.specific_excludes if periods_by_day_grade is None or p <= max_p.get(d, 0)]
+    return {n: sorted(set(v)) for n, v in sorted(index.items())}
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|\x00-\x1f]', "_", name).strip() or "_"
+
+def render_timetable(name: str, duties: list[tuple], num_days: int, max_p: int) -> bytes:
+    """한 사람의 시간표 xlsx (일차 × 교시 표 + 역할별 합계)"""
+    import xlsxwriter
+    buf = BytesIO()
+    wb = xlsxwriter.Workbook(buf, {"in_memory": True})
+    ws = wb.add_worksheet("시간표")
+    f_t = wb.add_format({"bold": True, "font_size": 14}); f_h = wb.add_format({"bold": True, "bg_color": "#4472C4", "font_color": "white", "border": 1, "align": "center"})
+    fmt = {"정감독": wb.add_format({"bg_color": "#DDEEFF", "border": 1, "align": "center"}), "부감독": wb.add_format({"bg_color": "#EEFFDD", "border": 1, "align": "center"}),
+           "복도감독": wb.add_format({"bg_color": "#FFF2CC", "border": 1, "align": "center"})}
+    f_e = wb.add_format({"border": 1})
+    ws.write(0, 0, f"{name} 시감 시간표", f_t)
+    ws.set_column(0, 0, 10); ws.set_column(1, max(max_p, 1), 14)
+    ws.write_row(2, 0, [""] + [f"{p}교시" for p in range(1, max_p + 1)], f_h)
+    cells = {}
+    for d, p, role, room in duties: cells.setdefault((d, p), []).append((role, room))
+    for d in range(1, num_days + 1):
+        ws.write(2 + d, 0, f"{d}일차", f_h)
+        for p in range(1, max_p + 1):
+            got = cells.get((d, p))
+            if got: ws.write(2 + d, p, " / ".join(f"{role} {room}".strip() for role, room in got), fmt[got[0][0]])
+            else: ws.write_blank(2 + d, p, None, f_e)
+    row = num_days + 4
+    for role in ("정감독", "부감독", "복도감독"):
+        ws.write_row(row, 0, [role, sum(r == role for _, _, r, _ in duties)]); row += 1
+    wb.close()
+    return buf.getvalue()
+
+def _render_chunk(items: list[tuple[str, list]], num_days: int, max_p: int) -> list[tuple[str, bytes]]:
+    return [(name, render_timetable(name, duties, num_days, max_p)) for name, duties in items]
+
+def _in_order(ex, fn, chunks, args, window: int):
+    """제출 순서대로 결과를 내주되, 동시에 떠 있는 묶음은 window개까지 (끝난 파일을 모두 들고 있지 않도록)"""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(ex.submit(fn, chunk, *args))
+        if len(pending) >= window: yield pending.popleft().result()
+    while pending: yield pending.popleft().result()
+
+@timed("export_timetables")
+def write_timetable_zip(out, asgn, teachers, num_days: int, periods_by_day_grade, workers: int | None = None) -> int:
+    """out(경로 또는 쓰기 가능한 파일 객체)에 개인 시간표 zip 기록 → 사람 수.
+    목록.csv(이름·역할별 횟수·파일명) + 사람마다 <이름>.xlsx. workers=1이면 현재 프로세스에서 생성."""
+    index = timetable_index(asgn, teachers, periods_by_day_grade)
+    max_p = max((int(x) for row in periods_by_day_grade for x in row), default=0)
+    items = list(index.items())
+    chunks = [items[i:i + TIMETABLE_CHUNK] for i in range(0, len(items), TIMETABLE_CHUNK)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks) or 1)
+    files, used = {}, set()
+    for name, _ in items:  # 파일 이름이 겹치면 번호를 붙임
+        base = fname = _safe_filename(name); k = 2
+        while fname.lower() in used: fname = f"{base}_{k}"; k += 1
+        used.add(fname.lower()); files[name] = f"{fname}.xlsx"
+    summary = pd.DataFrame([(n, *(sum(r == role for _, _, r, _ in v) for role in ("정감독", "부감독", "복도감독")), files[n]) for n, v in items],
+                           columns=["이름", "정감독", "부감독", "복도감독", "파일"])
+    with zipfile.ZipFile(out, "w") as zf:
+        zf.writestr("목록.csv", summary.to_csv(index=False).encode("utf-8-sig"), compress_type=zipfile.ZIP_DEFLATED)
+        ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            results = _in_order(ex, _render_chunk, chunks, (num_days, max_p), 2 * workers) if ex else (_render_chunk(c, num_days, max_p) for c in chunks)
+            for rendered in results:
+                for name, data in rendered: zf.writestr(files[name], data)  # xlsx는 이미 압축돼 있어 그대로 저장
+        finally:
+            if ex: ex.shutdown()
+    count("export_timetables.people", len(items))
+    return len(items)
@@ -0,0 +1,86 @@
+# history.py — 수동 편집 실행 취소/다시 실행 기록
+# 배정 전체를 편집마다 복사하지 않고, 기준 배정(자동 배정·불러오기 직후) 사본 하나 + 편집 단계별 칸 변경분만 보관한다.
+# 메모리는 편집한 칸 수에 비례 (이름 문자열은 배정 저장소의 것을 그대로 참조).
+#   hist = EditHistory(store); hist.edit(store, [(d, p, g, c, 정, 부)]); hist.undo(store); hist.redo(store)
+from __future__ import annotations
+import pandas as pd
+from store import AssignmentStore
+from changes import KEY
+
+MAX_STEPS = 1000  # 넘으면 가장 오래된 단계부터 버림 (기준 비교는 그대로 가능)
+
+Change = tuple[tuple[int, int, int, int], "tuple[str, str] | None", "tuple[str, str] | None"]  # (칸, 이전, 이후), None = 칸 없음
+
+class EditHistory:
+    """baseline: 기준 배정 사본. _undo/_redo: 단계 목록, 단계 = 칸 변경 튜플의 튜플.
+    undo/redo는 적용한 (칸, 값) 목록을 돌려주어 통계 집계기 등도 칸 단위로 따라 갱신할 수 있다."""
+    def __init__(self, store: AssignmentStore, max_steps: int = MAX_STEPS):
+        self.baseline = store.copy()
+        self.max_steps = max_steps
+        self._undo: list[tuple[Change, ...]] = []
+        self._redo: list[tuple[Change, ...]] = []
+
+    @staticmethod
+    def _get(store: AssignmentStore, d, p, g, c):
+        return store[(d, p)][(g, c)] if store._has(d, p, g, c) else None
+
+    @staticmethod
+    def _put(store: AssignmentStore, key, pair):
+        d, p, g, c = key
+        if pair is not None: store.set_cell(d, p, g, c, pair[0], pair[1])
+        elif store._has(d, p, g, c): del store[(d, p)][(g, c)]
+
+    # ── 기록 ──
+    def edit(self, store: AssignmentStore, cells) -> list[Change]:
+        """cells [(d, p, g, c, 정, 부)]를 store에 적용하고 값이 실제로 바뀐 칸만 한 단계로 기록 → 그 변경 목록.
+        같은 칸이 여러 번 나오면 마지막 값 (편집기의 누적 변경분을 다시 적용해도 새 단계가 생기지 않음)."""
+        step: dict[tuple, list] = {}
+        for d, p, g, c, chief, asst in cells:
+            key = (d, p, g, c)
+            old = self._get(store, *key)
+            if key not in step: step[key] = [old, None]
+            if old != (chief, asst): store.set_cell(d, p, g, c, chief, asst)
+            step[key][1] = (chief, asst)
+        changes = tuple((k, old, new) for k, (old, new) in step.items() if old != new)
+        if changes:
+            self._undo.append(changes); self._redo.clear()
+            if len(self._undo) > self.max_steps: del self._undo[0]
+        return list(changes)
+
+    # ── 실행 취소 / 다시 실행 ──
+    def undo(self, store: AssignmentStore) -> list[tuple[tuple, "tuple[str, str] | None"]]:
+        """마지막 단계를 되돌림 → 적용한 [(칸, 값)] (없으면 빈 목록)"""
+        if not self._undo: return []
+        changes = self._undo.pop(); self._redo.append(changes)
+        for key, old, _ in reversed(changes): self._put(store, key, old)
+        return [(key, old) for key, old, _ in changes]
+
+    def redo(self, store: AssignmentStore) -> list[tuple[tuple, "tuple[str, str] | None"]]:
+        if not self._redo: return []
+        changes = self._redo.pop(); self._undo.append(changes)
+        for key, _, new in changes: self._put(store, key, new)
+        return [(key, new) for key, _, new in changes]
+
+    @property
+    def can_undo(self) -> int: return len(self._undo)
+    @property
+    def can_redo(self) -> int: return len(self._redo)
+
+    def steps(self) -> pd.DataFrame:
+        """실행 취소 가능한 단계 (오래된 순): step, cells(바뀐 칸 수), summary"""
+        rows = [{"step": i + 1, "cells": len(ch), "summary": ", ".join(f"{d}일{p}교시 {g}-{c}: {'/'.join(new) if new else '삭제'}" for (d, p, g, c), _, new in ch[:3]) + (" …" if len(ch) > 3 else "")}
+                for i, ch in enumerate(self._undo)]
+        return pd.DataFrame(rows, columns=["step", "cells", "summary"])
+
+    # ── 기준과 비교 ──
+    def diff_baseline(self, store: AssignmentStore) -> pd.DataFrame:
+        """기준 배정 대비 현재 배정의 칸 차이 (persist.diff_cells 형식)"""
+        from persist import diff_cells
+        return diff_cells(self.baseline, store)
+
+    def manual_cells(self, store: AssignmentStore) -> set[tuple[int, int, int, int, int]]:
+        """기준 배정 대비 손으로 바꾼 자리 {(d, p, g, c, 0=정감독|1=부감독)} — repair_assignment(pinned=)에 넘겨 재배정이 지우지 않게"""
+        diff = self.diff_baseline(store)
+        diff = diff[diff["change"] != "removed"]
+        return {(int(d), int(p), int(g), int(c), role) for role, (old, new) in enumerate((("chief_old", "chief_new"), ("assistant_old", "assistant_new")))
+                for d, p, g, c in diff.loc[diff[old].ne(diff[new]), KEY].itertuples(index=False)}
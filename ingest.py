@@ -0,0 +1,195 @@
+# ingest.py — 명단 CSV 스트리밍 수집: 열·규칙 문법 검사(오류 행 번호), 행 지문, 바뀐 행만 Teacher 재생성
+# 조건부 GET(ETag / Last-Modified)으로 시트가 그대로면 304만 받고, 본문이 와도 이전과 같으면 아무것도 다시 만들지 않는다.
+from __future__ import annotations
+import csv, hashlib, io, re, urllib.error, urllib.request
+import pandas as pd
+from collections import Counter
+from dataclasses import dataclass, field
+from profiling import count, timed
+from roster import Roster
+
+ROLES = ("교사", "학부모")
+# Teacher를 만드는 데 쓰는 열 — 행 지문도 이 열들로만 계산 (표시용 열이 바뀌어도 재생성 안 함)
+RULE_COLUMNS = {"교사": ("name", "priority", "exclude", "extra_classes"), "학부모": ("name", "priority", "available", "extra_classes")}
+
+_TIME = re.compile(r"^D(\d+)P(\d+)$")
+_DAY = re.compile(r"^D(\d+)$")
+_CLASS = re.compile(r"^(?:C)?(\d+)-(\d+)$")
+_RANGE = re.compile(r"^(\d+)-(\d+)~(\d+)$")
+
+@dataclass
+class Issue:
+    row: int        # 시트 행 번호 (1 = 헤더)
+    column: str
+    value: str
+    message: str
+    level: str = "error"  # error: 규칙이 무시됨 | warning: 반영은 되지만 확인 필요
+
+def _blank(raw: str) -> bool:
+    return raw.strip().lower() in ("nan", "none", "")
+
+def _check_exclude(raw: str) -> list[str]:
+    """exclude 열: D1P2 / D1 / 1-3 / D1P2@1-3 (;로 구분)"""
+    bad = []
+    for tok in raw.strip().upper().replace(" ", "").split(";"):
+        if not tok: continue
+        if "@" in tok:
+            t, c = tok.split("@", 1)
+            if not (_TIME.match(t) and _CLASS.match(c)): bad.append(tok)
+        elif not (_TIME.match(tok) or _DAY.match(tok) or _CLASS.match(tok)): bad.append(tok)
+    return bad
+
+def _check_available(raw: str) -> list[str]:
+    """available 열: D1P2 / D1 (;로 구분)"""
+    return [tok for tok in raw.strip().upper().replace(" ", "").split(";") if tok and not (_TIME.match(tok) or _DAY.match(tok))]
+
+def _check_extra(raw: str) -> list[str]:
+    """extra_classes 열: 1-3 / 1-4~6 (; 또는 ,로 구분) — 끝이 시작보다 작은 범위도 오류"""
+    bad = []
+    for tok in re.split(r"[;,]", raw.strip()):
+        tok = tok.strip()
+        if not tok: continue
+        m = _RANGE.match(tok)
+        if m:
+            if int(m.group(3)) < int(m.group(2)): bad.append(tok)
+        elif not _CLASS.match(tok.upper().replace(" ", "")): bad.append(tok)
+    return bad
+
+_CHECKS = {"exclude": _check_exclude, "available": _check_available, "extra_classes": _check_extra}
+
+def _hashed(lines, h):
+    for line in lines:
+        h.update(line.encode("utf-8")); yield line
+
+@dataclass
+class SheetFeed:
+    """시트 탭 하나(교사 또는 학부모)의 마지막 수집 결과"""
+    role: str
+    url: str | None = None
+    etag: str | None = None
+    modified: str | None = None
+    digest: str | None = None
+    columns: list[str] = field(default_factory=list)
+    rows: list[list[str]] = field(default_factory=list)
+    fps: list[str] = field(default_factory=list)
+    issues: list[Issue] = field(default_factory=list)
+
+    def clear(self):
+        self.__init__(self.role)
+
+    @timed("sheet_fetch")
+    def fetch(self, url: str, timeout: float = 30.0) -> bool:
+        """조건부 GET → 내용이 바뀌었으면 True (304이거나 본문이 같으면 False)"""
+        if url != self.url: self.etag = self.modified = self.digest = None
+        headers = {k: v for k, v in (("If-None-Match", self.etag), ("If-Modified-Since", self.modified)) if v}
+        try: resp = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304: count("sheet_fetch.not_modified"); return False
+            raise
+        with resp:
+            changed = self.read(io.TextIOWrapper(resp, encoding="utf-8-sig", newline=""))
+            self.url, self.etag, self.modified = url, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        return changed
+
+    def read(self, lines) -> bool:
+        """CSV 줄 스트림을 한 행씩 읽으며 열·규칙 검사와 행 지문 계산 → 내용이 바뀌었으면 True"""
+        h = hashlib.sha1()
+        reader = csv.reader(_hashed(lines, h))
+        header = next(reader, None)
+        columns = [c.strip().lower() for c in header] if header else []
+        issues = [Issue(1, c, c, "중복된 열 이름") for c, n in Counter(columns).items() if n > 1 and c]
+        if columns and "name" not in columns: issues.append(Issue(1, "name", "", "name 열이 없습니다"))
+        fp_idx = [columns.index(c) if c in columns else None for c in RULE_COLUMNS[self.role]]
+        checks = [(i, c, _CHECKS[c]) for i, c in enumerate(columns) if c in _CHECKS and c in RULE_COLUMNS[self.role]]
+        name_i = columns.index("name") if "name" in columns else None
+        rows, fps, seen = [], [], {}
+        for n, row in enumerate(reader, start=2):
+            if not any(v.strip() for v in row): continue  # 빈 줄
+            if len(row) > len(columns): issues.append(Issue(n, "", ",".join(row[len(columns):]), f"값이 열보다 많습니다 ({len(row)} > {len(columns)})"))
+            row = (row + [""] * len(columns))[:len(columns)]
+            rows.append(row)
+            fps.append(hashlib.sha1("\x1f".join(row[i] if i is not None else "" for i in fp_idx).encode("utf-8")).hexdigest())
+            if name_i is not None:
+                name = row[name_i].strip()
+                if not name: issues.append(Issue(n, "name", "", "이름이 비어 있어 제외됩니다", "warning"))
+                elif name in seen: issues.append(Issue(n, "name", name, f"{seen[name]}행과 같은 이름 (교시 배정은 한 사람으로 처리)", "warning"))
+                else: seen[name] = n
+            for i, col, check in checks:
+                if _blank(row[i]): continue
+                issues += [Issue(n, col, tok, "형식을 알 수 없어 무시됩니다") for tok in check(row[i])]
+        digest = h.hexdigest()
+        if digest == self.digest: return False
+        self.digest, self.columns, self.rows, self.fps, self.issues = digest, columns, rows, fps, issues
+        return True
+
+    def frame(self, idx: list[int] | None = None) -> pd.DataFrame:
+        rows = self.rows if idx is None else [self.rows[i] for i in idx]
+        return pd.DataFrame(rows, columns=self.columns) if self.columns else pd.DataFrame()
+
+class RosterIngest:
+    """교사·학부모 탭 수집 + 행 지문별 Teacher 캐시 (앱 세션마다 하나)"""
+    def __init__(self):
+        self.feeds = {role: SheetFeed(role) for role in ROLES}
+        self.changed: set[str] = set()   # reset_changes() 이후 행이 생기거나 바뀌거나 없어진 이름
+        self.rebuilt = 0                 # 마지막 teachers()에서 새로 만든 Teacher 수
+        self._built: dict = {}
+
+    def refresh(self, t_url: str | None, p_url: str | None) -> dict[str, bool]:
+        """두 탭을 조건부로 다시 받음 → 탭별 변경 여부. url이 None인 탭은 비운다."""
+        out = {}
+        for role, url in zip(ROLES, (t_url, p_url)):
+            feed, before = self.feeds[role], self._by_fp(self.feeds[role])
+            if url is None: out[role] = bool(feed.rows); feed.clear()
+            else: out[role] = feed.fetch(url)
+            if out[role]: self._track(feed, before)
+        return out
+
+    def read(self, role: str, lines) -> bool:
+        """URL 대신 CSV 줄 스트림(파일 등)에서 수집"""
+        feed, before = self.feeds[role], self._by_fp(self.feeds[role])
+        changed = feed.read(lines)
+        if changed: self._track(feed, before)
+        return changed
+
+    @staticmethod
+    def _by_fp(feed: SheetFeed) -> dict[str, str]:
+        i = feed.columns.index("name") if "name" in feed.columns else None
+        return {fp: row[i].strip() if i is not None else "" for fp, row in zip(feed.fps, feed.rows)}
+
+    def _track(self, feed: SheetFeed, before: dict[str, str]):
+        after = self._by_fp(feed)
+        self.changed |= {n for fp, n in after.items() if fp not in before} | {n for fp, n in before.items() if fp not in after}
+        self.changed.discard("")
+
+    def reset_changes(self):
+        self.changed = set()
+
+    def frames(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        return self.feeds["교사"].frame(), self.feeds["학부모"].frame()
+
+    def issues(self) -> pd.DataFrame:
+        rows = [(role, i.row, i.column, i.value, i.message, i.level) for role in ROLES for i in self.feeds[role].issues]
+        return pd.DataFrame(rows, columns=["명단", "행", "열", "값", "내용", "수준"])
+
+    @timed("build_teachers")
+    def teachers(self, num_days: int) -> list:
+        """build_teachers(교사 표, 학부모 표)와 같은 목록. 지문이 처음 보이는 행만 새로 만든다."""
+        keys, todo = [], {role: [] for role in ROLES}
+        for role in ROLES:
+            seen = Counter()
+            for i, fp in enumerate(self.feeds[role].fps):
+                key = (role, fp, seen[fp], num_days); seen[fp] += 1  # 같은 내용의 행도 서로 다른 객체 (EligibilityIndex가 id로 구분)
+                keys.append(key)
+                if key not in self._built: todo[role].append((key, i))
+        self.rebuilt = 0
+        for role, items in todo.items():
+            if not items: continue
+            feed = self.feeds[role]
+            sub = feed.frame([i for _, i in items])
+            roster = Roster.from_frames(sub, pd.DataFrame(), num_days) if role == "교사" else Roster.from_frames(pd.DataFrame(), sub, num_days)
+            built = dict(zip(roster.people["tid"].tolist(), roster.teachers()))
+            for pos, (key, _) in enumerate(items): self._built[key] = built.get(pos)
+            self.rebuilt += len(built)
+        count("build_teachers.rebuilt", self.rebuilt); count("build_teachers.reused", len(keys) - sum(len(v) for v in todo.values()))
+        self._built = {k: self._built[k] for k in keys}
+        return [self._built[k] for k in keys if self._built[k] is not None]
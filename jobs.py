@@ -0,0 +1,191 @@
+# jobs.py — 여러 학교·시험 배정 작업 큐 (앱·스크립트 공용)
+# 전용 스레드의 asyncio 루프가 작업을 받아 프로세스 풀 워커에서 명단 수집 → run_assignment를 돌리고,
+# 결과는 db.py로 저장한다(저장소를 주지 않으면 db.get_client()). submit()은 바로 작업 id를 돌려주고 화면은 status()로 폴링.
+#   svc = get_service(); jid = svc.submit({"name": "A중", "teachers_csv": text, "days": 4, "grades": 3, "classes": 8, "periods": [[2, 2, 2], ...]})
+#   svc.status(jid)["state"]  # queued → running → done | failed | cancelled
+from __future__ import annotations
+import asyncio, io, os, threading, time, uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from profiling import count, stage
+
+STATES = ("queued", "running", "done", "failed", "cancelled")
+KEEP_FINISHED = 200  # 끝난 작업은 최근 것만 보관 (결과 JSON 포함)
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    spec: dict
+    state: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    session_id: str | None = None   # 저장한 시험 세션 (저장소가 없으면 None, 저장에 실패하면 state="failed"·error)
+    summary: dict = field(default_factory=dict)
+    error: str | None = None
+    result: str | None = None       # 배정 JSON (AssignmentStore.to_json)
+
+    def to_dict(self) -> dict:
+        """화면 표시용 (spec·result 제외)"""
+        wait = (self.started_at or time.time()) - self.submitted_at
+        run = (self.finished_at or time.time()) - self.started_at if self.started_at else None
+        return {"id": self.id, "name": self.name, "state": self.state, "session_id": self.session_id, "error": self.error,
+                "wait_s": round(wait, 2), "run_s": None if run is None else round(run, 2), **self.summary}
+
+def _roster_lines(spec: dict, key: str):
+    """teachers_csv / parents_csv(본문) 또는 teachers / parents(파일 경로)"""
+    if spec.get(f"{key}_csv"): return io.StringIO(spec[f"{key}_csv"], newline="")
+    if spec.get(key): return open(spec[key], encoding="utf-8-sig", newline="")
+    return None
+
+def execute(spec: dict) -> dict:
+    """워커 프로세스에서 실행: 명단 수집 → 배정 → {"assignments": JSON, "summary": {...}}"""
+    from cli import parse_periods
+    from ingest import RosterIngest, ROLES
+    from scheduler import run_assignment
+    from store import AssignmentStore
+    t0 = time.perf_counter()
+    num_days, num_grades, classes = int(spec["days"]), int(spec["grades"]), int(spec["classes"])
+    periods = parse_periods(spec.get("periods", 2), num_days, num_grades)
+    ingest = RosterIngest()
+    for role, key in zip(ROLES, ("teachers", "parents")):
+        lines = _roster_lines(spec, key)
+        if lines is None: continue
+        with lines: ingest.read(role, lines)
+    teachers = ingest.teachers(num_days)
+    if not teachers: raise ValueError("교사 명단이 비어 있습니다")
+    history = {n: tuple(v) for n, v in spec["history"].items()} if spec.get("history") else None
+    store = AssignmentStore.from_dict(run_assignment(teachers, num_days, num_grades, classes, periods, engine=spec.get("engine", "heap"), history=history))
+    summary = {"teachers": len(teachers), "unassigned": store.unassigned_count(), "roster_issues": len(ingest.issues()), "seconds": round(time.perf_counter() - t0, 4)}
+    return {"assignments": store.to_json(), "summary": summary}
+
+class JobService:
+    """작업 큐. 동시에 실행하는 작업은 workers개(프로세스 풀 크기), 나머지는 queued로 대기.
+    client: db.py 함수에 넘길 저장소 (Supabase 클라이언트 / storage.SQLiteBackend 등). None이면 저장할 때마다 db.get_client()."""
+    def __init__(self, workers: int | None = None, client=None, pool=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.client = client
+        self.jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool = pool  # 테스트 등에서 ThreadPoolExecutor를 넣을 수 있음
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._started = threading.Event()
+
+    # ── 수명 주기 ──
+    def start(self) -> "JobService":
+        with self._lock:
+            if self._loop is not None: return self
+            self._pool = self._pool or ProcessPoolExecutor(max_workers=self.workers)
+            self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._serve, name="jobs", daemon=True).start()
+        self._started.wait()
+        return self
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._started.set()
+        self._loop.run_forever()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock: loop, self._loop = self._loop, None
+        if loop is None: return
+        loop.call_soon_threadsafe(loop.stop)
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._pool = None; self._started.clear()
+
+    # ── 작업 ──
+    def submit(self, spec: dict) -> str:
+        """작업 등록 → id (spec 형식은 execute 참조, name은 저장할 시험 세션 이름)"""
+        self.start()
+        job = Job(uuid.uuid4().hex[:12], str(spec.get("name") or "schedule"), dict(spec))
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+        asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+        count("jobs.submitted")
+        return job.id
+
+    async def _run(self, job: Job):
+        async with self._slots:
+            with self._lock:
+                if job.state == "cancelled": return
+                job.state, job.started_at = "running", time.time()
+            loop = asyncio.get_running_loop()
+            try:
+                out = await loop.run_in_executor(self._pool, execute, job.spec)
+                sid = await loop.run_in_executor(None, self._save, job, out["assignments"])
+                with self._lock: job.result, job.summary, job.session_id, job.state = out["assignments"], out["summary"], sid, "done"
+                count("jobs.done")
+            except Exception as e:
+                with self._lock: job.state, job.error = "failed", f"{type(e).__name__}: {e}"
+                count("jobs.failed")
+            finally:
+                job.finished_at = time.time()
+
+    def _save(self, job: Job, assignments_json: str) -> str | None:
+        """배정 결과를 새 시험 세션으로 저장 (이벤트 루프를 막지 않도록 기본 스레드 풀에서)"""
+        import db
+        client = self.client if self.client is not None else db.get_client()
+        if client is None: return None
+        with stage("jobs.save"):
+            # db 함수는 실패를 알림으로만 남기고 None/False를 돌려주므로, 여기서 예외로 바꿔 작업을 failed로 기록
+            meta = {k: job.spec[k] for k in ("days", "grades", "classes", "periods", "engine") if k in job.spec}
+            sid = db.create_session(client, job.name, {**meta, "job_id": job.id})
+            if not sid: raise RuntimeError("시험 세션 생성 실패 (저장소 로그 참조)")
+            if not db.save_assignments(client, sid, assignments_json): raise RuntimeError(f"배정 결과 저장 실패 (세션 {sid}, 저장소 로그 참조)")
+            return sid
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업만 취소 (실행 중인 워커는 끝까지 돈다)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state != "queued": return False
+            job.state, job.finished_at = "cancelled", time.time()
+            return True
+
+    def _prune(self):
+        done = [j for j in self.jobs.values() if j.state in ("done", "failed", "cancelled")]
+        for j in sorted(done, key=lambda j: j.finished_at or 0)[:max(0, len(done) - KEEP_FINISHED)]: del self.jobs[j.id]
+
+    # ── 조회 ──
+    def status(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return None if job is None else job.to_dict()
+
+    def list(self) -> list[dict]:
+        """최근 등록 순"""
+        with self._lock: return [j.to_dict() for j in sorted(self.jobs.values(), key=lambda j: -j.submitted_at)]
+
+    def counts(self) -> dict[str, int]:
+        with self._lock: return {s: sum(j.state == s for j in self.jobs.values()) for s in STATES}
+
+    def result(self, job_id: str):
+        """끝난 작업의 배정 (AssignmentStore), 아직이면 None"""
+        from store import AssignmentStore
+        with self._lock:
+            job = self.jobs.get(job_id)
+            text = job.result if job is not None else None
+        return AssignmentStore.from_json(text) if text else None
+
+    def wait(self, job_id: str, timeout: float | None = None, poll: float = 0.05) -> dict | None:
+        """끝날 때까지 대기 (스크립트·점검용) → status"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            st = self.status(job_id)
+            if st is None or st["state"] in ("done", "failed", "cancelled"): return st
+            if end is not None and time.monotonic() >= end: return st
+            time.sleep(poll)
+
+_service: JobService | None = None
+_service_lock = threading.Lock()
+
+def get_service(workers: int | None = None) -> JobService:
+    """프로세스 단위 작업 큐 (Streamlit 세션 간 공유)"""
+    global _service
+    with _service_lock:
+        if _service is None: _service = JobService(workers).start()
+        return _service
@@ -0,0 +1,77 @@
+# ledger.py — 여러 학기 누적 공정성 장부
+# 세션(학기)마다 교사별 정/부/복도감독 횟수를 미리 집계해 한 행씩 저장하고(db.save_ledger),
+# 필요한 기간의 행만 한 번에 불러와(db.load_ledger_rows) 이름별로 합산 → 배정 카운터 초기값(history)
+from __future__ import annotations
+import pandas as pd
+from store import AssignmentStore
+
+COLS = ["session_id", "term_at", "name", "role", "chief", "assistant", "corridor"]
+_COUNTS = ["chief", "assistant", "corridor"]
+
+def _utc(t) -> pd.Timestamp:
+    t = pd.Timestamp(t)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+def rollup(assignments, teachers) -> pd.DataFrame:
+    """이번 배정의 교사별 집계 (name, role, chief, assistant, corridor).
+    명단의 모든 사람(배정 0회 포함) + 명단에 없지만 배정표에 있는 이름(수동 입력, role은 교사로 간주)."""
+    store = assignments if isinstance(assignments, AssignmentStore) else AssignmentStore.from_dict(assignments)
+    counts = store.counts()
+    counts = counts[(counts["chief"] > 0) | (counts["assistant"] > 0)]
+    roster = pd.DataFrame([(t.name, t.role, len(t.specific_excludes)) for t in teachers], columns=["name", "role", "corridor"]).drop_duplicates("name")
+    out = roster.merge(counts, on="name", how="outer")
+    out["role"] = out["role"].fillna("교사")
+    out[_COUNTS] = out[_COUNTS].fillna(0).astype(int)
+    return out[["name", "role"] + _COUNTS].sort_values("name", ignore_index=True)
+
+class Ledger:
+    """rows: 세션 × 이름 1행 (COLS). totals()는 기간별 합산 결과를 캐시."""
+    def __init__(self, rows: pd.DataFrame | None = None):
+        self.rows = rows[COLS].copy() if rows is not None and not rows.empty else pd.DataFrame({c: pd.Series(dtype=object if c in ("session_id", "term_at", "name", "role") else int) for c in COLS})
+        self.rows["term_at"] = pd.to_datetime(self.rows["term_at"], utc=True)
+        self._totals: dict = {}
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "Ledger":
+        return cls(pd.DataFrame(records, columns=COLS) if records else None)
+
+    def add(self, session_id: str, term_at, summary: pd.DataFrame):
+        """세션 1건의 rollup()을 추가 (같은 세션이 있으면 교체)"""
+        new = summary.assign(session_id=session_id, term_at=_utc(term_at))[COLS]
+        self.rows = pd.concat([self.rows[self.rows["session_id"] != session_id], new], ignore_index=True)
+        self._totals.clear()
+
+    def sessions(self) -> list[str]:
+        return self.rows.drop_duplicates("session_id").sort_values("term_at")["session_id"].tolist()
+
+    def totals(self, since=None) -> pd.DataFrame:
+        """이름 인덱스 합산 (role, chief, assistant, corridor, sessions) — since 이후 학기만"""
+        key = None if since is None else _utc(since)
+        if key not in self._totals:
+            rows = self.rows if key is None else self.rows[self.rows["term_at"] >= key]
+            g = rows.groupby("name", sort=True)
+            out = g[_COUNTS].sum().astype(int)
+            out["sessions"] = g["session_id"].nunique()
+            out["role"] = g["role"].last()
+            self._totals[key] = out
+        return self._totals[key]
+
+    def seed(self, teachers=None, since=None, max_gap: int | None = None) -> dict[str, tuple[int, int]]:
+        """run_assignment(history=...)용 {이름: (정감독, 부감독)} 초기값.
+        복도감독은 교사 부담으로 보고 정감독 쪽에 더한다. teachers를 주면 그 명단만,
+        max_gap을 주면 역할별로 (명단 최소 + max_gap)에서 잘라 신규 교사에게 몰리지 않게 한다."""
+        tot = self.totals(since)
+        chief = tot["chief"] + tot["corridor"]
+        seed = pd.DataFrame({"chief": chief, "assistant": tot["assistant"], "role": tot["role"]})
+        if teachers is not None:
+            roles = pd.Series({t.name: t.role for t in teachers}, dtype=object)
+            seed = seed.reindex(roles.index).fillna({"chief": 0, "assistant": 0}).assign(role=roles)
+            if max_gap is not None:
+                for col in ("chief", "assistant"):
+                    floor = seed.groupby("role")[col].transform("min")
+                    seed[col] = seed[col].clip(upper=floor + max_gap)
+        seed = seed[(seed["chief"] > 0) | (seed["assistant"] > 0)]
+        return {n: (int(c), int(a)) for n, c, a in zip(seed.index, seed["chief"], seed["assistant"])}
+
+    def to_records(self) -> list[dict]:
+        return self.rows.assign(term_at=self.rows["term_at"].map(lambda t: t.isoformat())).to_dict("records")
@@ -0,0 +1,122 @@
+# optimal.py — 교시 단위 최적 배정 (engine="flow"): 교사 × (교실, 정/부감독) 최소 비용 이분 매칭
+# 탐욕 순서 때문에 뒤쪽 교실이 (미배정)으로 남는 일 없이 교시마다 채울 수 있는 칸 수를 최대로 보장
+# scipy가 있으면 linear_sum_assignment, 없으면 NumPy 최단 증가 경로(헝가리안) 구현 사용
+from __future__ import annotations
+import numpy as np
+
+try: from scipy.optimize import linear_sum_assignment as _scipy_lsa
+except ImportError: _scipy_lsa = None
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """행 수 ≤ 열 수인 비용 행렬(inf = 불가)의 최소 비용 매칭 → 행별 열 번호.
+    행을 하나씩 추가하며 최단 증가 경로(Dijkstra)를 찾는 헝가리안 알고리즘.
+    순위 비용은 동점이 많으므로 같은 거리의 열을 한 번에 펼쳐 반복 횟수를 줄인다 (정수 비용이라 동점 비교가 정확)."""
+    n, m = cost.shape
+    u, v = np.zeros(n + 1), np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # match[j] = 열 j에 매칭된 행 (1부터, 0 = 없음)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        match[0], j0 = i, 0
+        minv, used = np.full(m + 1, np.inf), np.zeros(m + 1, dtype=bool)
+        front = np.array([0])
+        while True:
+            used[front] = True
+            rows = match[front]
+            free = ~used[1:]
+            cur = cost[rows - 1] - u[rows][:, None] - v[1:]
+            best, src = cur.min(axis=0), cur.argmin(axis=0)
+            better = free & (best < minv[1:])
+            minv[1:][better] = best[better]; way[1:][better] = front[src[better]]
+            cand = np.where(free, minv[1:], np.inf)
+            delta = cand.min()
+            u[match[used]] += delta; v[used] -= delta; minv[~used] -= delta
+            front = np.nonzero(cand == delta)[0] + 1
+            open_ = front[match[front] == 0]
+            if len(open_): j0 = int(open_[0]); break
+        while j0:
+            j1 = way[j0]; match[j0] = match[j1]; j0 = j1
+    cols = np.empty(n, dtype=np.int64)
+    j = np.nonzero(match[1:])[0]
+    cols[match[1:][j] - 1] = j
+    return cols
+
+def assign_min_cost(cost: np.ndarray) -> np.ndarray:
+    """행마다 서로 다른 열 하나 (행 수 ≤ 열 수, 모든 행에 유한 비용 열이 충분해야 함)"""
+    if not cost.shape[0]: return np.empty(0, dtype=np.int64)
+    if _scipy_lsa is not None:
+        rows, cols = _scipy_lsa(cost)
+        out = np.empty(cost.shape[0], dtype=np.int64); out[rows] = cols
+        return out
+    return _hungarian(cost)
+
+class FlowSolver:
+    """_fill_slot과 같은 자리에서 쓰는 교시 단위 최적 배정기.
+    목표(사전식): ① 채운 칸 수 최대 ② 그중 정감독 칸 우선 ③ 탐욕 엔진의 정렬키 순위 합 최소
+      정감독 순위: (누적 정감독, 우선순위, 회전 오프셋)
+      부감독 순위: (학부모 먼저, 누적 부감독, 누적 정감독, 회전 오프셋) + 직전 교시 같은 교실 부감독이면 벌점
+    같은 이름은 한 명(열 하나)으로 묶는다 — 교시당 배정이 이름 단위이므로."""
+    def __init__(self, st, elig):
+        self.st, self.elig = st, elig
+        self.names = list(elig.by_name)
+        self.head = np.array([elig.by_name[n][0] for n in self.names], dtype=np.int64)
+        self.dups = [(k, elig.by_name[n]) for k, n in enumerate(self.names) if len(elig.by_name[n]) > 1]
+        role = np.array([t.role for t in elig.teachers], dtype=object)
+        self.is_chief = self._merge(role == "교사")
+        self.is_parent = self._merge(role == "학부모")
+        self.priority = np.array([elig.teachers[i].priority for i in self.head], dtype=np.int64)
+        self.orig = np.array([st.orig_idx_map[n] for n in self.names], dtype=np.int64)
+        self.col = {n: k for k, n in enumerate(self.names)}
+
+    def _merge(self, per_teacher: np.ndarray) -> np.ndarray:
+        """교사 인덱스 축 → 이름 축 (같은 이름 중 하나라도 True면 True). 2차원이면 마지막 축 기준."""
+        out = per_teacher[..., self.head].copy()
+        for k, idx in self.dups: out[..., k] = per_teacher[..., idx].any(axis=-1)
+        return out
+
+    def _ranks(self, *keys) -> np.ndarray:
+        order = np.lexsort(keys[::-1])
+        rank = np.empty(len(order), dtype=np.int64); rank[order] = np.arange(len(order))
+        return rank
+
+    def fill(self, d, p, per_slot, chief_cells, asst_cells, prev_slot):
+        """chief_cells의 정감독, asst_cells의 부감독을 한 번에 배정 (per_slot을 직접 수정, 카운터 갱신)"""
+        st, n = self.st, len(self.names)
+        cells = [(gc, 0) for gc in chief_cells] + [(gc, 1) for gc in asst_cells]
+        if not cells or not n: return
+        free = np.ones(n, dtype=bool)
+        for pair in per_slot.values():
+            for name in pair:
+                if name in self.col: free[self.col[name]] = False
+        rc = np.array([st.running_chief[x] for x in self.names], dtype=np.int64)
+        ra = np.array([st.running_asst[x] for x in self.names], dtype=np.int64)
+        daily = np.array([st.parent_daily_asst[x][d] if self.is_parent[k] else 0 for k, x in enumerate(self.names)], dtype=np.int64)
+        rot = (self.orig - st.last_idx) % st.total_t
+        rank_ch = self._ranks(rc, self.priority, rot)
+        rank_as = self._ranks(np.where(self.is_parent, 0, 1), ra, np.where(self.is_parent, 0, rc), rot)
+        ok = self._merge(np.stack([self.elig.mask(d, p, g, c) for (g, c), _ in cells])) & free
+        role = np.array([r for _, r in cells])
+        ok[role == 0] &= self.is_chief
+        ok[role == 1] &= ~(self.is_parent & (daily >= 2))
+        pref = np.where(role[:, None] == 0, rank_ch, rank_as).astype(float)
+        if prev_slot is not None:
+            for i, ((g, c), r) in enumerate(cells):
+                prev = prev_slot.get((g, c), (None, "(미배정)"))[1]
+                if r == 1 and prev in self.col: pref[i, self.col[prev]] += n  # 연속 같은 교실은 다른 후보가 없을 때만
+        # 미배정 비용: 순위 합(< 2n·R)보다 정감독 가중치가, 정감독 가중치 합보다 칸 가중치가 크게
+        R = len(cells); B = 2 * n * R + 1; A = (R + 1) * B
+        keep = np.nonzero(ok.any(axis=0))[0]  # 이번 교시 어느 칸에도 못 가는 교사는 열에서 제외
+        cost = np.full((R, len(keep) + R), np.inf)
+        cost[:, :len(keep)] = np.where(ok[:, keep], pref[:, keep], np.inf)
+        cost[:, len(keep):] = (A + np.where(role == 0, B, 0))[:, None]
+        cols = assign_min_cost(cost)
+        last = None
+        for ((g, c), r), j in zip(cells, cols.tolist()):
+            if j >= len(keep): continue
+            k = int(keep[j]); name = self.names[k]
+            per_slot[(g, c)][r] = name
+            if r == 0: st.running_chief[name] += 1
+            else:
+                st.running_asst[name] += 1
+                if self.is_parent[k]: st.parent_daily_asst[name][d] += 1
+            last = k
+        if last is not None: st.last_idx = (int(self.orig[last]) + 1) % st.total_t
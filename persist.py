@@ -0,0 +1,85 @@
+# persist.py — 변경분만 저장: 마지막으로 불러오거나 저장한 상태(base)와 비교해 바뀐 칸/교사만 기록
+# + 낙관적 버전 확인 (다른 사람이 그 사이 저장했으면 덮어쓰지 않음)
+from __future__ import annotations
+import pandas as pd
+from store import AssignmentStore
+from changes import KEY, changed_names, diff_cells  # noqa: F401 — 기존 import 경로 유지
+
+CELL_COLS = KEY + ["chief", "assistant"]
+VERSION_CELL = "H1"  # 구글 시트 저장 탭의 버전 칸 (A:F는 배정 표)
+
+class VersionConflict(Exception):
+    """저장 대상의 버전이 불러올 때와 달라 저장하지 않음"""
+
+class SaveFailed(Exception):
+    """버전 저장 중 기록 실패 (충돌 아님) — 저장 전 상태로 되돌린 뒤 알림. rolled_back=False면 되돌리기도 실패"""
+    def __init__(self, msg: str, rolled_back: bool = True):
+        super().__init__(msg); self.rolled_back = rolled_back
+
+def as_store(assignments) -> AssignmentStore:
+    """JSON 문자열(이전 저장 형식) / dict / AssignmentStore → AssignmentStore"""
+    if isinstance(assignments, str): return AssignmentStore.from_json(assignments)
+    return assignments if isinstance(assignments, AssignmentStore) else AssignmentStore.from_dict(assignments)
+
+def cell_changes(store: AssignmentStore, previous=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """칸 단위 저장소에 쓸 (기록할 칸 CELL_COLS, 지울 칸 KEY) — previous가 없으면 전체 기록 (호출 측에서 세션 전체 삭제)"""
+    if previous is None: return store.to_df(), pd.DataFrame(columns=KEY)
+    diff = diff_cells(as_store(previous), store)
+    put = diff[diff["change"] != "removed"].rename(columns={"chief_new": "chief", "assistant_new": "assistant"})
+    return put[CELL_COLS], diff[diff["change"] == "removed"][KEY]
+
+class SheetTracker:
+    """구글 시트 저장 탭의 마지막 내용과 각 칸의 행 번호, 버전"""
+    def __init__(self, df: pd.DataFrame, version: int = 0):
+        self.base = AssignmentStore.from_df(df)
+        self.rows = {k: i + 2 for i, k in enumerate(zip(*(df[c].astype(int) for c in KEY)))} if not df.empty else {}  # 1행은 헤더
+        self.version = version
+
+    @staticmethod
+    def read_version(ws) -> int:
+        try: return int(ws.acell(VERSION_CELL).value or 0)
+        except (TypeError, ValueError): return 0
+
+    def save(self, ws, current) -> int:
+        """바뀐 칸만 범위 일괄 갱신 → 저장한 칸 수. 칸이 생기거나 없어지면 전체 다시 쓰기.
+        시트 API에는 조건부 쓰기가 없어 버전 확인(H1 읽기)과 쓰기가 원자적이지 않다 — 두 곳이 같은 버전을 읽고 거의 동시에 쓰면
+        나중 쓰기가 이김(둘 다 같은 새 버전을 씀). 바뀐 칸 계산을 먼저 끝내 확인 직후 바로 쓰도록 해 그 틈을 요청 한 번 사이로 줄인다."""
+        diff = diff_cells(self.base, current)
+        full = not diff.empty and ((diff["change"] != "changed").any() or any(k not in self.rows for k in zip(*(diff[c] for c in KEY))))
+        updates = [] if full else [{"range": f"E{self.rows[(d, p, g, c)]}:F{self.rows[(d, p, g, c)]}", "values": [[ch, ass]]}
+                                   for d, p, g, c, ch, ass in diff[KEY + ["chief_new", "assistant_new"]].itertuples(index=False)]
+        version = self.read_version(ws)
+        if version != self.version: raise VersionConflict(f"시트가 다른 곳에서 저장되었습니다 (버전 {version} ≠ {self.version})")
+        if diff.empty: return 0
+        if full: return self.save_full(ws, current)
+        self.version += 1
+        ws.batch_update(updates + [{"range": VERSION_CELL, "values": [[self.version]]}])
+        self.base = AssignmentStore.from_dict(current)
+        return len(diff)
+
+    @classmethod
+    def first_save(cls, ws, current) -> tuple["SheetTracker", int]:
+        """불러오지 않고 처음 저장 (세션의 첫 저장) → (추적기, 저장한 칸 수).
+        시트에 이미 배정 행이 있고 버전이 0이 아니면 다른 사람이 저장한 것이므로 덮어쓰지 않음."""
+        version = cls.read_version(ws)
+        if version != 0 and ws.acell("A2").value not in (None, ""):
+            raise VersionConflict(f"시트에 이미 저장된 배정이 있습니다 (버전 {version})")
+        tracker = cls(pd.DataFrame(), version)
+        return tracker, tracker.save_full(ws, current)
+
+    def save_full(self, ws, current) -> int:
+        df = AssignmentStore.from_dict(current).to_df()
+        self.version += 1
+        ws.clear(); ws.update([df.columns.values.tolist()] + df.values.tolist())
+        ws.update(VERSION_CELL, [[self.version]])
+        self.base, self.rows = AssignmentStore.from_df(df), {k: i + 2 for i, k in enumerate(zip(*(df[c] for c in KEY)))}
+        return len(df)
+
+    @classmethod
+    def load(cls, ws) -> tuple["SheetTracker", AssignmentStore]:
+        """시트에서 불러오면서 추적 시작"""
+        records = ws.get_all_records()
+        df = pd.DataFrame(records)
+        if not df.empty: df = df[[c for c in df.columns if c in KEY + ["chief", "assistant"]]]
+        tracker = cls(df, cls.read_version(ws))
+        return tracker, tracker.base.copy()
@@ -0,0 +1,113 @@
+# profiling.py — 단계별 시간·카운터·교시별 후보 통계 (앱 디버그 패널·CLI 공용)
+# 꺼져 있으면 플래그 확인 한 번 외에는 아무 일도 하지 않는다 (교사 단위 루프 안에는 계측 코드 없음)
+# 켜짐 여부와 기록기는 contextvar — Streamlit은 세션마다 스크립트 스레드가 따로라 한 사용자의 계측이 다른 세션에 섞이지 않는다.
+from __future__ import annotations
+import cProfile, io, pstats, sys, threading, time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+_NULL = nullcontext()
+
+@dataclass
+class _Stage:
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+@dataclass
+class Recorder:
+    """stages: 단계 이름 → 호출 수·누적/최대 시간, counters: 이름 → 합계, slots: 최근 교시별 통계"""
+    stages: dict = field(default_factory=dict)
+    counters: dict = field(default_factory=dict)
+    slots: deque = field(default_factory=lambda: deque(maxlen=5000))
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, name: str, dt: float):
+        with self._lock:
+            s = self.stages.setdefault(name, _Stage()); s.calls += 1; s.total_s += dt; s.max_s = max(s.max_s, dt)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def slot(self, **stats):
+        with self._lock: self.slots.append(stats)
+
+    def reset(self):
+        with self._lock: self.stages.clear(); self.counters.clear(); self.slots.clear()
+
+    def report(self) -> dict:
+        with self._lock:
+            return {"stages": {k: {"calls": s.calls, "total_ms": round(1000 * s.total_s, 2), "avg_ms": round(1000 * s.total_s / s.calls, 2), "max_ms": round(1000 * s.max_s, 2)}
+                               for k, s in sorted(self.stages.items(), key=lambda kv: -kv[1].total_s)},
+                    "counters": dict(sorted(self.counters.items())), "slots": list(self.slots)}
+
+REC = Recorder()  # CLI 등 단일 사용자용 기본 기록기
+_ACTIVE: ContextVar[Recorder | None] = ContextVar("profiling_recorder", default=None)
+
+def enable(on: bool = True, rec: Recorder | None = None):
+    """현재 컨텍스트(스레드)의 계측 켜기/끄기 — rec을 주면 그 기록기에 (앱은 세션별 기록기)"""
+    _ACTIVE.set((rec or REC) if on else None)
+
+def enabled() -> bool:
+    return _ACTIVE.get() is not None
+
+def recorder() -> Recorder:
+    """현재 컨텍스트의 기록기 (꺼져 있으면 기본 기록기)"""
+    return _ACTIVE.get() or REC
+
+@contextmanager
+def _timer(rec: Recorder, name: str):
+    t0 = time.perf_counter()
+    try: yield
+    finally: rec.add(name, time.perf_counter() - t0)
+
+def stage(name: str):
+    """with stage("이름"): ... — 켜져 있을 때만 시간 기록"""
+    rec = _ACTIVE.get()
+    return _timer(rec, name) if rec is not None else _NULL
+
+def timed(name: str):
+    """함수 전체를 stage(name)으로 감싸는 데코레이터"""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kw):
+            rec = _ACTIVE.get()
+            if rec is None: return fn(*args, **kw)
+            with _timer(rec, name): return fn(*args, **kw)
+        return wrapper
+    return deco
+
+def count(name: str, n: int = 1):
+    rec = _ACTIVE.get()
+    if rec is not None: rec.count(name, n)
+
+class CountingOrder:
+    """탐욕 엔진의 후보 순서(_SortOrder/_BucketOrder)를 감싸 꺼낸 후보 수를 센다 — 계측이 켜졌을 때만 사용"""
+    def __init__(self, order):
+        self.order, self.scanned = order, 0
+
+    def _counted(self, it):
+        for t in it:
+            self.scanned += 1; yield t
+
+    def chiefs(self): return self._counted(self.order.chiefs())
+    def assts(self, d, prev_asst): return self._counted(self.order.assts(d, prev_asst))
+    def moved(self, name): self.order.moved(name)
+
+def profile_call(fn, *args, top: int = 30, sort: str = "cumulative", **kw):
+    """cProfile로 fn(*args, **kw) 1회 실행 → (결과, 상위 top개 함수 표 문자열)"""
+    prof = cProfile.Profile()
+    result = prof.runcall(fn, *args, **kw)
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).strip_dirs().sort_stats(sort).print_stats(top)
+    return result, buf.getvalue()
+
+def report(rec: Recorder | None = None) -> dict:
+    """구조화 보고서 — 단계·카운터·교시 통계(rec, 기본은 현재 컨텍스트의 기록기) + 구글 시트/Supabase 호출 통계(clients.POOL)"""
+    out = (rec or recorder()).report()
+    clients = sys.modules.get("clients")
+    if clients is not None: out["clients"] = clients.POOL.metrics()
+    return out
@@ -0,0 +1,153 @@
+# roster.py — 명단 DataFrame을 pandas 문자열 연산으로 한 번에 토큰화 → 정수 코드 제약 테이블
+# (행 단위 parse_exclude_rules / parse_extra_classes / parse_available_to_exclude와 같은 결과)
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+
+# 제약 종류 (cons["kind"])
+EXC_T, SPEC_T, EXC_C, EXC_TC, EXTRA, AVAIL = range(6)
+_CONS_COLS = ["tid", "kind", "d", "p", "g", "c"]
+_TIME = r"^D(\d+)P(\d+)$"
+_DAY = r"^D(\d+)$"
+_CLASS = r"^(?:C)?(\d+)-(\d+)$"
+_RANGE = r"^(\d+)-(\d+)~(\d+)$"
+
+def _col(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series("", index=df.index, dtype=object)
+
+def _text(s: pd.Series) -> pd.Series:
+    """행마다 str(값)을 한 것과 같은 문자열화 — 결측은 "nan" (astype(str)은 pandas 버전에 따라 결측을 그대로 둠)"""
+    return pd.Series([str(v) for v in s.to_numpy(dtype=object)], index=s.index, dtype=object)
+
+def _blank(s: pd.Series) -> pd.Series:
+    return s.str.lower().isin(("nan", "none", ""))
+
+def _split(s: pd.Series, tids: np.ndarray, pat: str, regex: bool = False) -> pd.Series:
+    """규칙 문자열 → 토큰 Series (index = 명단 tid)"""
+    s = s.set_axis(tids).mask(_blank(s).to_numpy(), "")
+    tok = s.str.split(pat, regex=regex).explode()
+    return tok[tok.notna() & (tok != "")].astype(str)
+
+def _rows(kind: int, tid, d=-1, p=-1, g=-1, c=-1) -> pd.DataFrame:
+    n = len(tid)
+    return pd.DataFrame({"tid": np.asarray(tid, dtype=np.int64), "kind": np.full(n, kind, dtype=np.int8),
+                         **{k: np.broadcast_to(np.asarray(v, dtype=np.int64), n) for k, v in (("d", d), ("p", p), ("g", g), ("c", c))}})
+
+def _ints(df: pd.DataFrame) -> list[np.ndarray]:
+    return [df[k].astype(np.int64).to_numpy() for k in df.columns]
+
+def _expand_days(tid: np.ndarray, days: np.ndarray, max_p: int):
+    """D3 → (3, 1..max_p)"""
+    return np.repeat(tid, max_p), np.repeat(days, max_p), np.tile(np.arange(1, max_p + 1), len(tid))
+
+def _exclude_rows(raw: pd.Series, tids: np.ndarray, max_p: int) -> list[pd.DataFrame]:
+    tok = _split(_text(raw).str.strip().str.upper().str.replace(" ", "", regex=False), tids, ";")
+    out, at = [], tok.str.contains("@", regex=False)
+    if at.any():
+        parts = tok[at].str.split("@", n=1, expand=True)
+        t, c = parts[0].str.extract(_TIME), parts[1].str.extract(_CLASS)
+        ok = (t.notna().all(axis=1) & c.notna().all(axis=1)).to_numpy()
+        if ok.any():
+            (d, p), (g, cc) = _ints(t[ok]), _ints(c[ok])
+            out.append(_rows(EXC_TC, parts.index[ok], d, p, g, cc))
+    tok = tok[~at]
+    t = tok.str.extract(_TIME); ok = t.notna().all(axis=1).to_numpy()
+    if ok.any():
+        d, p = _ints(t[ok]); out += [_rows(EXC_T, tok.index[ok], d, p), _rows(SPEC_T, tok.index[ok], d, p)]
+    day = tok.str.extract(_DAY)[0]; okd = day.notna().to_numpy()
+    if okd.any():
+        tid, d, p = _expand_days(tok.index[okd].to_numpy(), day[okd].astype(np.int64).to_numpy(), max_p)
+        out.append(_rows(EXC_T, tid, d, p))
+    c = tok.str.extract(_CLASS); okc = c.notna().all(axis=1).to_numpy()
+    if okc.any():
+        g, cc = _ints(c[okc]); out.append(_rows(EXC_C, tok.index[okc], g=g, c=cc))
+    return out
+
+def _extra_rows(raw: pd.Series, tids: np.ndarray) -> list[pd.DataFrame]:
+    tok = _split(_text(raw).str.strip(), tids, r"[;,]", regex=True).str.strip()
+    out = []
+    r = tok.str.extract(_RANGE); okr = r.notna().all(axis=1).to_numpy()
+    if okr.any():
+        g, c1, c2 = _ints(r[okr]); n = np.maximum(c2 - c1 + 1, 0)
+        start = np.repeat(c1 - np.cumsum(n) + n, n)  # 범위 c1..c2 펼치기
+        out.append(_rows(EXTRA, np.repeat(tok.index[okr].to_numpy(), n), g=np.repeat(g, n), c=start + np.arange(n.sum())))
+    single = tok[~okr].str.upper().str.replace(" ", "", regex=False).str.extract(_CLASS)
+    ok = single.notna().all(axis=1).to_numpy()
+    if ok.any():
+        g, c = _ints(single[ok]); out.append(_rows(EXTRA, single.index[ok], g=g, c=c))
+    return out
+
+def _avail_rows(raw: pd.Series, tids: np.ndarray, max_p: int) -> tuple[list[pd.DataFrame], np.ndarray]:
+    """available 토큰 → AVAIL 행, 그리고 규칙이 비어 있지 않은(=제한이 있는) 명단 tid"""
+    s = _text(raw).str.strip().str.upper().str.replace(" ", "", regex=False)
+    restricted = tids[~_blank(s).to_numpy()]
+    tok, out = _split(s, tids, ";"), []
+    t = tok.str.extract(_TIME); ok = t.notna().all(axis=1).to_numpy()
+    if ok.any():
+        d, p = _ints(t[ok]); out.append(_rows(AVAIL, tok.index[ok], d, p))
+    day = tok.str.extract(_DAY)[0]; okd = day.notna().to_numpy()
+    if okd.any():
+        tid, d, p = _expand_days(tok.index[okd].to_numpy(), day[okd].astype(np.int64).to_numpy(), max_p)
+        out.append(_rows(AVAIL, tid, d, p))
+    return out, restricted
+
+def _people(df: pd.DataFrame, role: str, start: int) -> pd.DataFrame:
+    names = _text(_col(df, "name")).str.strip()
+    prio = pd.to_numeric(_col(df, "priority").astype(object), errors="coerce").to_numpy(dtype=float)
+    prio = np.where(np.isfinite(prio), np.trunc(np.nan_to_num(prio, nan=999.0, posinf=999.0, neginf=999.0)), 999).astype(np.int64)
+    out = pd.DataFrame({"name": names.to_numpy(), "role": role, "priority": prio})
+    out["tid"] = np.arange(start, start + len(out))  # 교사는 t_df 행 위치, 학부모는 len(t_df) + p_df 행 위치
+    return out[out["name"] != ""]
+
+class Roster:
+    """명단 = people(tid·이름·역할·우선순위) + cons(제약 1건당 1행, 정수 코드).
+    빨라진 부분은 문자열 파싱(열 단위)이다. Teacher 객체는 teachers()가 cons에서 한 번에 만들어 캐시하고,
+    build_teachers는 곧바로 부르므로 명단을 읽을 때 전원을 만든다 — 배정·EligibilityIndex·검증·통계가 모두 Teacher 목록을
+    받으므로 일부러 미루지 않음 (사람 수 × 제약 수에 비례, 수백 명 규모에서 파싱보다 작음)."""
+    def __init__(self, people: pd.DataFrame, cons: pd.DataFrame, num_days: int, max_p: int = 10, restricted: np.ndarray | None = None):
+        self.people, self.cons, self.num_days, self.max_p = people, cons, num_days, max_p
+        self.restricted = set(np.asarray(restricted if restricted is not None else [], dtype=np.int64).tolist())
+        self._teachers = None
+
+    @classmethod
+    def from_frames(cls, t_df: pd.DataFrame, p_df: pd.DataFrame, num_days: int = 10, max_p: int = 10) -> "Roster":
+        t_df = t_df if t_df is not None else pd.DataFrame(); p_df = p_df if p_df is not None else pd.DataFrame()
+        t_people, p_people = _people(t_df, "교사", 0), _people(p_df, "학부모", len(t_df))
+        parts, restricted = [], np.empty(0, dtype=np.int64)
+        if len(t_people):
+            rows = t_df.iloc[t_people["tid"].to_numpy()]
+            tids = t_people["tid"].to_numpy()
+            parts += _exclude_rows(_col(rows, "exclude"), tids, max_p) + _extra_rows(_col(rows, "extra_classes"), tids)
+        if len(p_people):
+            rows = p_df.iloc[p_people["tid"].to_numpy() - len(t_df)]
+            tids = p_people["tid"].to_numpy()
+            avail, restricted = _avail_rows(_col(rows, "available"), tids, max_p)
+            parts += avail + _extra_rows(_col(rows, "extra_classes"), tids)
+        cons = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame({k: pd.Series(dtype=np.int64) for k in _CONS_COLS})
+        return cls(pd.concat([t_people, p_people], ignore_index=True), cons, num_days, max_p, restricted)
+
+    def teachers(self) -> list:
+        if self._teachers is None: self._teachers = self._build()
+        return self._teachers
+
+    def _build(self) -> list:
+        from scheduler import Teacher
+        sets = defaultdict(lambda: defaultdict(set))
+        for kind, sub in self.cons.groupby("kind", sort=False):
+            tid, d, p, g, c = (sub[k].to_numpy().tolist() for k in ("tid", "d", "p", "g", "c"))
+            if kind in (EXC_T, SPEC_T, AVAIL): items = zip(tid, zip(d, p))
+            elif kind in (EXC_C, EXTRA): items = zip(tid, zip(g, c))
+            else: items = zip(tid, zip(d, p, g, c))
+            for t, key in items: sets[t][kind].add(key)
+        grid = {(d, p) for d in range(1, self.num_days + 1) for p in range(1, self.max_p + 1)}
+        out = []
+        for tid, name, role, prio in zip(self.people["tid"].tolist(), self.people["name"].tolist(), self.people["role"].tolist(), self.people["priority"].tolist()):
+            s = sets.get(tid, {})
+            if role == "교사":
+                out.append(Teacher(name=name, role=role, priority=prio, exclude_times=set(s.get(EXC_T, ())), exclude_classes=set(s.get(EXC_C, ())),
+                                   exclude_time_class=set(s.get(EXC_TC, ())), extra_classes=set(s.get(EXTRA, ())), specific_excludes=set(s.get(SPEC_T, ()))))
+            else:
+                exc_t = grid - s.get(AVAIL, set()) if tid in self.restricted else set()
+                out.append(Teacher(name=name, role=role, priority=prio, exclude_times=exc_t, extra_classes=set(s.get(EXTRA, ()))))
+        return out
@@ -1,10 +1,18 @@
 # scheduler.py — 시험 시감 자동 배정 알고리즘 v5.0
 from __future__ import annotations
 import re
+import time
+import numpy as np
 import pandas as pd
+import profiling
+from bisect import bisect_left, insort
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Optional
+from eligibility import EligibilityIndex
+from optimal import FlowSolver
+from roster import Roster
+from store import AssignmentStore
 
 @dataclass
 class Teacher:
@@ -71,27 +79,11 @@ def parse_extra_classes(raw: str) -> set:
         if single_m: result.add((int(single_m.group(1)), int(single_m.group(2))))
     return result
 
+@profiling.timed("build_teachers")
 def build_teachers(t_df, p_df, num_days: int = 10) -> list[Teacher]:
-    teachers = []
-    if not t_df.empty:
-        for _, row in t_df.iterrows():
-            name = str(row.get("name", "")).strip()
-            if not name: continue
-            exc_t, exc_c, exc_tc, spec_t = parse_exclude_rules(row.get("exclude", ""))
-            extra = parse_extra_classes(row.get("extra_classes", ""))
-            try: prio = int(float(row.get("priority"))) if pd.notnull(row.get("priority")) else 999
-            except: prio = 999
-            teachers.append(Teacher(name=name, role="교사", priority=prio, exclude_times=exc_t, exclude_classes=exc_c, exclude_time_class=exc_tc, extra_classes=extra, specific_excludes=spec_t))
-    if not p_df.empty:
-        for _, row in p_df.iterrows():
-            name = str(row.get("name", "")).strip()
-            if not name: continue
-            exc_t = parse_available_to_exclude(row.get("available", ""), num_days)
-            extra = parse_extra_classes(row.get("extra_classes", ""))
-            try: prio = int(float(row.get("priority"))) if pd.notnull(row.get("priority")) else 999
-            except: prio = 999
-            teachers.append(Teacher(name=name, role="학부모", priority=prio, exclude_times=exc_t, extra_classes=extra))
-    return teachers
+    """명단 DataFrame → Teacher 목록 (roster.Roster로 열 단위 일괄 파싱, 행별 parse_* 함수와 같은 결과).
+    Teacher는 여기서 모두 만든다 (지연 생성 아님 — 모든 소비자가 목록 전체를 씀)"""
+    return Roster.from_frames(t_df, p_df, num_days).teachers()
 
 def can_assign(t: Teacher, d: int, p: int, g: int, c: int) -> bool:
     if (d, p) in t.exclude_times: return False
@@ -100,54 +92,214 @@ def can_assign(t: Teacher, d: int, p: int, g: int, c: int) -> bool:
     if (g, c) in t.extra_classes: return False
     return True
 
-def run_assignment(teachers: list[Teacher], num_days, num_grades, classes_per_grade, periods_by_day_grade) -> dict:
-    if not teachers: return {}
-    running_chief, running_asst = defaultdict(int), defaultdict(int)
-    parent_daily_asst = defaultdict(lambda: defaultdict(int))
-    last_idx, total_t = 0, len(teachers)
-    orig_idx_map = {t.name: i for i, t in enumerate(teachers)}
-    chief_pool = [t for t in teachers if t.role == "교사"]
-    asst_pool = teachers
+class _SortOrder:
+    """기존 방식: 교실마다 후보 전체를 새 키로 정렬"""
+    def __init__(self, st, chief_pool, asst_pool):
+        self.st, self.chief_pool, self.asst_pool = st, chief_pool, asst_pool
+
+    def chiefs(self):
+        st = self.st
+        return sorted(self.chief_pool, key=lambda t: (st.running_chief[t.name], t.priority, (st.orig_idx_map[t.name] - st.last_idx) % st.total_t))
+
+    def assts(self, d, prev_asst):
+        st = self.st
+        def as_key(t):
+            pen = 1 if t.name == prev_asst else 0
+            if t.role == "학부모":
+                u2 = 0 if st.parent_daily_asst[t.name][d] < 2 else 1
+                return (0, u2, st.running_asst[t.name], pen, (st.orig_idx_map[t.name] - st.last_idx) % st.total_t)
+            else:
+                return (1, st.running_asst[t.name], st.running_chief[t.name], pen, (st.orig_idx_map[t.name] - st.last_idx) % st.total_t)
+        return sorted(self.asst_pool, key=as_key)
+
+    def moved(self, name): pass
+
+class _Buckets:
+    """정렬키 앞부분(카운터·우선순위)별 버킷 + 버킷 안은 원래 인덱스 순 → 회전 오프셋 순서를 bisect로 재현"""
+    def __init__(self, members, key_fn):
+        self.key_fn, self.keys, self.b, self.where, self.by_name = key_fn, [], {}, {}, defaultdict(list)
+        for m in members: self.by_name[m[2].name].append(m); self._add(m)
+
+    def _add(self, m):
+        k = self.key_fn(m[2]); lst = self.b.get(k)
+        if lst is None: lst = self.b[k] = []; insort(self.keys, k)
+        insort(lst, m); self.where[m[1]] = k
+
+    def _remove(self, m):
+        k = self.where.pop(m[1]); lst = self.b[k]
+        del lst[bisect_left(lst, m)]
+        if not lst: del self.b[k]; del self.keys[bisect_left(self.keys, k)]
+
+    def update(self, name):
+        for m in self.by_name.get(name, ()):
+            if self.where[m[1]] != self.key_fn(m[2]): self._remove(m); self._add(m)
+
+    def iter(self, last_idx, pen_name=None):
+        for k in list(self.keys):
+            lst = self.b[k]; n = len(lst); i = bisect_left(lst, (last_idx,)); tail = []
+            for j in range(n):
+                t = lst[(i + j) % n][2]
+                if t.name == pen_name: tail.append(t); continue
+                yield t
+            yield from tail
+
+class _BucketOrder:
+    """버킷 기반 후보 순서: 배정될 때마다 해당 교사만 재배치 (정렬 결과와 동일한 순서)"""
+    def __init__(self, st, chief_pool, asst_pool):
+        self.st = st
+        idx = {id(t): i for i, t in enumerate(asst_pool)}
+        # 학부모의 일일 2회 초과(u2) 여부는 어차피 배정 시 건너뛰므로 키에서 제외해도 선택 결과가 같다
+        self.ch = _Buckets([(st.orig_idx_map[t.name], idx[id(t)], t) for t in chief_pool], lambda t: (st.running_chief[t.name], t.priority))
+        self.asst = _Buckets([(st.orig_idx_map[t.name], idx[id(t)], t) for t in asst_pool],
+                             lambda t: (0, st.running_asst[t.name]) if t.role == "학부모" else (1, st.running_asst[t.name], st.running_chief[t.name]))
+
+    def chiefs(self): return self.ch.iter(self.st.last_idx)
+    def assts(self, d, prev_asst): return self.asst.iter(self.st.last_idx, prev_asst)
+    def moved(self, name): self.ch.update(name); self.asst.update(name)
+
+ENGINES = {"sort": _SortOrder, "heap": _BucketOrder}
+SOLVERS = [*ENGINES, "flow"]  # flow: 교시별 최소 비용 매칭 (optimal.FlowSolver) — 탐욕 엔진과 결과가 다름
+
+def _slot_filler(engine, st, elig, teachers):
+    """(d, p, per_slot, chief_cells, asst_cells, prev_slot)를 받아 한 교시를 채우는 함수"""
+    if engine == "flow": fill, order = FlowSolver(st, elig).fill, None
+    elif engine not in ENGINES: raise ValueError(f"알 수 없는 engine: {engine}")
+    else:
+        order = ENGINES[engine](st, [t for t in teachers if t.role == "교사"], teachers)
+        if profiling.enabled(): order = profiling.CountingOrder(order)
+        fill = lambda *args: _fill_slot(st, order, elig, *args)
+    if not profiling.enabled(): return fill
+    def fill_recorded(d, p, per_slot, chief_cells, asst_cells, prev_slot):
+        scanned = order.scanned if order is not None else 0
+        t0 = time.perf_counter()
+        fill(d, p, per_slot, chief_cells, asst_cells, prev_slot)
+        _record_slot(st, elig, engine, d, p, per_slot, chief_cells, asst_cells, time.perf_counter() - t0, order.scanned - scanned if order is not None else None)
+    return fill_recorded
+
+def _record_slot(st, elig, engine, d, p, per_slot, chief_cells, asst_cells, seconds, scanned):
+    """계측용 교시 통계: 채운 칸, 꺼내 본 후보 수(탐욕 엔진), 규칙별로 배정 불가였던 (교사, 칸) 수"""
+    rejected = defaultdict(int)
+    for (g, c) in set(chief_cells) | set(asst_cells):
+        for rule, n in elig.reject_counts(d, p, g, c).items(): rejected[rule] += n
+    filled = [per_slot[gc][r] != "(미배정)" for r, cells in ((0, chief_cells), (1, asst_cells)) for gc in cells]
+    profiling.recorder().slot(day=d, period=p, engine=engine, ms=round(1000 * seconds, 3), cells=len(filled), filled=sum(filled), scanned=scanned,
+                            parents_capped=sum(1 for days in st.parent_daily_asst.values() if days.get(d, 0) >= 2), **{f"rejected_{k}": v for k, v in rejected.items()})
+
+class _RunState:
+    def __init__(self, teachers, history=None):
+        self.running_chief, self.running_asst = defaultdict(int), defaultdict(int)
+        self.parent_daily_asst = defaultdict(lambda: defaultdict(int))
+        self.last_idx, self.total_t = 0, len(teachers)
+        self.orig_idx_map = {t.name: i for i, t in enumerate(teachers)}
+        for name, (ch, ass) in (history or {}).items():  # 이전 학기 누적 (ledger.Ledger.seed)
+            if name in self.orig_idx_map: self.running_chief[name], self.running_asst[name] = int(ch), int(ass)
+
+def _layout_slots(num_days, num_grades, classes_per_grade, periods_by_day_grade) -> list[tuple[tuple[int, int], list[tuple[int, int]]]]:
+    """[((d, p), 활성 교실 목록)] — 일차별 최대 교시까지, 해당 교시가 있는 학년의 교실만"""
     slots = []
     for d in range(1, num_days + 1):
         max_p = max((int(periods_by_day_grade[d - 1][g - 1]) for g in range(1, num_grades + 1)), default=0)
-        for p in range(1, max_p + 1): slots.append((d, p))
+        for p in range(1, max_p + 1):
+            slots.append(((d, p), [(g, c) for g in range(1, num_grades + 1) for c in range(1, classes_per_grade + 1) if int(periods_by_day_grade[d - 1][g - 1]) >= p]))
+    return slots
+
+def _fill_slot(st, order, elig, d, p, per_slot, chief_cells, asst_cells, prev_slot):
+    """한 교시 안에서 chief_cells의 정감독, asst_cells의 부감독을 탐욕 순서로 채움 (per_slot을 직접 수정).
+    per_slot에 이미 들어 있는 이름은 이번 교시 배정된 것으로 간주. prev_slot은 직전 교시 배정(1교시면 None)."""
+    pos = elig.pos
+    free = np.ones(elig.n, dtype=bool)  # 이번 교시 미배정 교사
+    for pair in per_slot.values():
+        for name in pair:
+            if name != "(미배정)": free[elig.indices(name)] = False
+    # 이 교시에 시간이 되는 사람이 모두 배정되면 남은 교실은 볼 필요 없음 (feasibility.analyze의 빈 교시와 같은 조건)
+    avail = elig.time_mask(d, p)
+    for (g, c) in chief_cells:
+        ok = elig.mask(d, p, g, c) & free & elig.is_teacher
+        if not ok.any():
+            if avail is not None and not (avail & free & elig.is_teacher).any(): break
+            continue
+        ok = ok.tolist()
+        for t in order.chiefs():
+            if not ok[pos[id(t)]]: continue
+            per_slot[(g, c)][0] = t.name; st.running_chief[t.name] += 1; free[elig.indices(t.name)] = False; st.last_idx = (st.orig_idx_map[t.name] + 1) % st.total_t; order.moved(t.name); break
+    for (g, c) in asst_cells:
+        ok = elig.mask(d, p, g, c) & free
+        if not ok.any():
+            if avail is not None and not (avail & free).any(): break
+            continue
+        ok = ok.tolist()
+        prev_asst = prev_slot.get((g, c), (None, "(미배정)"))[1] if prev_slot is not None else "(없음)"
+        for t in order.assts(d, prev_asst):
+            if not ok[pos[id(t)]]: continue
+            if t.name == per_slot[(g, c)][0]: continue
+            if t.role == "학부모" and st.parent_daily_asst[t.name][d] >= 2: continue
+            per_slot[(g, c)][1] = t.name; st.running_asst[t.name] += 1; free[elig.indices(t.name)] = False; st.last_idx = (st.orig_idx_map[t.name] + 1) % st.total_t
+            if t.role == "학부모": st.parent_daily_asst[t.name][d] += 1
+            order.moved(t.name)
+            break
+
+@profiling.timed("run_assignment")
+def run_assignment(teachers: list[Teacher], num_days, num_grades, classes_per_grade, periods_by_day_grade, engine: str = "sort", history: Optional[dict] = None) -> dict:
+    """engine: "sort"(기존 전체 정렬) | "heap"(버킷 증분 갱신, 동일 결과) | "flow"(교시별 최적 매칭, 빈 칸 최소)
+    history: {이름: (정감독, 부감독)} 이전 학기 누적 — 카운터를 0 대신 이 값에서 시작"""
+    if not teachers: return {}
+    if engine not in SOLVERS: raise ValueError(f"알 수 없는 engine: {engine}")
+    st = _RunState(teachers, history)
+    slots = _layout_slots(num_days, num_grades, classes_per_grade, periods_by_day_grade)
+    elig = EligibilityIndex(teachers, num_days, num_grades, classes_per_grade, max((p for (_, p), _ in slots), default=0))
+    fill = _slot_filler(engine, st, elig, teachers)
     classroom_assignments = {}
-    for (d, p) in slots:
-        active_slots = [(g, c) for g in range(1, num_grades + 1) for c in range(1, classes_per_grade + 1) if int(periods_by_day_grade[d - 1][g - 1]) >= p]
-        period_assigned, per_slot = set(), {}
-        for (g, c) in active_slots:
-            ch_name = "(미배정)"
-            sorted_ch = sorted(chief_pool, key=lambda t: (running_chief[t.name], t.priority, (orig_idx_map[t.name] - last_idx) % total_t))
-            for t in sorted_ch:
-                if t.name in period_assigned: continue
-                if not can_assign(t, d, p, g, c): continue
-                ch_name = t.name; running_chief[t.name] += 1; period_assigned.add(t.name); last_idx = (orig_idx_map[t.name] + 1) % total_t; break
-            per_slot[(g, c)] = [ch_name, "(미배정)"]
-        for (g, c) in active_slots:
-            as_name = "(미배정)"
-            prev_asst = classroom_assignments.get((d, p-1), {}).get((g, c), (None, "(미배정)"))[1] if p > 1 else "(없음)"
-            def as_key(t):
-                pen = 1 if t.name == prev_asst else 0
-                if t.role == "학부모":
-                    u2 = 0 if parent_daily_asst[t.name][d] < 2 else 1
-                    return (0, u2, running_asst[t.name], pen, (orig_idx_map[t.name] - last_idx) % total_t)
-                else:
-                    return (1, running_asst[t.name], running_chief[t.name], pen, (orig_idx_map[t.name] - last_idx) % total_t)
-            sorted_as = sorted(asst_pool, key=as_key)
-            for t in sorted_as:
-                if t.name in period_assigned: continue
-                if t.name == per_slot[(g, c)][0]: continue
-                if not can_assign(t, d, p, g, c): continue
-                if t.role == "학부모" and parent_daily_asst[t.name][d] >= 2: continue
-                as_name = t.name; running_asst[t.name] += 1; period_assigned.add(t.name); last_idx = (orig_idx_map[t.name] + 1) % total_t; 
-                if t.role == "학부모": parent_daily_asst[t.name][d] += 1
-                break
-            per_slot[(g, c)][1] = as_name
+    for (d, p), active_slots in slots:
+        per_slot = {gc: ["(미배정)", "(미배정)"] for gc in active_slots}
+        fill(d, p, per_slot, active_slots, active_slots, classroom_assignments.get((d, p - 1), {}) if p > 1 else None)
         classroom_assignments[(d, p)] = {gc: tuple(v) for gc, v in per_slot.items()}
     return classroom_assignments
 
-def compute_teacher_stats(assignments, teacher_list):
+@profiling.timed("repair_assignment")
+def repair_assignment(teachers: list[Teacher], assignments: dict, num_days, num_grades, classes_per_grade, periods_by_day_grade,
+                      changed: Optional[set] = None, pinned: set = frozenset(), fill_holes: bool = False, engine: str = "sort", history: Optional[dict] = None) -> tuple[dict, list]:
+    """기존 배정을 유지한 채 문제가 생긴 칸만 다시 채움 → (새 배정, 다시 푼 (d, p) 목록)
+    changed: 명단/제외 규칙이 바뀐 이름 (None이면 모든 칸 검사)
+    pinned : 그대로 둘 칸 {(d, p, g, c, 0=정감독|1=부감독)} — 수동 수정분
+    명단에 없거나, 제외 규칙에 걸리거나, 같은 교시에 중복된 칸을 비우고, 그 교시의 빈 칸을 기존 누적 횟수에 이어서 채운다.
+    fill_holes=True면 문제가 없는 교시의 빈 칸도 채운다. history는 run_assignment와 같다."""
+    if not teachers: return {}, []
+    if engine not in SOLVERS: raise ValueError(f"알 수 없는 engine: {engine}")
+    slots = _layout_slots(num_days, num_grades, classes_per_grade, periods_by_day_grade)
+    elig = EligibilityIndex(teachers, num_days, num_grades, classes_per_grade, max((p for (_, p), _ in slots), default=0))
+    chief_names = {t.name for t in teachers if t.role == "교사"}
+    result, dirty = {}, []
+    for (d, p), active_slots in slots:
+        old = assignments.get((d, p), {})
+        per_slot = {gc: list(old.get(gc, ("(미배정)", "(미배정)"))) for gc in active_slots}
+        seen, bad = set(), False
+        for (g, c), pair in per_slot.items():
+            for role, name in enumerate(pair):
+                if name == "(미배정)" or (d, p, g, c, role) in pinned: seen.add(name); continue
+                if changed is not None and name not in changed and name in elig.by_name and name not in seen: seen.add(name); continue
+                idx = elig.indices(name)
+                if not len(idx) or (role == 0 and name not in chief_names) or name in seen or not any(elig.ok(i, d, p, g, c) for i in idx):
+                    pair[role] = "(미배정)"; bad = True
+                else: seen.add(name)
+        if bad or (fill_holes and any("(미배정)" in pair for pair in per_slot.values())): dirty.append((d, p))
+        result[(d, p)] = per_slot
+    # 유지되는 칸으로 누적 카운터를 맞춘 뒤 해당 교시만 다시 채움
+    st = _RunState(teachers, history)
+    for (d, p), per_slot in result.items():
+        for ch, ass in per_slot.values():
+            if ch != "(미배정)": st.running_chief[ch] += 1
+            if ass != "(미배정)":
+                st.running_asst[ass] += 1
+                if ass in elig.by_name and elig.teachers[elig.indices(ass)[0]].role == "학부모": st.parent_daily_asst[ass][d] += 1
+    fill = _slot_filler(engine, st, elig, teachers)
+    for (d, p) in dirty:
+        per_slot = result[(d, p)]
+        holes = [(gc, role) for gc, pair in per_slot.items() for role in (0, 1) if pair[role] == "(미배정)" and (d, p, *gc, role) not in pinned]
+        fill(d, p, per_slot, [gc for gc, r in holes if r == 0], [gc for gc, r in holes if r == 1], result.get((d, p - 1)) if p > 1 else None)
+    return {k: {gc: tuple(v) for gc, v in ps.items()} for k, ps in result.items()}, dirty
+
+@profiling.timed("stats.teachers")
+def compute_teacher_stats(assignments, teacher_list, elig: Optional[EligibilityIndex] = None):
     c_chief, c_asst = defaultdict(int), defaultdict(int)
     all_names_in_table = set()
     for ps in assignments.values():
@@ -156,6 +308,7 @@ def compute_teacher_stats(assignments, teacher_list):
             if ass != "(미배정)": c_asst[ass] += 1; all_names_in_table.add(ass)
     parent_names = {t.name for t in teacher_list if t.role == "학부모"}
     teacher_map = {t.name: t for t in teacher_list if t.role == "교사"}
+    corridor = {elig.teachers[i].name: int(n) for i, n in enumerate(elig.corridor_count)} if elig is not None else {}
     for t in teacher_list:
         if t.role == "교사": all_names_in_table.add(t.name)
     rows = []
@@ -163,10 +316,11 @@ def compute_teacher_stats(assignments, teacher_list):
         if name in parent_names: continue
         t_obj = teacher_map.get(name)
         prio = t_obj.priority if t_obj and t_obj.priority < 999 else "-"
-        corridor_count = len(t_obj.specific_excludes) if t_obj else 0
+        corridor_count = corridor.get(name, len(t_obj.specific_excludes)) if t_obj else 0
         rows.append({"이름": name, "우선순위": prio, "정감독": c_chief[name], "부감독": c_asst[name], "복도감독": corridor_count, "합계": c_chief[name] + c_asst[name] + corridor_count})
     return sorted(rows, key=lambda x: (str(x["우선순위"]) if x["우선순위"] != "-" else "999", -x["정감독"]))
 
+@profiling.timed("stats.parents")
 def compute_parent_stats(assignments, teacher_list, num_days):
     daily = defaultdict(lambda: defaultdict(int))
     for (d, p), ps in assignments.items():
@@ -181,16 +335,10 @@ def compute_parent_stats(assignments, teacher_list, num_days):
     return rows
 
 def assignments_to_df(assignments: dict) -> pd.DataFrame:
-    data = []
-    for (d, p), slots in assignments.items():
-        for (g, c), (chief, asst) in slots.items():
-            data.append({"day": d, "period": p, "grade": g, "class": c, "chief": chief, "assistant": asst})
-    return pd.DataFrame(data)
-
-def df_to_assignments(df: pd.DataFrame) -> dict:
-    assignments = {}
-    for _, row in df.iterrows():
-        d, p, g, c = int(row['day']), int(row['period']), int(row['grade']), int(row['class'])
-        if (d, p) not in assignments: assignments[(d, p)] = {}
-        assignments[(d, p)][(g, c)] = (str(row['chief']), str(row['assistant']))
-    return assignments
+    """배정 → (day, period, grade, class, chief, assistant) 표 (AssignmentStore 경유 열 단위 변환)"""
+    store = assignments if isinstance(assignments, AssignmentStore) else AssignmentStore.from_dict(assignments)
+    return store.to_df()
+
+def df_to_assignments(df: pd.DataFrame) -> AssignmentStore:
+    """assignments_to_df 형식의 표 → AssignmentStore (dict와 같은 방식으로 사용 가능)"""
+    return AssignmentStore.from_df(df)
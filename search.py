@@ -0,0 +1,52 @@
+# search.py — 다중 시드 병렬 탐색: 명단 순서(회전 기준·동점 처리)를 섞은 변형들 중 공정성 점수가 가장 좋은 배정 선택
+from __future__ import annotations
+import os, random, time
+from concurrent.futures import ProcessPoolExecutor
+from profiling import timed
+from scheduler import Teacher, run_assignment, compute_teacher_stats
+
+UNASSIGNED = "(미배정)"
+
+def perturb(teachers: list[Teacher], seed: int) -> list[Teacher]:
+    """seed 0은 원래 순서(기존 결과 그대로), 그 외에는 시드별로 섞은 순서"""
+    if seed == 0: return list(teachers)
+    order = list(teachers); random.Random(seed).shuffle(order)
+    return order
+
+def score_assignment(assignments: dict, teachers: list[Teacher]) -> tuple[int, int, int]:
+    """(미배정 칸 수, 교사 합계 최대-최소 차, 같은 날 연속 교시 배정 수) — 사전식으로 작을수록 좋음"""
+    unassigned = sum(v == UNASSIGNED for ps in assignments.values() for pair in ps.values() for v in pair)
+    totals = [r["합계"] for r in compute_teacher_stats(assignments, teachers)]
+    spread = max(totals) - min(totals) if totals else 0
+    busy = {(d, p): {n for pair in ps.values() for n in pair if n != UNASSIGNED} for (d, p), ps in assignments.items()}
+    consecutive = sum(len(names & busy.get((d, p + 1), set())) for (d, p), names in busy.items())
+    return unassigned, spread, consecutive
+
+def _worker(teachers, layout, seeds, deadline, engine, history=None):
+    best = None
+    for seed in seeds:
+        if best is not None and time.time() >= deadline: break
+        asgn = run_assignment(perturb(teachers, seed), *layout, engine=engine, history=history)
+        sc = score_assignment(asgn, teachers)
+        if best is None or (sc, seed) < best: best = (sc, seed)
+    return best
+
+@timed("search")
+def search_assignment(teachers: list[Teacher], num_days, num_grades, classes_per_grade, periods_by_day_grade,
+                      budget_s: float = 10.0, workers: int | None = None, max_seeds: int | None = None, engine: str = "heap",
+                      history: dict | None = None) -> tuple[dict, tuple, int]:
+    """budget_s 동안 모든 코어에서 시드 변형을 돌려 (최적 배정, 점수, 시드) 반환.
+    각 워커는 시드를 workers 간격으로 나눠 맡고 최고 (점수, 시드)만 돌려주므로 코어 수에 비례해 확장된다."""
+    if not teachers: return {}, (0, 0, 0), 0
+    layout = (num_days, num_grades, classes_per_grade, periods_by_day_grade)
+    workers = workers or os.cpu_count() or 1
+    total = max_seeds or 1_000_000
+    deadline = time.time() + budget_s
+    chunks = [range(w, total, workers) for w in range(min(workers, total))]
+    if workers == 1:
+        results = [_worker(teachers, layout, chunks[0], deadline, engine, history)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as ex:
+            results = list(ex.map(_worker, [teachers] * len(chunks), [layout] * len(chunks), chunks, [deadline] * len(chunks), [engine] * len(chunks), [history] * len(chunks)))
+    score, seed = min(r for r in results if r is not None)
+    return run_assignment(perturb(teachers, seed), *layout, engine=engine, history=history), score, seed
@@ -0,0 +1,120 @@
+# stats.py — 배정 통계 집계기: 한 번 만들어 두고 칸 변경마다 O(1)로 갱신
+# compute_teacher_stats / compute_parent_stats와 같은 행 형식 + 일차·교시별 표. 앱 통계·Excel 시트가 이것을 읽는다.
+from __future__ import annotations
+from collections import Counter
+import pandas as pd
+from store import AssignmentStore, UNASSIGNED
+
+def _prio_key(row: dict):
+    return (str(row["우선순위"]) if row["우선순위"] != "-" else "999", -row["정감독"])
+
+class StatsAggregator:
+    """cells: (d, p, g, c) → (정, 부) 사본 (변경 전 값을 알아야 빼고 더할 수 있음).
+    chief/asst: 이름별 횟수, daily: (이름, 일차, 역할) 횟수, slots: (이름, 일차, 교시) 횟수.
+    rows 계열 메서드는 version이 바뀔 때만 다시 만든다."""
+    def __init__(self, assignments, teacher_list, num_days: int, elig=None):
+        self.num_days = num_days
+        self.parent_names = [t.name for t in teacher_list if t.role == "학부모"]
+        self._parents = set(self.parent_names)
+        self.teacher_map = {t.name: t for t in teacher_list if t.role == "교사"}
+        corridor = {elig.teachers[i].name: int(n) for i, n in enumerate(elig.corridor_count)} if elig is not None else {}
+        self.corridor = {n: corridor.get(n, len(t.specific_excludes)) for n, t in self.teacher_map.items()}
+        self.cells: dict[tuple, tuple[str, str]] = {}
+        self.chief, self.asst = Counter(), Counter()
+        self.daily, self.slots = Counter(), Counter()
+        self.version = 0
+        self._cache: dict = {}
+        store = assignments if isinstance(assignments, AssignmentStore) else AssignmentStore.from_dict(assignments)
+        for d, p, g, c, ch, ass in store.to_df().itertuples(index=False): self._add((d, p, g, c), (ch, ass), 1)
+
+    def _add(self, key, pair, sign: int):
+        d, p = key[0], key[1]
+        for name, role, counter in ((pair[0], "정감독", self.chief), (pair[1], "부감독", self.asst)):
+            if name == UNASSIGNED: continue
+            counter[name] += sign; self.daily[name, d, role] += sign; self.slots[name, d, p] += sign
+        if sign > 0: self.cells[key] = pair
+        else: del self.cells[key]
+
+    # ── 갱신 ──
+    def set_cell(self, d: int, p: int, g: int, c: int, chief: str, asst: str):
+        key = (d, p, g, c)
+        old = self.cells.get(key)
+        if old == (chief, asst): return
+        if old is not None: self._add(key, old, -1)
+        self._add(key, (chief, asst), 1)
+        self.version += 1
+
+    def remove_cell(self, d: int, p: int, g: int, c: int):
+        old = self.cells.get((d, p, g, c))
+        if old is None: return
+        self._add((d, p, g, c), old, -1); self.version += 1
+
+    def apply_diff(self, diff: pd.DataFrame):
+        """persist.diff_cells 결과를 한꺼번에 반영"""
+        for d, p, g, c, ch, ass, change in diff[["day", "period", "grade", "class", "chief_new", "assistant_new", "change"]].itertuples(index=False):
+            if change == "removed": self.remove_cell(d, p, g, c)
+            else: self.set_cell(d, p, g, c, ch, ass)
+
+    def _memo(self, name, build):
+        hit = self._cache.get(name)
+        if hit is None or hit[0] != self.version: hit = self._cache[name] = (self.version, build())
+        return hit[1]
+
+    # ── 기존 행 형식 ──
+    def teacher_rows(self) -> list[dict]:
+        """compute_teacher_stats와 같은 행·순서"""
+        def build():
+            names = {n for n, v in self.chief.items() if v} | {n for n, v in self.asst.items() if v} | set(self.teacher_map)
+            rows = []
+            for name in sorted(names - self._parents):
+                t_obj = self.teacher_map.get(name)
+                prio = t_obj.priority if t_obj and t_obj.priority < 999 else "-"
+                corridor = self.corridor.get(name, 0)
+                rows.append({"이름": name, "우선순위": prio, "정감독": self.chief[name], "부감독": self.asst[name], "복도감독": corridor, "합계": self.chief[name] + self.asst[name] + corridor})
+            return sorted(rows, key=_prio_key)
+        return self._memo("teacher_rows", build)
+
+    def parent_rows(self) -> list[dict]:
+        """compute_parent_stats와 같은 행 (학부모는 부감독 횟수만)"""
+        def build():
+            rows = []
+            for name in self.parent_names:
+                days = [self.daily[name, d, "부감독"] for d in range(1, self.num_days + 1)]
+                rows.append({"이름": name, "합계": self.asst[name], **{f"{d}일차": f"{n}회" for d, n in enumerate(days, 1)}})
+            return rows
+        return self._memo("parent_rows", build)
+
+    def teacher_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.teacher_rows())
+
+    def parent_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.parent_rows())
+
+    # ── 추가 보기 ──
+    def daily_frame(self) -> pd.DataFrame:
+        """이름 × 일차 (정+부 횟수), 학부모 포함"""
+        def build():
+            s = pd.Series({(n, d): v for (n, d, _), v in self.daily.items() if v}, dtype=int)
+            if s.empty: return pd.DataFrame(columns=[f"{d}일차" for d in range(1, self.num_days + 1)])
+            out = s.groupby(level=[0, 1]).sum().unstack(fill_value=0).reindex(columns=range(1, self.num_days + 1), fill_value=0)
+            out.columns = [f"{d}일차" for d in out.columns]; out.index.name = "이름"
+            return out
+        return self._memo("daily_frame", build)
+
+    def slot_frame(self) -> pd.DataFrame:
+        """이름 × (일차, 교시) 배정 수 — 2 이상이면 같은 교시 중복"""
+        def build():
+            s = pd.Series({k: v for k, v in self.slots.items() if v}, dtype=int)
+            if s.empty: return pd.DataFrame()
+            out = s.unstack(level=[1, 2], fill_value=0).sort_index(axis=1)
+            out.index.name = "이름"
+            return out
+        return self._memo("slot_frame", build)
+
+    def busy(self, name: str) -> dict[tuple[int, int], int]:
+        """한 사람의 (일차, 교시) → 배정 수 (0 제외)"""
+        return {(d, p): v for (n, d, p), v in self.slots.items() if n == name and v}
+
+    def clashes(self) -> list[tuple[str, int, int]]:
+        """같은 교시에 두 칸 이상 배정된 (이름, 일차, 교시)"""
+        return sorted(k for k, v in self.slots.items() if v > 1)
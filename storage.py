@@ -0,0 +1,401 @@
+# storage.py — db.py 함수들의 교체 가능한 저장소 구현
+#   SQLiteBackend : 로컬 SQLite(WAL) — 네트워크 없이 앱·CLI 실행, 앱 서버에서 1ms 미만 읽기
+#   CachedBackend : Supabase 앞의 읽기 캐시 — 읽기는 로컬 사본(만료 전) → 없으면 원격에서 받아 채움, 쓰기는 원격 후 로컬
+# db.py의 각 함수는 client 자리에 이 객체가 오면 같은 이름의 메서드로 위임한다 (db.get_client가 설정에 따라 반환).
+from __future__ import annotations
+import json, sqlite3, threading, time, uuid
+from datetime import datetime, timezone
+import pandas as pd
+from persist import CELL_COLS, KEY, SaveFailed, as_store, cell_changes
+from store import AssignmentStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exam_sessions (
+  id TEXT PRIMARY KEY, name TEXT NOT NULL, meta TEXT NOT NULL DEFAULT '{}', created_at TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS exam_sessions_created ON exam_sessions (created_at);
+CREATE TABLE IF NOT EXISTS day_teachers (
+  session_id TEXT NOT NULL, day INTEGER NOT NULL, teachers_json TEXT NOT NULL, updated_at TEXT NOT NULL,
+  PRIMARY KEY (session_id, day)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS assignments (
+  session_id TEXT PRIMARY KEY, data TEXT NOT NULL DEFAULT '', version INTEGER NOT NULL DEFAULT 1, updated_at TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS assignment_cells (
+  session_id TEXT NOT NULL, day INTEGER NOT NULL, period INTEGER NOT NULL, grade INTEGER NOT NULL, class INTEGER NOT NULL,
+  chief TEXT NOT NULL, assistant TEXT NOT NULL,
+  PRIMARY KEY (session_id, day, period, grade, class)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assignment_cells_chief ON assignment_cells (session_id, chief);
+CREATE INDEX IF NOT EXISTS assignment_cells_assistant ON assignment_cells (session_id, assistant);
+CREATE TABLE IF NOT EXISTS cumulative_stats (
+  session_id TEXT NOT NULL, name TEXT NOT NULL, chief_total INTEGER NOT NULL DEFAULT 0, assistant_total INTEGER NOT NULL DEFAULT 0, updated_at TEXT NOT NULL,
+  PRIMARY KEY (session_id, name)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fairness_ledger (
+  session_id TEXT NOT NULL, term_at TEXT NOT NULL, name TEXT NOT NULL, role TEXT NOT NULL DEFAULT '교사',
+  chief INTEGER NOT NULL DEFAULT 0, assistant INTEGER NOT NULL DEFAULT 0, corridor INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (session_id, name)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fairness_ledger_term ON fairness_ledger (term_at);
+"""
+_CHILD_TABLES = ("day_teachers", "assignments", "assignment_cells", "cumulative_stats", "fairness_ledger")
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class StorageBackend:
+    """db.py 함수와 같은 이름·인자(client 제외)의 메서드 집합"""
+    kind = "backend"
+
+    def list_sessions(self) -> list[dict]: raise NotImplementedError
+    def create_session(self, name: str, meta: dict) -> str | None: raise NotImplementedError
+    def load_session_meta(self, session_id: str) -> dict: raise NotImplementedError
+    def delete_session(self, session_id: str) -> bool: raise NotImplementedError
+    def save_day_teachers(self, session_id: str, day: int, teachers_json: str) -> bool: raise NotImplementedError
+    def load_day_teachers(self, session_id: str, day: int) -> str | None: raise NotImplementedError
+    def save_assignments(self, session_id: str, assignments, previous=None) -> bool: raise NotImplementedError
+    def save_assignments_versioned(self, session_id: str, assignments, expected_version: int | None, previous=None) -> int | None: raise NotImplementedError  # 충돌 None, 실패 SaveFailed
+    def load_assignments_version(self, session_id: str) -> int | None: raise NotImplementedError
+    def load_assignments(self, session_id: str, day: int | None = None) -> AssignmentStore | None: raise NotImplementedError
+    def load_teacher_cells(self, session_id: str, name: str) -> pd.DataFrame: raise NotImplementedError
+    def migrate_assignments(self, session_id: str | None = None) -> dict: raise NotImplementedError
+    def save_cumulative_stats(self, session_id: str, stats: list[dict], previous: dict | None = None) -> bool: raise NotImplementedError
+    def load_cumulative_stats(self, session_id: str) -> dict: raise NotImplementedError
+    def save_ledger(self, session_id: str, rows: list[dict], term_at: str | None = None) -> bool: raise NotImplementedError
+    def load_ledger_rows(self, since: str | None = None) -> list[dict]: raise NotImplementedError
+
+class SQLiteBackend(StorageBackend):
+    """파일 하나(WAL 모드)에 Supabase와 같은 테이블. 연결 하나를 잠금으로 공유 (Streamlit 스레드 간)."""
+    kind = "sqlite"
+
+    def __init__(self, path: str = "daedong.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        if path != ":memory:": self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _rows(self, sql: str, args=()) -> list[dict]:
+        with self._lock: return [dict(r) for r in self._conn.execute(sql, args).fetchall()]
+
+    def _tx(self, fn):
+        """fn(conn)을 한 트랜잭션으로"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try: out = fn(self._conn)
+            except BaseException: self._conn.execute("ROLLBACK"); raise
+            self._conn.execute("COMMIT")
+            return out
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+    # ── 시험 세션 ──
+    def list_sessions(self) -> list[dict]:
+        return self._rows("SELECT id, name, meta, created_at FROM exam_sessions ORDER BY created_at DESC")
+
+    def create_session(self, name: str, meta: dict) -> str | None:
+        sid = str(uuid.uuid4())
+        self._tx(lambda c: c.execute("INSERT INTO exam_sessions (id, name, meta, created_at) VALUES (?, ?, ?, ?)", (sid, name, json.dumps(meta, ensure_ascii=False), _now())))
+        return sid
+
+    def load_session_meta(self, session_id: str) -> dict:
+        rows = self._rows("SELECT meta FROM exam_sessions WHERE id = ?", (session_id,))
+        try: return json.loads(rows[0]["meta"]) if rows else {}
+        except (TypeError, ValueError): return {}
+
+    def delete_session(self, session_id: str) -> bool:
+        def run(c):
+            c.execute("DELETE FROM exam_sessions WHERE id = ?", (session_id,))
+            for t in _CHILD_TABLES: c.execute(f"DELETE FROM {t} WHERE session_id = ?", (session_id,))
+        self._tx(run)
+        return True
+
+    def put_sessions(self, rows: list[dict]):
+        """원격 세션 목록 사본 (CachedBackend용) — 목록 전체로 교체"""
+        def run(c):
+            c.execute("DELETE FROM exam_sessions")
+            c.executemany("INSERT INTO exam_sessions (id, name, meta, created_at) VALUES (?, ?, ?, ?)",
+                          [(r["id"], r["name"], r["meta"] if isinstance(r.get("meta"), str) else json.dumps(r.get("meta") or {}, ensure_ascii=False), r.get("created_at") or _now()) for r in rows])
+        self._tx(run)
+
+    # ── 일차별 교사 명단 ──
+    def save_day_teachers(self, session_id: str, day: int, teachers_json: str) -> bool:
+        self._tx(lambda c: c.execute("INSERT INTO day_teachers (session_id, day, teachers_json, updated_at) VALUES (?, ?, ?, ?) "
+                                     "ON CONFLICT (session_id, day) DO UPDATE SET teachers_json = excluded.teachers_json, updated_at = excluded.updated_at",
+                                     (session_id, day, teachers_json, _now())))
+        return True
+
+    def load_day_teachers(self, session_id: str, day: int) -> str | None:
+        rows = self._rows("SELECT teachers_json FROM day_teachers WHERE session_id = ? AND day = ?", (session_id, day))
+        return rows[0]["teachers_json"] if rows else None
+
+    # ── 배정 결과 (칸 단위 행 + 버전 행) ──
+    @staticmethod
+    def _write_cells(c, session_id: str, store: AssignmentStore, previous=None):
+        """db._write_cells와 같은 규칙 (칸 행이 없는 이전 형식 세션은 previous를 무시하고 전체 기록), 호출 측 트랜잭션 안에서"""
+        if previous is not None and c.execute("SELECT 1 FROM assignment_cells WHERE session_id = ? LIMIT 1", (session_id,)).fetchone() is None: previous = None
+        put, gone = cell_changes(store, previous)
+        if previous is None: c.execute("DELETE FROM assignment_cells WHERE session_id = ?", (session_id,))
+        c.executemany("DELETE FROM assignment_cells WHERE session_id = ? AND day = ? AND period = ? AND grade = ? AND class = ?",
+                      [(session_id, *map(int, k)) for k in gone[KEY].itertuples(index=False)])
+        c.executemany("INSERT OR REPLACE INTO assignment_cells (session_id, day, period, grade, class, chief, assistant) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      [(session_id, int(d), int(p), int(g), int(cc), ch, ass) for d, p, g, cc, ch, ass in put[CELL_COLS].itertuples(index=False)])
+
+    def save_assignments(self, session_id: str, assignments, previous=None) -> bool:
+        store = as_store(assignments)
+        def run(c):
+            self._write_cells(c, session_id, store, previous)
+            c.execute("INSERT INTO assignments (session_id, data, updated_at) VALUES (?, '', ?) "
+                      "ON CONFLICT (session_id) DO UPDATE SET data = '', updated_at = excluded.updated_at", (session_id, _now()))
+        self._tx(run)
+        return True
+
+    def save_assignments_versioned(self, session_id: str, assignments, expected_version: int | None, previous=None) -> int | None:
+        store = as_store(assignments)
+        def run(c):
+            if expected_version is None:
+                try: c.execute("INSERT INTO assignments (session_id, data, version, updated_at) VALUES (?, '', 1, ?)", (session_id, _now()))
+                except sqlite3.IntegrityError: return None
+                self._write_cells(c, session_id, store); return 1
+            cur = c.execute("UPDATE assignments SET data = '', version = ?, updated_at = ? WHERE session_id = ? AND version = ?",
+                            (expected_version + 1, _now(), session_id, expected_version))
+            if not cur.rowcount: return None
+            self._write_cells(c, session_id, store, previous)
+            return expected_version + 1
+        try: return self._tx(run)  # 버전과 칸이 한 트랜잭션 — 실패하면 둘 다 그대로
+        except sqlite3.Error as e: raise SaveFailed(f"배정 결과 저장 실패: {e}") from e
+
+    def put_assignments(self, session_id: str, store: AssignmentStore, version: int):
+        """원격 배정 사본 (버전 그대로)"""
+        def run(c):
+            self._write_cells(c, session_id, store)
+            c.execute("INSERT OR REPLACE INTO assignments (session_id, data, version, updated_at) VALUES (?, '', ?, ?)", (session_id, version, _now()))
+        self._tx(run)
+
+    def load_assignments_version(self, session_id: str) -> int | None:
+        rows = self._rows("SELECT version FROM assignments WHERE session_id = ?", (session_id,))
+        return rows[0]["version"] if rows else None
+
+    def load_assignments(self, session_id: str, day: int | None = None) -> AssignmentStore | None:
+        sql, args = "SELECT day, period, grade, class, chief, assistant FROM assignment_cells WHERE session_id = ?", (session_id,)
+        if day is not None: sql, args = sql + " AND day = ?", args + (day,)
+        rows = self._rows(sql, args)
+        if rows: return AssignmentStore.from_df(pd.DataFrame(rows, columns=CELL_COLS))
+        blob = self._rows("SELECT data FROM assignments WHERE session_id = ?", (session_id,))
+        if not blob or not blob[0]["data"]: return None
+        store = AssignmentStore.from_json(blob[0]["data"])  # 이전 형식
+        if day is None: return store
+        df = store.to_df()
+        return AssignmentStore.from_df(df[df["day"] == day])
+
+    def load_teacher_cells(self, session_id: str, name: str) -> pd.DataFrame:
+        rows = self._rows("SELECT day, period, grade, class, '정감독' AS role FROM assignment_cells WHERE session_id = ? AND chief = ? "
+                          "UNION ALL SELECT day, period, grade, class, '부감독' FROM assignment_cells WHERE session_id = ? AND assistant = ? "
+                          "ORDER BY day, period, grade, class", (session_id, name, session_id, name))
+        return pd.DataFrame(rows, columns=KEY + ["role"])
+
+    def migrate_assignments(self, session_id: str | None = None) -> dict:
+        sql, args = "SELECT session_id, data FROM assignments WHERE data != ''", ()
+        if session_id: sql, args = sql + " AND session_id = ?", (session_id,)
+        done = {}
+        for r in self._rows(sql, args):
+            store = AssignmentStore.from_json(r["data"])
+            def run(c, sid=r["session_id"], store=store):
+                self._write_cells(c, sid, store)
+                c.execute("UPDATE assignments SET data = '' WHERE session_id = ?", (sid,))
+            self._tx(run)
+            done[r["session_id"]] = len(store.to_df())
+        return done
+
+    # ── 누적 통계 ──
+    def save_cumulative_stats(self, session_id: str, stats: list[dict], previous: dict | None = None) -> bool:
+        """previous는 원격 전송량을 줄이는 용도라 로컬에서는 항상 세션 전체를 교체"""
+        self.put_cumulative(session_id, {r["name"]: {"chief": r.get("정감독(합계)", 0), "assistant": r.get("부감독(합계)", 0)} for r in stats})
+        return True
+
+    def put_cumulative(self, session_id: str, totals: dict):
+        def run(c):
+            c.execute("DELETE FROM cumulative_stats WHERE session_id = ?", (session_id,))
+            c.executemany("INSERT INTO cumulative_stats (session_id, name, chief_total, assistant_total, updated_at) VALUES (?, ?, ?, ?, ?)",
+                          [(session_id, n, int(v["chief"]), int(v["assistant"]), _now()) for n, v in totals.items()])
+        self._tx(run)
+
+    def load_cumulative_stats(self, session_id: str) -> dict:
+        return {r["name"]: {"chief": r["chief_total"], "assistant": r["assistant_total"]}
+                for r in self._rows("SELECT name, chief_total, assistant_total FROM cumulative_stats WHERE session_id = ?", (session_id,))}
+
+    # ── 학기 누적 장부 ──
+    def save_ledger(self, session_id: str, rows: list[dict], term_at: str | None = None) -> bool:
+        def run(c):
+            old = {r[0]: r[1] for r in c.execute("SELECT name, term_at FROM fairness_ledger WHERE session_id = ?", (session_id,))}
+            c.execute("DELETE FROM fairness_ledger WHERE session_id = ?", (session_id,))
+            at = term_at or next(iter(old.values()), None) or _now()  # term_at을 주지 않으면 처음 기록한 시각 유지
+            c.executemany("INSERT INTO fairness_ledger (session_id, term_at, name, role, chief, assistant, corridor) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          [(session_id, at, r["name"], r["role"], int(r["chief"]), int(r["assistant"]), int(r["corridor"])) for r in rows])
+        self._tx(run)
+        return True
+
+    def put_ledger_rows(self, rows: list[dict], since: str | None = None):
+        """원격 장부 사본 — since 이후 범위를 통째로 교체"""
+        def run(c):
+            if since: c.execute("DELETE FROM fairness_ledger WHERE term_at >= ?", (since,))
+            else: c.execute("DELETE FROM fairness_ledger")
+            c.executemany("INSERT OR REPLACE INTO fairness_ledger (session_id, term_at, name, role, chief, assistant, corridor) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          [(r["session_id"], r["term_at"], r["name"], r["role"], r["chief"], r["assistant"], r["corridor"]) for r in rows])
+        self._tx(run)
+
+    def load_ledger_rows(self, since: str | None = None) -> list[dict]:
+        sql = "SELECT session_id, term_at, name, role, chief, assistant, corridor FROM fairness_ledger"
+        if since: return self._rows(sql + " WHERE term_at >= ? ORDER BY term_at, session_id, name", (since,))
+        return self._rows(sql + " ORDER BY term_at, session_id, name")
+
+class CachedBackend(StorageBackend):
+    """원격(Supabase 클라이언트 또는 다른 StorageBackend) 앞의 읽기 캐시.
+    읽기: 같은 키를 ttl 안에 다시 읽으면 로컬 사본, 아니면 원격 → 로컬에 채움. 원격이 실패하거나 비면 로컬 사본(오프라인).
+    쓰기: 원격에 먼저 쓰고 로컬에도 반영."""
+    kind = "cached"
+
+    def __init__(self, remote, local: SQLiteBackend, ttl: float = 30.0):
+        self._remote = remote  # 객체 또는 객체를 돌려주는 함수 (db.get_client의 캐시 클라이언트가 바뀌어도 따라가도록)
+        self.local, self.ttl = local, ttl
+        self._fresh: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def remote(self):
+        return self._remote() if callable(self._remote) and not hasattr(self._remote, "table") else self._remote
+
+    def _is_fresh(self, key) -> bool:
+        with self._lock: t = self._fresh.get(key)
+        return t is not None and time.monotonic() - t < self.ttl
+
+    def _mark(self, *keys, fresh: bool = True):
+        with self._lock:
+            for k in keys:
+                if fresh: self._fresh[k] = time.monotonic()
+                else: self._fresh.pop(k, None)
+
+    def _read(self, key, fetch, fill, local):
+        if self._is_fresh(key) or self.remote is None: return local()
+        value = fetch()
+        if value is None or value == [] or value == {}: return local()
+        fill(value); self._mark(key)
+        return value
+
+    def invalidate(self):
+        with self._lock: self._fresh.clear()
+
+    # ── 읽기 ──
+    def list_sessions(self) -> list[dict]:
+        import db
+        return self._read("sessions", lambda: db.list_sessions(self.remote), self.local.put_sessions, self.local.list_sessions)
+
+    def load_session_meta(self, session_id: str) -> dict:
+        if self._is_fresh("sessions") or self.remote is None: return self.local.load_session_meta(session_id)
+        import db
+        return db.load_session_meta(self.remote, session_id) or self.local.load_session_meta(session_id)
+
+    def load_day_teachers(self, session_id: str, day: int) -> str | None:
+        import db
+        return self._read(("day", session_id, day), lambda: db.load_day_teachers(self.remote, session_id, day),
+                          lambda v: self.local.save_day_teachers(session_id, day, v), lambda: self.local.load_day_teachers(session_id, day))
+
+    def load_assignments_version(self, session_id: str) -> int | None:
+        if self._is_fresh(("asgn", session_id)) or self.remote is None: return self.local.load_assignments_version(session_id)
+        import db
+        v = db.load_assignments_version(self.remote, session_id)
+        return v if v is not None else self.local.load_assignments_version(session_id)
+
+    def load_assignments(self, session_id: str, day: int | None = None) -> AssignmentStore | None:
+        import db
+        if day is not None:  # 하루치만: 사본이 최신이면 로컬, 아니면 원격 (부분 조회라 사본은 채우지 않음)
+            if self._is_fresh(("asgn", session_id)) or self.remote is None: return self.local.load_assignments(session_id, day)
+            return db.load_assignments(self.remote, session_id, day) or self.local.load_assignments(session_id, day)
+        def fetch():
+            store = db.load_assignments(self.remote, session_id)
+            return None if store is None else (store, db.load_assignments_version(self.remote, session_id) or 1)
+        got = self._read(("asgn", session_id), fetch, lambda v: self.local.put_assignments(session_id, *v), lambda: self.local.load_assignments(session_id))
+        return got[0] if isinstance(got, tuple) else got
+
+    def load_teacher_cells(self, session_id: str, name: str) -> pd.DataFrame:
+        if self._is_fresh(("asgn", session_id)) or self.remote is None: return self.local.load_teacher_cells(session_id, name)
+        import db
+        out = db.load_teacher_cells(self.remote, session_id, name)
+        return out if not out.empty else self.local.load_teacher_cells(session_id, name)
+
+    def load_cumulative_stats(self, session_id: str) -> dict:
+        import db
+        return self._read(("cum", session_id), lambda: db.load_cumulative_stats(self.remote, session_id),
+                          lambda v: self.local.put_cumulative(session_id, v), lambda: self.local.load_cumulative_stats(session_id))
+
+    def load_ledger_rows(self, since: str | None = None) -> list[dict]:
+        import db
+        return self._read(("ledger", since), lambda: db.load_ledger_rows(self.remote, since),
+                          lambda v: self.local.put_ledger_rows(v, since), lambda: self.local.load_ledger_rows(since))
+
+    # ── 쓰기 (원격 → 로컬, 원격이 없으면 로컬만) ──
+    # 원격 쓰기가 실패하면(db 함수가 False) 로컬 사본은 건드리지 않고 해당 키를 만료시킴 — 원격에 없는 내용을 사본에서 읽어 주지 않도록
+    def create_session(self, name: str, meta: dict) -> str | None:
+        import db
+        remote = self.remote
+        sid = db.create_session(remote, name, meta) if remote is not None else self.local.create_session(name, meta)
+        self._mark("sessions", fresh=False)
+        return sid
+
+    def delete_session(self, session_id: str) -> bool:
+        import db
+        remote = self.remote
+        ok = db.delete_session(remote, session_id) if remote is not None else True
+        if ok: self.local.delete_session(session_id)
+        self._mark("sessions", ("asgn", session_id), ("cum", session_id), fresh=False)
+        return ok
+
+    def save_day_teachers(self, session_id: str, day: int, teachers_json: str) -> bool:
+        import db
+        remote = self.remote
+        if remote is None: return self.local.save_day_teachers(session_id, day, teachers_json)
+        if not db.save_day_teachers(remote, session_id, day, teachers_json): self._mark(("day", session_id, day), fresh=False); return False
+        self.local.save_day_teachers(session_id, day, teachers_json)
+        self._mark(("day", session_id, day))
+        return True
+
+    def save_assignments(self, session_id: str, assignments, previous=None) -> bool:
+        import db
+        remote = self.remote
+        if remote is None: return self.local.save_assignments(session_id, assignments, previous)
+        self._mark(("asgn", session_id), fresh=False)  # 원격 버전을 모르므로 다음 읽기에서 다시 받음
+        if not db.save_assignments(remote, session_id, assignments, previous): return False
+        # 로컬 사본이 previous 상태였다는 보장이 없으므로(캐시 미스, 사본에 안 채운 원격 읽기) 변경분이 아닌 전체로 기록
+        self.local.save_assignments(session_id, assignments)
+        return True
+
+    def save_assignments_versioned(self, session_id: str, assignments, expected_version: int | None, previous=None) -> int | None:
+        import db
+        remote = self.remote
+        if remote is None: return self.local.save_assignments_versioned(session_id, assignments, expected_version, previous)
+        try: v = db.save_assignments_versioned(remote, session_id, assignments, expected_version, previous)
+        except SaveFailed: self._mark(("asgn", session_id), fresh=False); raise
+        if v is None: self._mark(("asgn", session_id), fresh=False); return None
+        self.local.put_assignments(session_id, as_store(assignments), v); self._mark(("asgn", session_id))
+        return v
+
+    def migrate_assignments(self, session_id: str | None = None) -> dict:
+        import db
+        remote = self.remote
+        done = db.migrate_assignments(remote, session_id) if remote is not None else {}
+        return {**self.local.migrate_assignments(session_id), **done}
+
+    def save_cumulative_stats(self, session_id: str, stats: list[dict], previous: dict | None = None) -> bool:
+        import db
+        remote = self.remote
+        if remote is None: return self.local.save_cumulative_stats(session_id, stats)
+        if not db.save_cumulative_stats(remote, session_id, stats, previous): self._mark(("cum", session_id), fresh=False); return False
+        self.local.save_cumulative_stats(session_id, stats)
+        self._mark(("cum", session_id))
+        return True
+
+    def save_ledger(self, session_id: str, rows: list[dict], term_at: str | None = None) -> bool:
+        import db
+        remote = self.remote
+        ok = db.save_ledger(remote, session_id, rows, term_at) if remote is not None else self.local.save_ledger(session_id, rows, term_at)
+        with self._lock:  # 기간 조회 결과는 모두 다시 받도록 (원격이 있으면 term_at을 원격이 정하므로 로컬 사본은 다음 조회에서 채움)
+            for k in [k for k in self._fresh if isinstance(k, tuple) and k[0] == "ledger"]: del self._fresh[k]
+        return ok
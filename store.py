@@ -0,0 +1,163 @@
+# store.py — NumPy 정수 배열 기반 배정 저장소 ({(d, p): {(g, c): (정, 부)}} dict와 같은 인터페이스)
+from __future__ import annotations
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping, MutableMapping
+
+UNASSIGNED = "(미배정)"
+_ABSENT = -1  # 교실 자체가 없음 (dict에 키가 없는 칸)
+
+class _SlotView(MutableMapping):
+    """store[(d, p)] — 한 교시의 {(g, c): (정, 부)} 뷰. 쓰기는 배열에 바로 반영."""
+    def __init__(self, store: "AssignmentStore", d: int, p: int):
+        self._s, self._d, self._p = store, d, p
+
+    def _row(self): return self._s._arr[self._d, self._p]
+    def __getitem__(self, gc):
+        g, c = gc
+        if not self._s._has(self._d, self._p, g, c): raise KeyError(gc)
+        ch, ass = self._row()[g, c]
+        return self._s.names[ch], self._s.names[ass]
+    def __setitem__(self, gc, pair): self._s.set_cell(self._d, self._p, gc[0], gc[1], pair[0], pair[1])
+    def __delitem__(self, gc):
+        if not self._s._has(self._d, self._p, *gc): raise KeyError(gc)
+        self._row()[gc[0], gc[1]] = _ABSENT
+    def __iter__(self):
+        g, c = np.nonzero(self._row()[..., 0] != _ABSENT)
+        return iter(zip(g.tolist(), c.tolist()))
+    def __len__(self): return int((self._row()[..., 0] != _ABSENT).sum())
+    def __repr__(self): return repr(dict(self.items()))
+
+class AssignmentStore(MutableMapping):
+    """_arr[d, p, g, c, 0=정감독|1=부감독] = 이름 코드 (names[코드], 0은 "(미배정)", -1은 칸 없음).
+    dict처럼 쓸 수 있고(store[(d, p)][(g, c)] = (정, 부)), to_df/to_json/cells_for는 배열 연산으로 처리."""
+    def __init__(self, shape: tuple[int, int, int, int] = (1, 1, 1, 1)):
+        self.names: list[str] = [UNASSIGNED]
+        self._code: dict[str, int] = {UNASSIGNED: 0}
+        self._arr = np.full((*[n + 1 for n in shape], 2), _ABSENT, dtype=np.int32)
+        self._declared: set[tuple[int, int]] = set()  # 칸 없이 키만 만든 교시 (asgn[(d, p)] = {})
+
+    # ── 이름 인턴 / 크기 ─────────────────────────────
+    def intern(self, name: str) -> int:
+        code = self._code.get(name)
+        if code is None: code = self._code[name] = len(self.names); self.names.append(name)
+        return code
+
+    def _intern_many(self, values: np.ndarray) -> np.ndarray:
+        uniq, inv = np.unique(values.astype(str), return_inverse=True)
+        return np.array([self.intern(n) for n in uniq.tolist()], dtype=np.int32)[inv]
+
+    def _grow(self, d: int, p: int, g: int, c: int):
+        need = (d + 1, p + 1, g + 1, c + 1)
+        if all(n <= m for n, m in zip(need, self._arr.shape)): return
+        arr = np.full((*[max(n, m) for n, m in zip(need, self._arr.shape)], 2), _ABSENT, dtype=np.int32)
+        arr[tuple(slice(0, m) for m in self._arr.shape)] = self._arr
+        self._arr = arr
+
+    def _has(self, d, p, g, c) -> bool:
+        return all(0 <= i < m for i, m in zip((d, p, g, c), self._arr.shape)) and self._arr[d, p, g, c, 0] != _ABSENT
+
+    def set_cell(self, d: int, p: int, g: int, c: int, chief: str, asst: str):
+        self._grow(d, p, g, c); self._arr[d, p, g, c] = (self.intern(chief), self.intern(asst))
+
+    # ── dict 호환 ────────────────────────────────────
+    def _slot_keys(self) -> list[tuple[int, int]]:
+        keys = set(map(tuple, np.argwhere((self._arr[..., 0] != _ABSENT).any(axis=(2, 3))).tolist()))
+        return sorted(keys | self._declared)
+
+    def __getitem__(self, key):
+        d, p = key
+        if key not in self._declared and (not (0 <= d < self._arr.shape[0] and 0 <= p < self._arr.shape[1]) or not (self._arr[d, p, ..., 0] != _ABSENT).any()): raise KeyError(key)
+        return _SlotView(self, d, p)
+    def __setitem__(self, key, per_slot):
+        d, p = key
+        per_slot = dict(per_slot)
+        self._grow(d, p, 0, 0); self._arr[d, p] = _ABSENT; self._declared.add((d, p))
+        for (g, c), (ch, ass) in per_slot.items(): self.set_cell(d, p, g, c, ch, ass)
+    def __delitem__(self, key):
+        self[key]; self._arr[key[0], key[1]] = _ABSENT; self._declared.discard(key)
+    def __iter__(self): return iter(self._slot_keys())
+    def __len__(self): return len(self._slot_keys())
+    def __repr__(self): return f"AssignmentStore({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        return {k: dict(v.items()) for k, v in self.items()}
+
+    def copy(self) -> "AssignmentStore":
+        new = AssignmentStore.__new__(AssignmentStore)
+        new.names, new._code, new._arr, new._declared = list(self.names), dict(self._code), self._arr.copy(), set(self._declared)
+        return new
+
+    @classmethod
+    def from_dict(cls, assignments: Mapping) -> "AssignmentStore":
+        if isinstance(assignments, AssignmentStore): return assignments.copy()
+        rows = [(d, p, g, c, ch, ass) for (d, p), ps in assignments.items() for (g, c), (ch, ass) in ps.items()]
+        return cls.from_columns(*(zip(*rows) if rows else ([],) * 6))
+
+    # ── 열 단위 변환 ─────────────────────────────────
+    @classmethod
+    def from_columns(cls, d, p, g, c, chief, asst) -> "AssignmentStore":
+        d, p, g, c = (np.asarray(x, dtype=np.int64) for x in (d, p, g, c))
+        store = cls(tuple(int(x.max()) if len(x) else 0 for x in (d, p, g, c)))
+        if len(d):
+            codes = store._intern_many(np.concatenate([np.asarray(chief, dtype=object), np.asarray(asst, dtype=object)]))
+            store._arr[d, p, g, c, 0], store._arr[d, p, g, c, 1] = codes[:len(d)], codes[len(d):]
+        return store
+
+    @classmethod
+    def from_json(cls, text: str) -> "AssignmentStore":
+        """to_json / db.assignments_to_json 형식 → 저장소"""
+        raw = json.loads(text)
+        rows = [(*map(int, k.split(",")), *map(int, k2.split(",")), v2[0], v2[1]) for k, v in raw.items() for k2, v2 in v.items()]
+        return cls.from_columns(*(zip(*rows) if rows else ([],) * 6))
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "AssignmentStore":
+        """assignments_to_df 형식(day, period, grade, class, chief, assistant) → 저장소"""
+        if df.empty: return cls()
+        text = lambda col: np.array([str(v) for v in df[col].to_numpy(dtype=object)], dtype=object)
+        return cls.from_columns(df["day"].astype(int), df["period"].astype(int), df["grade"].astype(int), df["class"].astype(int), text("chief"), text("assistant"))
+
+    def _cells(self, mask: np.ndarray | None = None):
+        present = self._arr[..., 0] != _ABSENT
+        d, p, g, c = np.nonzero(present if mask is None else present & mask)
+        return d, p, g, c, self._arr[d, p, g, c, 0], self._arr[d, p, g, c, 1]
+
+    def to_df(self) -> pd.DataFrame:
+        d, p, g, c, ch, ass = self._cells(); names = np.array(self.names, dtype=object)
+        return pd.DataFrame({"day": d, "period": p, "grade": g, "class": c, "chief": names[ch], "assistant": names[ass]})
+
+    def to_json(self) -> str:
+        """db.assignments_to_json과 같은 형식 ({"d,p": {"g,c": [정, 부]}})"""
+        out, names = {}, self.names
+        d, p, g, c, ch, ass = self._cells()
+        for dd, pp, gg, cc, x, y in zip(d.tolist(), p.tolist(), g.tolist(), c.tolist(), ch.tolist(), ass.tolist()):
+            out.setdefault(f"{dd},{pp}", {})[f"{gg},{cc}"] = [names[x], names[y]]
+        return json.dumps(out, ensure_ascii=False)
+
+    # ── 일괄 조회 ────────────────────────────────────
+    def cells_for(self, name: str) -> pd.DataFrame:
+        """해당 이름이 배정된 모든 칸 (day, period, grade, class, role)"""
+        code = self._code.get(name)
+        if code is None or name == UNASSIGNED: return pd.DataFrame(columns=["day", "period", "grade", "class", "role"])
+        d, p, g, c, r = np.nonzero(self._arr == code)
+        return pd.DataFrame({"day": d, "period": p, "grade": g, "class": c, "role": np.where(r == 0, "정감독", "부감독")})
+
+    def counts(self) -> pd.DataFrame:
+        """이름별 정/부감독 횟수 (미배정 제외)"""
+        n = len(self.names); present = self._arr[..., 0] != _ABSENT
+        ch = np.bincount(self._arr[..., 0][present], minlength=n); ass = np.bincount(self._arr[..., 1][present], minlength=n)
+        return pd.DataFrame({"name": self.names[1:], "chief": ch[1:], "assistant": ass[1:]})
+
+    def unassigned_count(self) -> int:
+        present = self._arr[..., 0] != _ABSENT
+        return int((self._arr[present] == 0).sum())
+
+    def digest(self) -> str:
+        """내용 해시 (칸 배치 + 이름) — 이름 코드 순서와 무관"""
+        d, p, g, c, ch, ass = self._cells(); names = np.array(self.names, dtype=object)
+        h = hashlib.sha1(np.stack([d, p, g, c]).astype(np.int32).tobytes())
+        h.update("\x1f".join(names[ch].tolist() + names[ass].tolist()).encode())
+        return h.hexdigest()
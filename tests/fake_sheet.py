@@ -0,0 +1,30 @@
+# fake_sheet.py — gspread Worksheet 중 SheetTracker가 쓰는 메서드만 (테스트 전용)
+from __future__ import annotations
+import re
+from types import SimpleNamespace
+
+class FakeWorksheet:
+    def __init__(self): self.cells: dict[tuple[int, int], object] = {}
+
+    @staticmethod
+    def _a1(a1: str) -> tuple[int, int]:
+        col, row = re.match(r"([A-Z]+)(\d+)", a1).groups()
+        return int(row), ord(col) - 64
+
+    def clear(self): self.cells = {}
+    def acell(self, a1: str): return SimpleNamespace(value=self.cells.get(self._a1(a1)))
+
+    def update(self, *args):
+        a1, values = ("A1", args[0]) if len(args) == 1 else args
+        r0, c0 = self._a1(a1)
+        for i, row in enumerate(values):
+            for j, v in enumerate(row): self.cells[(r0 + i, c0 + j)] = v
+
+    def batch_update(self, updates):
+        for u in updates: self.update(u["range"].split(":")[0], u["values"])
+
+    def get_all_records(self):
+        if not self.cells: return []
+        last = max(r for r, _ in self.cells)
+        header = [self.cells.get((1, j), "") for j in range(1, 7)]
+        return [{h: self.cells.get((r, j + 1), "") for j, h in enumerate(header)} for r in range(2, last + 1)]
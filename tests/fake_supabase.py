@@ -0,0 +1,76 @@
+# fake_supabase.py — db.py가 쓰는 만큼의 supabase-py 쿼리 빌더를 메모리 표로 흉내 (테스트 전용)
+from __future__ import annotations
+import copy, itertools
+from types import SimpleNamespace
+
+_KEYS = {"exam_sessions": ("id",), "assignments": ("session_id",), "assignment_cells": ("session_id", "day", "period", "grade", "class")}
+
+class _Query:
+    def __init__(self, db: "FakeClient", table: str):
+        self.db, self.table, self.op, self.payload = db, table, "select", None
+        self.filters, self.orders, self.window, self.cols, self.one, self.conflict = [], [], None, None, False, None
+
+    # ── 동작 ──
+    def select(self, cols="*"): self.cols = None if cols == "*" else [c.strip() for c in cols.split(",")]; return self
+    def insert(self, rows): self.op, self.payload = "insert", rows; return self
+    def upsert(self, rows, on_conflict=None): self.op, self.payload, self.conflict = "upsert", rows, on_conflict; return self
+    def update(self, values): self.op, self.payload = "update", values; return self
+    def delete(self): self.op = "delete"; return self
+
+    # ── 조건 ──
+    def eq(self, col, v): self.filters.append(lambda r: r.get(col) == v); return self
+    def neq(self, col, v): self.filters.append(lambda r: r.get(col) != v); return self
+    def in_(self, col, vs): vs = set(vs); self.filters.append(lambda r: r.get(col) in vs); return self
+    def order(self, col, desc=False): self.orders.append((col, desc)); return self
+    def limit(self, n): self.window = (0, n - 1); return self
+    def range(self, a, b): self.window = (a, b); return self
+    def single(self): self.one = True; return self
+
+    def _match(self, r): return all(f(r) for f in self.filters)
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.op == "select":
+            out = [r for r in rows if self._match(r)]
+            for col, desc in reversed(self.orders): out.sort(key=lambda r: r[col], reverse=desc)
+            if self.window: out = out[self.window[0]:self.window[1] + 1]
+            out = [{k: r.get(k) for k in self.cols} if self.cols else dict(r) for r in out]
+            return SimpleNamespace(data=(out[0] if out else None) if self.one else out)
+        if self.op == "delete":
+            gone = [r for r in rows if self._match(r)]
+            self.db.tables[self.table] = [r for r in rows if not self._match(r)]
+            return SimpleNamespace(data=gone)
+        if self.op == "update":
+            hit = [r for r in rows if self._match(r)]
+            for r in hit: r.update(self.payload)
+            return SimpleNamespace(data=copy.deepcopy(hit))
+        new = self.payload if isinstance(self.payload, list) else [self.payload]
+        left = self.db.fail_writes.get(self.table)
+        if left is not None:
+            if left <= 0:
+                if self.table in self.db.recover: del self.db.fail_writes[self.table]
+                raise ConnectionError("network down")
+            self.db.fail_writes[self.table] = left - 1
+        keys = self.conflict.split(",") if self.conflict else list(_KEYS.get(self.table, ()))
+        out = []
+        for row in new:
+            row = dict(row)
+            if self.table == "exam_sessions": row.setdefault("id", f"s{next(self.db.ids)}"); row.setdefault("created_at", str(next(self.db.ids)))
+            if self.table == "assignments": row.setdefault("version", 1)
+            hit = next((r for r in rows if keys and all(r.get(k) == row.get(k) for k in keys)), None)
+            if hit is not None and self.op == "insert": raise ValueError("duplicate key")
+            if hit is not None: hit.update(row); out.append(dict(hit))
+            else: rows.append(row); out.append(dict(row))
+        return SimpleNamespace(data=out)
+
+class FakeClient:
+    """client.table(name) → 쿼리 빌더. fail_writes[표] = n: 그 표의 insert/upsert가 n번 성공한 뒤부터 ConnectionError
+    (recover에 든 표는 한 번만 실패하고 복구 — 보상 쓰기 확인용)"""
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = {}
+        self.fail_writes: dict[str, int] = {}
+        self.recover: set[str] = set()
+        self.ids = itertools.count(1)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
@@ -0,0 +1,140 @@
+# 칸 단위 배정 저장 (db.py Supabase 경로, storage.SQLiteBackend) — 이전 형식 세션과 전체 교체 중 실패
+import pytest
+import db
+from fake_supabase import FakeClient
+from storage import SQLiteBackend
+from store import AssignmentStore
+
+BLOB = AssignmentStore.from_dict({(1, 1): {(1, 1): ("김", "이"), (1, 2): ("박", "최")}, (1, 2): {(1, 1): ("정", "강")}})
+
+def _edited(store):
+    out = store.copy(); out.set_cell(1, 1, 1, 2, "조", "최")
+    return out
+
+@pytest.fixture
+def supabase():
+    client = FakeClient()
+    client.table("assignments").insert({"session_id": "s1", "data": BLOB.to_json(), "version": 3}).execute()
+    return client
+
+@pytest.fixture
+def sqlite():
+    backend = SQLiteBackend(":memory:")
+    backend._tx(lambda c: c.execute("INSERT INTO assignments (session_id, data, version, updated_at) VALUES ('s1', ?, 3, 'x')", (BLOB.to_json(),)))
+    yield backend
+    backend.close()
+
+def test_blob_edit_save_reload_keeps_unchanged_cells(supabase):
+    loaded = db.load_assignments(supabase, "s1")
+    assert loaded.to_df().equals(BLOB.to_df())
+    db.save_assignments(supabase, "s1", _edited(loaded), previous=loaded)
+    assert db.load_assignments(supabase, "s1").to_df().equals(_edited(BLOB).to_df())
+
+def test_blob_edit_save_versioned_reload_keeps_unchanged_cells(supabase):
+    loaded = db.load_assignments(supabase, "s1")
+    assert db.save_assignments_versioned(supabase, "s1", _edited(loaded), 3, previous=loaded) == 4
+    assert db.load_assignments(supabase, "s1").to_df().equals(_edited(BLOB).to_df())
+
+@pytest.mark.parametrize("versioned", [False, True])
+def test_sqlite_blob_edit_save_reload_keeps_unchanged_cells(sqlite, versioned):
+    loaded = sqlite.load_assignments("s1")
+    if versioned: assert sqlite.save_assignments_versioned("s1", _edited(loaded), 3, previous=loaded) == 4
+    else: sqlite.save_assignments("s1", _edited(loaded), previous=loaded)
+    assert sqlite.load_assignments("s1").to_df().equals(_edited(BLOB).to_df())
+
+def test_diff_save_after_cells_exist_writes_only_changes(supabase):
+    db.migrate_assignments(supabase, "s1")
+    loaded = db.load_assignments(supabase, "s1")
+    new = _edited(loaded); del new[(1, 2)][(1, 1)]
+    db.save_assignments(supabase, "s1", new, previous=loaded)
+    assert db.load_assignments(supabase, "s1").to_df().equals(new.to_df())
+
+def test_full_replace_failure_keeps_existing_cells(supabase):
+    db.migrate_assignments(supabase, "s1")
+    supabase.fail_writes["assignment_cells"] = 0
+    db.save_assignments(supabase, "s1", AssignmentStore.from_dict({(2, 1): {(1, 1): ("새", "값")}}))
+    assert db.load_assignments(supabase, "s1").to_df().equals(BLOB.to_df())
+
+def test_full_replace_removes_stale_cells(supabase):
+    db.migrate_assignments(supabase, "s1")
+    new = AssignmentStore.from_dict({(1, 1): {(1, 1): ("김", "이")}, (2, 1): {(1, 1): ("새", "값")}})
+    db.save_assignments(supabase, "s1", new)
+    assert db.load_assignments(supabase, "s1").to_df().equals(new.to_df())
+
+def test_cached_save_with_previous_writes_full_store_locally(supabase):
+    from storage import CachedBackend
+    db.migrate_assignments(supabase, "s1")
+    cached = CachedBackend(supabase, SQLiteBackend(":memory:"))
+    stale = BLOB.copy(); stale.set_cell(1, 2, 1, 1, "옛", "값")
+    cached.local.put_assignments("s1", stale, 2)          # 로컬 사본은 예전 상태
+    loaded = db.load_assignments(supabase, "s1")          # 원격에서 직접 읽음 (사본은 채우지 않음)
+    cached.save_assignments("s1", _edited(loaded), previous=loaded)
+    assert cached.local.load_assignments("s1").to_df().equals(_edited(BLOB).to_df())
+    assert cached.load_assignments("s1").to_df().equals(_edited(BLOB).to_df())
+
+def _cached_with_failing_remote(supabase, table):
+    from storage import CachedBackend
+    cached = CachedBackend(supabase, SQLiteBackend(":memory:"))
+    supabase.fail_writes[table] = 0
+    return cached
+
+def test_cached_day_teachers_not_cached_when_remote_fails(supabase):
+    cached = _cached_with_failing_remote(supabase, "day_teachers")
+    assert cached.save_day_teachers("s1", 1, '["김"]') is False
+    assert cached.local.load_day_teachers("s1", 1) is None and not cached._is_fresh(("day", "s1", 1))
+
+def test_cached_cumulative_not_cached_when_remote_fails(supabase):
+    cached = _cached_with_failing_remote(supabase, "cumulative_stats")
+    assert cached.save_cumulative_stats("s1", [{"name": "김", "정감독(합계)": 3, "부감독(합계)": 1}]) is False
+    assert cached.local.load_cumulative_stats("s1") == {} and not cached._is_fresh(("cum", "s1"))
+
+def test_cached_assignments_not_cached_when_remote_fails(supabase):
+    db.migrate_assignments(supabase, "s1")
+    cached = _cached_with_failing_remote(supabase, "assignment_cells")
+    cached.local.put_assignments("s1", BLOB, 3)
+    assert cached.save_assignments("s1", _edited(BLOB)) is False
+    assert cached.local.load_assignments("s1").to_df().equals(BLOB.to_df())
+    supabase.fail_writes.clear()
+    assert cached.load_assignments("s1").to_df().equals(BLOB.to_df())
+
+def test_cached_writes_through_when_remote_succeeds(supabase):
+    from storage import CachedBackend
+    cached = CachedBackend(supabase, SQLiteBackend(":memory:"))
+    assert cached.save_day_teachers("s1", 1, '["김"]') is True
+    assert cached.local.load_day_teachers("s1", 1) == '["김"]' and cached._is_fresh(("day", "s1", 1))
+
+def _version(client): return db.load_assignments_version(client, "s1")
+
+def test_versioned_conflict_is_none_not_failure(supabase):
+    loaded = db.load_assignments(supabase, "s1")
+    assert db.save_assignments_versioned(supabase, "s1", _edited(loaded), 2, previous=loaded) is None
+    assert _version(supabase) == 3
+
+@pytest.mark.parametrize("migrated", [False, True])
+def test_versioned_failure_rolls_back_version_and_cells(supabase, monkeypatch, migrated):
+    from persist import SaveFailed
+    if migrated: db.migrate_assignments(supabase, "s1")
+    loaded = db.load_assignments(supabase, "s1")
+    new = _edited(loaded); new.set_cell(1, 2, 1, 1, "새", "값")
+    monkeypatch.setattr(db, "_PAGE", 1)                       # 칸마다 upsert 한 번 → 첫 칸만 기록된 뒤 실패
+    supabase.fail_writes["assignment_cells"] = 1; supabase.recover.add("assignment_cells")
+    with pytest.raises(SaveFailed) as e: db.save_assignments_versioned(supabase, "s1", new, 3, previous=loaded)
+    assert e.value.rolled_back
+    assert _version(supabase) == 3
+    assert db.load_assignments(supabase, "s1").to_df().equals(BLOB.to_df())
+    assert db.save_assignments_versioned(supabase, "s1", new, 3, previous=loaded) == 4   # 같은 버전으로 다시 저장
+    assert db.load_assignments(supabase, "s1").to_df().equals(new.to_df())
+
+def test_versioned_first_save_failure_leaves_no_session_row():
+    from persist import SaveFailed
+    client = FakeClient(); client.fail_writes["assignment_cells"] = 0; client.recover.add("assignment_cells")
+    with pytest.raises(SaveFailed): db.save_assignments_versioned(client, "s1", BLOB, None)
+    assert _version(client) is None and db.load_assignments(client, "s1") is None
+    assert db.save_assignments_versioned(client, "s1", BLOB, None) == 1
+
+def test_cached_versioned_failure_propagates_and_keeps_local(supabase):
+    from persist import SaveFailed
+    cached = _cached_with_failing_remote(supabase, "assignment_cells")
+    cached.local.put_assignments("s1", BLOB, 3)
+    with pytest.raises(SaveFailed): db.save_assignments_versioned(cached, "s1", _edited(BLOB), 3, previous=BLOB)
+    assert cached.local.load_assignments_version("s1") == 3 and not cached._is_fresh(("asgn", "s1"))
@@ -0,0 +1,18 @@
+# cli batch 설정 파일 — 상대 경로는 설정 파일 기준 (defaults 포함)
+import json, os
+import cli
+from bench import make_school
+
+def test_batch_defaults_paths_relative_to_config(tmp_path, monkeypatch):
+    conf = tmp_path / "conf"; (conf / "a").mkdir(parents=True)
+    teachers, parents, periods = make_school(2, 2, 3, 20, 4, 2, seed=1)
+    teachers.to_csv(conf / "a" / "t.csv", index=False); parents.to_csv(conf / "p.csv", index=False)
+    (conf / "batch.json").write_text(json.dumps({
+        "defaults": {"days": 2, "grades": 2, "classes": 3, "periods": periods, "parents": "p.csv", "out": "out", "formats": "csv"},
+        "configs": [{"name": "A", "teachers": "a/t.csv"}]}), encoding="utf-8")
+    elsewhere = tmp_path / "cwd"; elsewhere.mkdir(); monkeypatch.chdir(elsewhere)
+    configs, defaults = cli.load_batch(os.path.join("..", "conf", "batch.json"))
+    assert defaults["parents"] == str(conf / "p.csv") and defaults["out"] == str(conf / "out")
+    assert configs[0]["teachers"] == str(conf / "a" / "t.csv")
+    assert cli.main(["batch", str(conf / "batch.json")]) == 0
+    assert (conf / "out" / "A.csv").exists() and not (elsewhere / "out").exists()
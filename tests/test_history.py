@@ -0,0 +1,29 @@
+# 수동 편집 실행 취소/다시 실행 (history.EditHistory)
+from history import EditHistory
+from store import AssignmentStore
+
+BASE = AssignmentStore.from_dict({(1, 1): {(1, 1): ("김", "이"), (1, 2): ("박", "최")}, (1, 2): {(1, 1): ("정", "강")}})
+
+def _snap(store): return store.to_df(), store.digest()
+
+def _same(a, b): return a[0].equals(b[0]) and a[1] == b[1]
+
+def test_undo_redo_restore_exact_cells():
+    store = BASE.copy(); hist = EditHistory(store)
+    states = [_snap(store)]
+    hist.edit(store, [(1, 1, 1, 1, "조", "이"), (1, 1, 1, 2, "박", "윤")]); states.append(_snap(store))
+    hist.edit(store, [(1, 2, 2, 1, "한", "서")]); states.append(_snap(store))        # 새 칸
+    hist.edit(store, [(1, 1, 1, 1, "조", "이")])                                    # 값이 같으면 단계 없음
+    assert hist.can_undo == 2
+    assert hist.undo(store) == [((1, 2, 2, 1), None)] and _same(_snap(store), states[1])
+    hist.undo(store); assert _same(_snap(store), states[0]) and hist.undo(store) == []
+    hist.redo(store); assert _same(_snap(store), states[1])
+    hist.redo(store); assert _same(_snap(store), states[2]) and not hist.can_redo
+    assert hist.diff_baseline(store)["change"].tolist() == ["changed", "changed", "added"]
+
+def test_new_edit_clears_redo_and_old_steps_are_dropped():
+    store = BASE.copy(); hist = EditHistory(store, max_steps=2)
+    for name in ("가", "나", "다"): hist.edit(store, [(1, 1, 1, 1, name, "이")])
+    assert hist.can_undo == 2 and len(hist.steps()) == 2
+    hist.undo(store); hist.edit(store, [(1, 1, 1, 2, "라", "최")])
+    assert not hist.can_redo and store[(1, 1)][(1, 1)] == ("나", "이")
@@ -0,0 +1,27 @@
+# 작업 큐 저장 실패 처리 (jobs.JobService)
+from concurrent.futures import ThreadPoolExecutor
+from bench import make_school
+from fake_supabase import FakeClient
+from jobs import JobService
+
+def _spec():
+    teachers, parents, periods = make_school(2, 2, 3, 20, 4, 2, seed=1)
+    return {"name": "A중", "teachers_csv": teachers.to_csv(index=False), "parents_csv": parents.to_csv(index=False), "days": 2, "grades": 2, "classes": 3, "periods": periods}
+
+def _run(client):
+    svc = JobService(1, client=client, pool=ThreadPoolExecutor(1)).start()
+    try:
+        jid = svc.submit(_spec())
+        return svc.wait(jid, timeout=30), svc.result(jid)
+    finally: svc.shutdown()
+
+def test_job_done_when_saved():
+    client = FakeClient()
+    st, store = _run(client)
+    assert st["state"] == "done" and st["session_id"]
+    assert len(client.tables["assignment_cells"]) == len(store.to_df()) > 0
+
+def test_job_failed_when_save_fails():
+    client = FakeClient(); client.fail_writes["assignment_cells"] = 0
+    st, store = _run(client)
+    assert store is None and st["state"] == "failed" and "저장 실패" in st["error"]
@@ -0,0 +1,25 @@
+# 변경분 재배정 (scheduler.repair_assignment) — 손으로 넣은 명단 밖 이름 유지
+from bench import make_school
+from history import EditHistory
+from scheduler import build_teachers, repair_assignment, run_assignment
+from store import AssignmentStore
+
+DAYS, GRADES, CLASSES = 2, 3, 4
+
+def _school():
+    t_df, p_df, periods = make_school(DAYS, GRADES, CLASSES, 40, 10, 3, seed=1)
+    teachers = build_teachers(t_df, p_df, DAYS)
+    store = AssignmentStore.from_dict(run_assignment(teachers, DAYS, GRADES, CLASSES, periods))
+    return teachers, periods, store
+
+def _repair(teachers, periods, store, pinned=frozenset()):
+    return repair_assignment(teachers, store, DAYS, GRADES, CLASSES, periods, pinned=pinned)[0]
+
+def test_pinned_off_roster_name_survives_repair():
+    teachers, periods, store = _school()
+    hist = EditHistory(store)
+    chief = store[(1, 1)][(1, 1)][0]
+    hist.edit(store, [(1, 1, 1, 1, chief, "외부 강사")])
+    assert hist.manual_cells(store) == {(1, 1, 1, 1, 1)}
+    assert _repair(teachers, periods, store, hist.manual_cells(store))[(1, 1)][(1, 1)] == (chief, "외부 강사")
+    assert _repair(teachers, periods, store)[(1, 1)][(1, 1)][1] != "외부 강사"   # 고정하지 않으면 명단 밖 이름은 비워져 다시 채워짐
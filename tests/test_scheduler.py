@@ -0,0 +1,31 @@
+# 배정 엔진 (scheduler.run_assignment) — 엔진 간 동등성
+import pytest
+from bench import make_school
+from scheduler import build_teachers, run_assignment
+from store import AssignmentStore
+
+DAYS, GRADES, CLASSES = 3, 3, 8
+
+def _run(seed, engine, history=None):
+    t_df, p_df, periods = make_school(DAYS, GRADES, CLASSES, 40, 14, 4, seed=seed)
+    teachers = build_teachers(t_df, p_df, DAYS)
+    return teachers, AssignmentStore.from_dict(run_assignment(teachers, DAYS, GRADES, CLASSES, periods, engine=engine, history=history))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_heap_engine_matches_sort_engine(seed):
+    assert _run(seed, "heap")[1].digest() == _run(seed, "sort")[1].digest()
+
+def test_heap_engine_matches_sort_engine_with_history():
+    teachers, _ = _run(0, "sort")
+    history = {t.name: (i % 3, i % 2) for i, t in enumerate(teachers)}
+    assert _run(0, "heap", history)[1].digest() == _run(0, "sort", history)[1].digest()
+
+@pytest.mark.parametrize("seed", range(4))
+def test_flow_fills_at_least_greedy_and_keeps_rules(seed):
+    from validate import validate
+    teachers, flow = _run(seed, "flow")
+    assert flow.unassigned_count() <= _run(seed, "sort")[1].unassigned_count()
+    periods = make_school(DAYS, GRADES, CLASSES, 40, 14, 4, seed=seed)[2]
+    assert validate(flow, teachers, DAYS, GRADES, CLASSES, periods).violations.empty   # 중복·학부모 상한·칸별 제외 규칙
+    chiefs = {t.name for t in teachers if t.role == "교사"}
+    assert set(flow.to_df()["chief"]) <= chiefs | {"(미배정)"}
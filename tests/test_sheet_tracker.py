@@ -0,0 +1,30 @@
+# 구글 시트 저장 탭 버전 확인 (persist.SheetTracker)
+import pytest
+from fake_sheet import FakeWorksheet
+from persist import SheetTracker, VersionConflict
+from store import AssignmentStore
+
+A = AssignmentStore.from_dict({(1, 1): {(1, 1): ("김", "이"), (1, 2): ("박", "최")}})
+B = AssignmentStore.from_dict({(1, 1): {(1, 1): ("정", "강"), (1, 2): ("조", "윤")}})
+
+def test_two_first_saves_on_same_sheet_conflict():
+    ws = FakeWorksheet()
+    _, n = SheetTracker.first_save(ws, A)
+    assert n == 2
+    with pytest.raises(VersionConflict): SheetTracker.first_save(ws, B)
+    _, loaded = SheetTracker.load(ws)
+    assert loaded.to_df().equals(A.to_df())
+
+def test_first_save_on_loaded_sheet_conflicts_after_other_save():
+    ws = FakeWorksheet()
+    SheetTracker.first_save(ws, A)
+    mine, _ = SheetTracker.load(ws)
+    theirs, _ = SheetTracker.load(ws)
+    assert theirs.save(ws, B) == 2
+    with pytest.raises(VersionConflict): mine.save(ws, A)
+
+def test_first_save_on_cleared_sheet_is_allowed():
+    ws = FakeWorksheet()
+    ws.update("H1", [[5]])  # 행 없이 버전만 남은 탭
+    tracker, _ = SheetTracker.first_save(ws, A)
+    assert tracker.version == 6 and SheetTracker.read_version(ws) == 6
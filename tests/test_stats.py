@@ -0,0 +1,27 @@
+# 통계 집계기 (stats.StatsAggregator) — 칸 변경분 반영 뒤에도 전체 재계산과 같은 결과
+from bench import make_school
+from changes import diff_cells
+from scheduler import build_teachers, compute_parent_stats, compute_teacher_stats, run_assignment
+from stats import StatsAggregator
+from store import AssignmentStore
+
+DAYS, GRADES, CLASSES = 2, 3, 6
+
+def test_apply_diff_matches_full_recompute_after_edits():
+    t_df, p_df, periods = make_school(DAYS, GRADES, CLASSES, 40, 12, 3, seed=2)
+    teachers = build_teachers(t_df, p_df, DAYS)
+    old = AssignmentStore.from_dict(run_assignment(teachers, DAYS, GRADES, CLASSES, periods))
+    agg = StatsAggregator(old, teachers, DAYS)
+    parent = next(t.name for t in teachers if t.role == "학부모")
+    new = old.copy()
+    new.set_cell(1, 1, 1, 1, "외부 강사", parent)                        # 명단 밖 이름·학부모
+    new.set_cell(2, 1, 2, 2, new[(1, 2)][(1, 1)][0], "(미배정)")
+    del new[(1, 1)][(3, 6)]                                            # 없어진 칸
+    new.set_cell(2, 3, 3, 7, "외부 강사", "(미배정)")                    # 새 칸
+    diff = diff_cells(old, new)
+    assert set(diff["change"]) == {"changed", "removed", "added"}
+    agg.apply_diff(diff)
+    assert agg.teacher_rows() == compute_teacher_stats(new, teachers)
+    assert agg.parent_rows() == compute_parent_stats(new, teachers, DAYS)
+    agg.apply_diff(diff_cells(new, old))                               # 되돌리기
+    assert agg.teacher_rows() == compute_teacher_stats(old, teachers)
@@ -0,0 +1,22 @@
+# 배정 저장소 (store.AssignmentStore) — 형식 간 왕복과 내용 해시
+from store import AssignmentStore
+
+ASGN = {(1, 1): {(1, 1): ("김", "이"), (2, 3): ("박", "(미배정)")},
+        (2, 3): {(1, 2): ("최", "정")},
+        (1, 2): {}}
+
+def test_round_trips_through_dict_df_json():
+    store = AssignmentStore.from_dict(ASGN)
+    assert store.to_dict() == {k: v for k, v in ASGN.items() if v}
+    for again in (AssignmentStore.from_df(store.to_df()), AssignmentStore.from_json(store.to_json()), AssignmentStore.from_dict(store.to_dict()), store.copy()):
+        assert again.to_df().equals(store.to_df())
+        assert again.digest() == store.digest()
+
+def test_digest_ignores_name_code_order_and_tracks_content():
+    store = AssignmentStore.from_dict(ASGN)
+    reordered = AssignmentStore()                       # 칸마다 이름을 등록 → 일괄 적재(정렬된 코드)와 다른 코드 순서
+    for (d, p), slot in reversed(list(ASGN.items())):
+        for (g, c), (ch, ass) in slot.items(): reordered.set_cell(d, p, g, c, ch, ass)
+    assert reordered.names != store.names and reordered.digest() == store.digest()
+    edited = store.copy(); edited.set_cell(1, 1, 1, 1, "김", "강")
+    assert edited.digest() != store.digest() and store[(1, 1)][(1, 1)] == ("김", "이")
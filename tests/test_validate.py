@@ -0,0 +1,24 @@
+# 배정 검증 (validate.validate) — 칸별 제외 규칙은 EligibilityIndex로
+from eligibility import EligibilityIndex
+from scheduler import Teacher
+from validate import validate
+
+TEACHERS = [Teacher("시간", exclude_times={(1, 1)}), Teacher("복도", exclude_times={(1, 1)}, specific_excludes={(1, 1)}),
+            Teacher("기피", exclude_classes={(1, 2)}), Teacher("칸", exclude_time_class={(1, 1, 2, 1)}), Teacher("정상"),
+            Teacher("부모", role="학부모")]
+PBD = [[2, 2]]
+
+def _kinds(asgn, elig=None):
+    v = validate(asgn, TEACHERS, 1, 2, 2, PBD, elig=elig).violations
+    return {(name, kind) for name, kind in v[["name", "kind"]].itertuples(index=False)}
+
+def test_rule_violations_come_from_eligibility_index():
+    asgn = {(1, 1): {(1, 1): ("시간", "복도"), (1, 2): ("기피", "부모"), (2, 1): ("칸", "정상")}}
+    assert _kinds(asgn) == {("시간", "time"), ("복도", "corridor"), ("기피", "class"), ("칸", "time_class")}
+
+def test_accepts_app_index_and_keeps_duplicate_and_parent_cap():
+    asgn = {(1, 1): {(1, 1): ("정상", "부모"), (1, 2): ("정상", "(미배정)")},
+            (1, 2): {(1, 1): ("기피", "부모"), (2, 2): ("시간", "부모")}}
+    elig = EligibilityIndex(TEACHERS, 1, 2, 2)
+    assert _kinds(asgn, elig) == {("정상", "duplicate"), ("부모", "parent_cap"), ("부모", "duplicate")}
+    assert _kinds({(1, 1): {(1, 1): ("외부", "부모")}}, elig) == set()   # 명단에 없는 이름은 규칙 위반 아님
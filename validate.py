@@ -0,0 +1,94 @@
+# validate.py — 배정 전체를 한 번에 검증 (중복 배정, 학부모 일일 2회 초과 + 배정 엔진과 같은 EligibilityIndex로 칸별 제외 규칙)
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from eligibility import EligibilityIndex
+from profiling import timed
+from scheduler import Teacher, assignments_to_df
+
+UNASSIGNED = "(미배정)"
+KINDS = {"duplicate": "중복 배정", "corridor": "복도감독 충돌", "time": "제외 시간 위반", "class": "기피학급 위반", "time_class": "제외 칸 위반",
+         "parent_cap": "학부모 일일 2회 초과"}
+_COLS = ["day", "period", "grade", "class", "role", "name", "kind"]
+
+@dataclass
+class ValidationReport:
+    """violations: 위반 1건당 1행 (day, period, grade, class, role 0=정|1=부, name, kind)"""
+    violations: pd.DataFrame
+    _by_slot: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not self.violations.empty:
+            self._by_slot = {(int(d), int(p)): g for (d, p), g in self.violations.groupby(["day", "period"], sort=False)}
+
+    def __bool__(self): return not self.violations.empty
+
+    def slot(self, d: int, p: int) -> dict[str, list[str]]:
+        """(d, p)의 종류별 표시 문자열 — 화면에 그대로 출력"""
+        g = self._by_slot.get((d, p))
+        if g is None: return {}
+        out, groups = {}, dict(tuple(g.groupby("kind", sort=False)))
+        for kind in KINDS:
+            if kind not in groups: continue
+            sub = groups[kind]
+            labels = ([f"{n}({gg}-{cc} {'기피' if kind == 'class' else '제외'})" for n, gg, cc in zip(sub["name"], sub["grade"], sub["class"])]
+                      if kind in ("class", "time_class") else sub["name"].tolist())
+            out[kind] = sorted(set(labels))
+        return out
+
+    def by_cell(self) -> dict[tuple[int, int, int, int], list[tuple[str, str]]]:
+        out = {}
+        for d, p, g, c, name, kind in self.violations[["day", "period", "grade", "class", "name", "kind"]].itertuples(index=False):
+            out.setdefault((d, p, g, c), []).append((kind, name))
+        return out
+
+    def counts(self) -> dict[str, int]:
+        return self.violations["kind"].value_counts().to_dict() if not self.violations.empty else {}
+
+def _long_cells(assignments, num_days, num_grades, classes_per_grade, periods_by_day_grade) -> pd.DataFrame:
+    """활성 교실의 배정된 칸만 (day, period, grade, class, role, name) 한 줄씩"""
+    df = assignments_to_df(assignments)
+    if df.empty: return pd.DataFrame(columns=_COLS[:-1])
+    pbd = np.zeros((num_days + 1, num_grades + 1), dtype=np.int64)
+    pbd[1:, 1:] = np.asarray(periods_by_day_grade, dtype=np.int64).reshape(num_days, num_grades)
+    d, g = df["day"].to_numpy(), df["grade"].to_numpy()
+    inside = (d >= 1) & (d <= num_days) & (g >= 1) & (g <= num_grades) & (df["class"].to_numpy() >= 1) & (df["class"].to_numpy() <= classes_per_grade)
+    active = inside & (pbd[np.where(inside, d, 0), np.where(inside, g, 0)] >= df["period"].to_numpy())
+    df = df[active]
+    key = ["day", "period", "grade", "class"]
+    long = pd.concat([df[key].assign(role=0, name=df["chief"]), df[key].assign(role=1, name=df["assistant"])], ignore_index=True)
+    return long[long["name"] != UNASSIGNED]
+
+def _rule_violations(long: pd.DataFrame, elig: EligibilityIndex) -> list[pd.DataFrame]:
+    """명단에 있는 이름의 칸별 제외 규칙 위반 (corridor/time/class/time_class) — EligibilityIndex.ok와 같은 판정을 행렬로.
+    같은 이름이 여럿이면(period_assigned처럼 이름 단위) 모두 걸린 규칙만 위반. 복도감독 교시는 시간 제외이기도 해서 corridor로만 보고."""
+    who = pd.DataFrame({"name": [t.name for t in elig.teachers], "i": np.arange(elig.n)})
+    x = long.reset_index(drop=True).rename_axis("row").reset_index().merge(who, on="name")
+    if x.empty: return []
+    d, p, g, c, i = (x[k].to_numpy(dtype=np.int64) for k in ("day", "period", "grade", "class", "i"))
+    tc = pd.DataFrame([(*key, j) for key, idx in elig.tc_block.items() for j in idx], columns=["day", "period", "grade", "class", "i"]).drop_duplicates()
+    corridor = elig.corridor[d, p, i]
+    flags = pd.DataFrame({"row": x["row"], "corridor": corridor, "time": ~elig.time_ok[d, p, i] & ~corridor, "class": ~elig.room_ok[g, c, i],
+                          "time_class": x.merge(tc, on=["day", "period", "grade", "class", "i"], how="left", indicator=True)["_merge"].eq("both").to_numpy()
+                                        if not tc.empty else np.zeros(len(x), dtype=bool)})
+    flags = flags.groupby("row").all()
+    return [long.iloc[flags.index[flags[kind]]].assign(kind=kind) for kind in ("corridor", "time", "class", "time_class")]
+
+@timed("validate")
+def validate(assignments, teachers: list[Teacher], num_days: int, num_grades: int, classes_per_grade: int, periods_by_day_grade,
+             elig: EligibilityIndex | None = None) -> ValidationReport:
+    """elig: 같은 명단·설정의 EligibilityIndex (앱 캐시 재사용) — 없거나 교시·교실 범위가 모자라면 새로 만듦"""
+    long = _long_cells(assignments, num_days, num_grades, classes_per_grade, periods_by_day_grade)
+    if long.empty: return ValidationReport(pd.DataFrame(columns=_COLS))
+    max_p = int(long["period"].max())
+    if elig is None or elig.teachers != list(teachers) or elig.dims[0] < num_days or elig.dims[1] < max_p or elig.dims[2] < num_grades or elig.dims[3] < classes_per_grade:
+        elig = EligibilityIndex(teachers, num_days, num_grades, classes_per_grade, max(max_p, int(np.max(periods_by_day_grade))))
+    found = [long[long.duplicated(["day", "period", "name"], keep=False)].assign(kind="duplicate")] + _rule_violations(long, elig)
+    parents = {t.name for t in teachers if t.role == "학부모"}
+    pa = long[(long["role"] == 1) & long["name"].isin(parents)]
+    if not pa.empty:
+        over = pa.groupby(["day", "name"]).size().loc[lambda s: s > 2].reset_index()[["day", "name"]]
+        found.append(pa.merge(over, on=["day", "name"]).assign(kind="parent_cap"))
+    out = pd.concat([f for f in found if not f.empty], ignore_index=True) if any(not f.empty for f in found) else pd.DataFrame(columns=_COLS)
+    return ValidationReport(out[_COLS].sort_values(["day", "period", "grade", "class", "role"], kind="stable").reset_index(drop=True))